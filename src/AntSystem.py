@@ -1,40 +1,204 @@
-from typing import List, Dict, Any, Set, Optional, Union, Tuple, Counter
-import random
-import collections
+from typing import List, Dict, Any, Set, Optional, Union, Tuple, Iterable
 import sys
-from supportingDS import TSPInstance, TSPSolver
+import numpy as np
+from supportingDS import TSPInstance, TSPSolver, Tour, PheremoneMatrix, LazyPheremoneMatrix, PackedSymmetricMatrix, asTSPInstance
+from LocalSearch import LocalSearch
 
-## TODO: It is possible that distance is float -- we need to check this
-distanceType = int 
+distanceType = Union[int, float]
 cityType = int
-matrixType = List[List[distanceType]]
+matrixType = Union[List[List[distanceType]], np.ndarray]
 neighboursType = Set[cityType]
-tourType = Dict[cityType, None]
+tourType = Tour
 
 
 ## BUG: Replace sets with OrderedSet equivealent (e.g. dict or collections.MutableSet)
 ## IMPORTANT!: Python sets are unordered so the code built so far will not work as anticipated
 
-## TODO: There is no point using collections.counter for visitedEdges as the deposit can only
-## be calculated after all ants have completed their cycles
-
 ## TODO: We need to handle redundancy in the matrix (i.e. city i --> j means that city j --> i need to be updated)
 ## I feel like it is possible that there are instances in the below code were we haven't handled this redundancy correctly
 
 class Ant:
-	def __init__(self, startCity: cityType) -> None:
-		self.tour: tourType = {startCity: None}
-		self.startCity: cityType = startCity
-		self.tourDistance: distanceType = 0
+	## An ant is a thin view of its row in the colony arrays (so it holds no state of its own)
+	__slots__ = ("colony", "index")
+
+	def __init__(self, colony: "Colony", index: int) -> None:
+		self.colony = colony
+		self.index = index
+
+	@property
+	def startCity(self) -> cityType:
+		return int(self.colony.startCities[self.index])
+
+	@property
+	def tour(self) -> tourType:
+		## NOTE: Before the ant completes its cycle, its tour only holds the cities it has visited so far
+		tourLength = self.colony.tourLengths[self.index]
+		if tourLength == 1:
+			return Tour(self.colony.startCities[self.index:self.index+1], self.colony.numberOfCities)
+		return Tour(self.colony.tours[self.index, :tourLength], self.colony.numberOfCities)
+
+	@tour.setter
+	def tour(self, tour: Iterable[cityType]) -> None:
+		cities = np.fromiter(tour, dtype=np.int64)
+		self.colony.tours[self.index, :len(cities)] = cities
+		self.colony.tourLengths[self.index] = len(cities)
+
+	@property
+	def tourDistance(self) -> distanceType:
+		## An ant that is still on its start city hasn't travelled yet
+		if self.colony.tourLengths[self.index] == 1:
+			return 0
+		return self.colony.tourDistances[self.index].item()
+
+	@tourDistance.setter
+	def tourDistance(self, tourDistance: distanceType) -> None:
+		self.colony.tourDistances[self.index] = tourDistance
+
+
+class Colony:
+	## The state of the colony is held in (ants x cities) arrays, which are allocated once and reused every iteration
+	## NOTE: tourLengths is the number of cities each ant has visited (i.e. 1 after a reset, and n after a cycle)
+	## NOTE: A reset only resets the tourLengths, so the tours of the last cycle stay in the arrays until the next cycle
+	def __init__(self, startCities: Iterable[cityType], numberOfCities: int, distanceDtype: np.dtype) -> None:
+		self.startCities = np.fromiter(startCities, dtype=np.int64)
+		self.numberOfCities = numberOfCities
+		numberOfAnts = len(self.startCities)
+
+		self.tours = np.empty((numberOfAnts, numberOfCities), dtype=np.int64)
+		self.tourDistances = np.zeros(numberOfAnts, dtype=np.result_type(distanceDtype, np.int64))
+		self.tourLengths = np.ones(numberOfAnts, dtype=np.int64)
+		self.ants: List[Ant] = [Ant(self, index) for index in range(numberOfAnts)]
+
+	def reset(self) -> None:
+		self.tourLengths.fill(1)
+
+	def completeTours(self) -> None:
+		self.tourLengths.fill(self.numberOfCities)
+
+
+def constructColonyTours(choiceInfo: np.ndarray, distanceMatrix: np.ndarray, startCities: np.ndarray,
+							rng: np.random.Generator, candidates: Optional[np.ndarray] = None,
+							out: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+	## This advances every ant in the colony by one city at a time, so each step is a single (ants x cities) operation
+	## NOTE: It returns the tours as a (ants x cities) array starting at the startCities, and the length of each tour
+	## NOTE: The tours and distances are written into the out arrays if they are given (so they can be reused)
+	numberOfAnts, numberOfCities = len(startCities), len(choiceInfo)
+	antIndices = np.arange(numberOfAnts)
+
+	if out is None:
+		tours = np.empty((numberOfAnts, numberOfCities), dtype=np.int64)
+		tourDistances = np.zeros(numberOfAnts, dtype=np.result_type(distanceMatrix.dtype, np.int64))
+	else:
+		tours, tourDistances = out
+		tourDistances.fill(0)
+	unvisited = np.ones((numberOfAnts, numberOfCities), dtype=bool)
+
+	currentCities = np.asarray(startCities, dtype=np.int64)
+	tours[:, 0] = currentCities
+	unvisited[antIndices, currentCities] = False
+
+	for step in range(1, numberOfCities):
+		if candidates is None:
+			weights = choiceInfo[currentCities] * unvisited
+			selectedCities = _sampleColonyRows(weights, unvisited, rng)
+		else:
+			selectedCities = _sampleColonyCandidates(choiceInfo, candidates, currentCities, unvisited, rng)
+
+		tourDistances += distanceMatrix[currentCities, selectedCities]
+		tours[:, step] = selectedCities
+		unvisited[antIndices, selectedCities] = False
+		currentCities = selectedCities
+
+	## NOTE: We still need to add the final edge from endCity ---> startCity
+	tourDistances += distanceMatrix[currentCities, tours[:, 0]]
+	return tours, tourDistances
+
+
+def _sampleColonyCandidates(choiceInfo: np.ndarray, candidates: np.ndarray, currentCities: np.ndarray,
+								unvisited: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+	## NOTE: Ants almost always pick one of the nearest cities, so we only sample from the candidate lists
+	antIndices = np.arange(len(currentCities))
+	candidateCities = candidates[currentCities]
+	candidateMask = unvisited[antIndices[:, None], candidateCities]
+	weights = choiceInfo[currentCities[:, None], candidateCities] * candidateMask
+
+	selectedCities = np.empty(len(currentCities), dtype=np.int64)
+	hasCandidates = candidateMask.any(axis=1)
+	selectedIndices = _sampleColonyRows(weights[hasCandidates], candidateMask[hasCandidates], rng)
+	selectedCities[hasCandidates] = candidateCities[hasCandidates, selectedIndices]
+
+	## If all of the candidates have been visited, then we greedily take the best city out of all the unvisited cities
+	exhausted = ~hasCandidates
+	if exhausted.any():
+		exhaustedUnvisited = unvisited[exhausted]
+		exhaustedWeights = choiceInfo[currentCities[exhausted]] * exhaustedUnvisited
+		selectedCities[exhausted] = _selectMostDesirableColumns(exhaustedWeights, exhaustedUnvisited)
+
+	return selectedCities
+
+
+def _sampleColonyRows(weights: np.ndarray, unvisited: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+	## Masked (visited) columns have zero weight so they have zero width in the cumulative sum of their row
+	cumulativeWeights = np.cumsum(weights, axis=1)
+	totalWeights = cumulativeWeights[:, -1] if weights.shape[1] else np.zeros(len(weights))
+
+	## NOTE: We scale the random numbers by the row totals instead of normalizing each of the probabilities
+	## As rng.random() < 1, the selected value is strictly below the total so an unvisited column is always selected
+	selectedWeights = rng.random(len(weights)) * totalWeights
+	selectedColumns = np.count_nonzero(cumulativeWeights <= selectedWeights[:, None], axis=1)
+
+	## NOTE: The pheremones can underflow (or overflow) so we fall back to the most desirable unvisited columns
+	## (a subnormal total has so little precision that the scaled random number can round up to the total itself)
+	invalidRows = ~((totalWeights > 0) & (totalWeights < float('inf'))) | (selectedColumns >= weights.shape[1])
+	if invalidRows.any():
+		selectedColumns[invalidRows] = _selectMostDesirableColumns(weights[invalidRows], unvisited[invalidRows])
+
+	return selectedColumns
+
+
+def _selectMostDesirableColumns(weights: np.ndarray, unvisited: np.ndarray) -> np.ndarray:
+	## NOTE: Visited columns are set to -inf so that they are never selected (even if all the weights are NaN or 0)
+	return np.argmax(np.where(unvisited, weights, -np.inf), axis=1)
+
+
+class ChoiceInfoView:
+	## This computes the choice info (tau^alpha * eta^beta) on the fly for the rows/edges being indexed
+	## NOTE: This is used instead of materializing the whole matrix every iteration (e.g. with lazy evaporation)
+	def __init__(self, pheremoneMatrix: PheremoneMatrix, heuristicMatrix: np.ndarray, alpha: float) -> None:
+		self.pheremoneMatrix = pheremoneMatrix
+		self.heuristicMatrix = heuristicMatrix
+		self.alpha = alpha
+
+	def __getitem__(self, key: Any) -> np.ndarray:
+		pheremones = self.pheremoneMatrix[key]
+		if self.alpha != 1.0:
+			pheremones = pheremones ** self.alpha
+		return pheremones * self.heuristicMatrix[key]
+
+	def __len__(self) -> int:
+		return len(self.heuristicMatrix)
 
 
 class AntSystem(TSPSolver):
 	def __init__(self) -> None:
 		super().__init__()
-		self.ants: Optional[Set[Ant]] = set()
+		self.ants: Optional[List[Ant]] = []
+		self.colony: Optional[Colony] = None
 		self.TSPInstance: Optional[TSPInstance] = None
-		self.visitedEdges: Optional[Counter] = None
-		self.pheremoneMatrix: Optional[List[List[float]]]= None
+		self.pheremoneMatrix: Optional[PheremoneMatrix]= None
+		self.heuristicMatrix: Optional[np.ndarray] = None
+		self.choiceInfo: Optional[Union[np.ndarray, ChoiceInfoView]] = None
+		self.candidates: Optional[np.ndarray] = None
+		self.rng: np.random.Generator = np.random.default_rng()
+		self.parallelColony = None
+		self.localSearch: Optional[LocalSearch] = None
+		## The number of iterations of a run (set from the maxIterations hyperparameter for every run)
+		self.numberOfIterations: int = 0
+
+		## The tours (and their distances) of all ants in the colony for the current iteration
+		## NOTE: These are the arrays of the colony, so they are overwritten by the next iteration
+		self.colonyTours: Optional[np.ndarray] = None
+		self.colonyDistances: Optional[np.ndarray] = None
 
 		## TODO: What should we set the initial best tour to?? RANDOM tour??
 		self._bestTour = None
@@ -48,7 +212,13 @@ class AntSystem(TSPSolver):
 			"numberOfAnts": 30,		## TODO: Find out what a good rule of thumb is
 			"alpha": 1.0,			## edge weighting in city selection (experimental says around 1 is a good value)
 			"beta": 3.0,			## pheremone weighting in city selection (experimental says around 2 <= x <= 5 is a good value)
-			"rho": 0.5				## pheremone decay rate after a synchronized cycle
+			"rho": 0.5,				## pheremone decay rate after a synchronized cycle
+			"candidateListSize": 0,	## number of nearest cities an ant samples from (0 means every unvisited city)
+			"lazyEvaporation": False,## evaporate with a global multiplier so that only deposited edges are updated
+			"numberOfWorkers": 0,	## number of processes constructing the ant tours (0 means this process)
+			"localSearch": "none",	## which constructed tours are improved with 2-opt/Or-opt ("none", "best" or "all")
+			"localSearchNeighbours": 10,## number of nearest cities searched for the local search moves of a city
+			"seed": None			## seeds all of the random streams so that runs are reproducible
 		}
 
 		return None
@@ -74,6 +244,26 @@ class AntSystem(TSPSolver):
 					"start": 0.0,
 					"end": 1.0
 		},
+		"candidateListSize": {"valType": int,
+							"start": 0,
+							"end": sys.maxsize
+		},
+		"lazyEvaporation": {"valType": bool},
+		"numberOfWorkers": {"valType": int,
+							"start": 0,
+							"end": sys.maxsize
+		},
+		"localSearch": {"valType": str,
+						"options": ("none", "best", "all")
+		},
+		"localSearchNeighbours": {"valType": int,
+							"start": 1,
+							"end": sys.maxsize
+		},
+		"seed": {"valType": int,
+					"start": 0,
+					"end": sys.maxsize
+		},
 						
 	}
 		
@@ -83,39 +273,47 @@ class AntSystem(TSPSolver):
 					 hyperparameters: Optional[Dict[str, Any]] = None) -> None:
 
 		self._setHyperparameters(hyperparameters)
-		self._initializeDataStructures(distanceMatrix, numberOfCities)
 
-		for i in range(self.hyperparameters['maxIterations']):
-			self._bestIterationTour = None
-			self._bestIterationDistance = float('inf')
+		try:
+			## NOTE: The worker processes (if any) are started part way through the initialization, which can still fail after them
+			self._initializeDataStructures(distanceMatrix, numberOfCities)
+			for i in range(self.numberOfIterations):
+				## NOTE: The solver stops between iterations when it is asked to (see TSPSolver.stop)
+				if self._shouldStop():
+					break
+				self._runIteration()
+		finally:
+			## NOTE: The worker processes (if any) need to be shut down even if the solver fails
+			self._closeParallelColony()
+
+		return None
 
-			for ant in self.ants:
-				self._runAntCycle(ant)
 
-			## We then check whether this iteration beat the previous best
-			if self._bestIterationDistance < self._bestDistance:
-				self._bestTour = self._bestIterationTour
-				self._bestDistance = self._bestIterationDistance
-				self._executeNewBestTourTrigger(self._bestDistance)
+	def _runIteration(self) -> None:
+		self.iterationCount += 1
+		self._bestIterationTour = None
+		self._bestIterationDistance = float('inf')
 
-			## This method should handle evaporation and deposit of pheremones
-			self._advancePheremoneCycle()
-			## Between cycles, we want to reset the tour and tourDistance
-			self._resetAntCycle()
+		self._runColonyCycle()
 
-		return None
+		## We then check whether this iteration beat the previous best
+		if self._bestIterationDistance < self._bestDistance:
+			self._bestTour = self._bestIterationTour
+			self._bestDistance = self._bestIterationDistance
+			self._publishBestResult()
+			self._executeNewBestTourTrigger(self._bestDistance)
+
+		## This method should handle evaporation and deposit of pheremones
+		self._advancePheremoneCycle()
+		## The choice info only changes when the pheremones change, so we compute it once per iteration
+		self._updateChoiceInfo()
+		## Between cycles, we want to reset the tour and tourDistance
+		self._resetAntCycle()
 
 	
 	def _executeNewBestTourTrigger(self, bestDistance):
 		...
 
-	def _returnResults(self) -> Tuple[List[int], int]:
-		## TODO: Maybe check the current uncompleted iteration in case there was a better tour that wasn't updated yet
-		if self._bestIterationDistance < self._bestDistance:
-			return list(self._bestIterationTour), self._bestIterationDistance
-		return list(self._bestTour), self._bestDistance
-  
-
 	def _setHyperparameters(self, hyperparameters: Optional[Dict[str, any]] = None) -> None:
 		## Checks the hyperparameter object type
 		if hyperparameters is None:
@@ -139,33 +337,110 @@ class AntSystem(TSPSolver):
 			if definition['valType'] in (int, float):
 				if not (definition['start'] <= val <= definition['end']):
 					raise Exception(f"The parameter {key} needs to be a value in between {definition['start']} and {definition['end']}")
+			elif 'options' in definition and val not in definition['options']:
+				raise Exception(f"The parameter {key} needs to be one of {definition['options']}")
 			
 			## Finally set the new hyperparameter value
 			self.hyperparameters[key] = val
 
 
 	def _initializeDataStructures(self, distanceMatrix: matrixType, numberOfCities: int) -> None:
-		self.TSPInstance = TSPInstance(distanceMatrix, numberOfCities)
-		self.visitedEdges = collections.Counter()
+		self.TSPInstance = asTSPInstance(distanceMatrix, numberOfCities)
+		self._initializeRandomState()
+		self.numberOfIterations = self.hyperparameters['maxIterations']
 		self.pheremoneMatrix = self._createPheremoneMatrix()
+		self._initializeConstructionStructures()
 		self.ants = self._createAnts()
 
 
-	def _createPheremoneMatrix(self) -> None:
+	def _initializeRandomState(self) -> None:
+		## NOTE: All of the randomness in the solver comes from this generator, so a seed makes the run reproducible
+		self.rng = np.random.default_rng(self.hyperparameters['seed'])
+
+
+	def _initializeConstructionStructures(self) -> None:
+		## NOTE: These are the structures used by the ants to select cities, so they need the pheremoneMatrix
+		self.heuristicMatrix = self._createHeuristicMatrix()
+		if self.hyperparameters['candidateListSize'] > 0:
+			self.candidates = self.TSPInstance.candidateLists(self.hyperparameters['candidateListSize'])
+		else:
+			self.candidates = None
+
+		self.localSearch = None
+		if self.hyperparameters['localSearch'] != "none":
+			self.localSearch = LocalSearch(self.TSPInstance, self.hyperparameters['localSearchNeighbours'])
+
+		self.choiceInfo = None
+		if self.hyperparameters['numberOfWorkers'] > 1:
+			## NOTE: The import is here, as the ParallelColony module depends on this module
+			from ParallelColony import ParallelColony
+			self.parallelColony = ParallelColony(self.TSPInstance.distanceMatrix, self.candidates, self.hyperparameters['numberOfWorkers'],
+													seed=int(self.rng.integers(sys.maxsize)))
+			self.choiceInfo = self.parallelColony.choiceInfo
+		self._updateChoiceInfo()
+
+
+	def _closeParallelColony(self) -> None:
+		if self.parallelColony is not None:
+			self.parallelColony.close()
+			self.parallelColony = None
+
+
+	def _createHeuristicMatrix(self) -> Union[np.ndarray, PackedSymmetricMatrix]:
+		## NOTE: The heuristic desirability (1/distance) never changes between iterations, so we raise it to beta once
+		## (and it has the same storage as the distance matrix, i.e. it is packed if the distances are packed)
+		distances = self._getStorageValues(self.TSPInstance.distanceMatrix).astype(np.float64)
+		with np.errstate(divide='ignore'):
+			heuristicDesirability = np.where(distances == 0, 100000000, 1 / distances)
+		return self._wrapStorageValues(heuristicDesirability ** self.hyperparameters['beta'])
+
+
+	def _getStorageValues(self, matrix: Union[np.ndarray, PackedSymmetricMatrix]) -> np.ndarray:
+		return matrix.values if isinstance(matrix, PackedSymmetricMatrix) else matrix
+
+
+	def _wrapStorageValues(self, values: np.ndarray) -> Union[np.ndarray, PackedSymmetricMatrix]:
+		## This gives values computed element-wise from the distances the same storage as the distance matrix
+		if self.TSPInstance.isPacked:
+			return self.TSPInstance.distanceMatrix.withValues(values)
+		return values
+
+
+	def _updateChoiceInfo(self) -> None:
+		## The choice info is the numerator of the city selection probability (i.e. tau^alpha * eta^beta)
+		## NOTE: This needs to be called after every change to the pheremoneMatrix
+		if self.hyperparameters['lazyEvaporation'] and self.parallelColony is None:
+			## Materializing the choice info would cost O(n^2) every iteration, so the ants compute the rows they need
+			self.choiceInfo = ChoiceInfoView(self.pheremoneMatrix, self.heuristicMatrix, self.hyperparameters['alpha'])
+			return
+
+		## NOTE: The choice info is updated in place, as the worker processes (if any) read it from shared memory
+		heuristicValues = self._getStorageValues(self.heuristicMatrix)
+		if self.choiceInfo is None or isinstance(self.choiceInfo, ChoiceInfoView):
+			self.choiceInfo = self._wrapStorageValues(np.empty_like(heuristicValues))
+		choiceValues = self._getStorageValues(self.choiceInfo)
+		np.power(self.pheremoneMatrix.storedPheremones(), self.hyperparameters['alpha'], out=choiceValues)
+		choiceValues *= heuristicValues
+
+
+	def _createPheremoneMatrix(self) -> PheremoneMatrix:
 		## If the initial pheremones is too low, then the initial movements of the ant will heavily influence future iterations
 		## If the initial pheremones are too high, then the many iterations can be wasted by ants doing the same thing
 		initialPheromoneDeposit = self._getInitialPheremoneDeposit()
-		return [[initialPheromoneDeposit for _ in range(self.TSPInstance.numberOfCities)] for _ in range(self.TSPInstance.numberOfCities)]
+		return self._newPheremoneMatrix(initialPheromoneDeposit)
 
-		## NOTE: If you use * multipication you set each of the rows to look at the same array (Is this a python bug??)
-		## BUG: On the second multiplication, the rows get reused which means that 2d_matrix[row] is the same as 2d_matrix[all_rows]
-		## return [[initialPheremonDeposit] * self.TSPInstance.numberOfCities] * self.TSPInstance.numberOfCities
+
+	def _newPheremoneMatrix(self, initialPheremone: float) -> PheremoneMatrix:
+		## NOTE: The pheremones are packed if the distances are packed (i.e. the instance is verified to be symmetric)
+		if self.hyperparameters['lazyEvaporation']:
+			return LazyPheremoneMatrix(self.TSPInstance.numberOfCities, initialPheremone, self.TSPInstance.isPacked)
+		return PheremoneMatrix(self.TSPInstance.numberOfCities, initialPheremone, self.TSPInstance.isPacked)
 
 
 	def _getInitialPheremoneDeposit(self) -> None:
 		## NOTE: The lecture provided a basic method of using NearestNeighbour to get a tour, and then 
 		## using a mathematical formula to calculate the general spread of pheremones across each vertex
-		_, distance = self.TSPInstance.nearestNeighbour()
+		_, distance = self.TSPInstance.nearestNeighbour(self._selectAntPlacement())
 		## NOTE: In the lecture the formula was initialDeposit = N/L^nn (i.e. numberOfCities / distance of NN tour)
 		if distance >= 0:
 			return self.TSPInstance.numberOfCities / distance
@@ -176,129 +451,92 @@ class AntSystem(TSPSolver):
 
 
 	def _advancePheremoneCycle(self) -> None:
+		## Every edge evaporates at the constant rate rho, and then each ant deposits on the edges of its tour
+		self._evaporatePheremone()
+		self._depositPheremone(self.colonyTours, self._calculatePheremoneDeposits(self.colonyDistances))
 
-		## Calculate the deposits
-		deposits = {}
-		for ant in self.ants:
-			self._calculateAntDeposit(ant, deposits)
-
-		## Calculate new pheremone using deposits and constant evaporation rate rho
-		self._calculateNewPheremone(deposits)
-
-
-	def _calculateAntDeposit(self, ant, deposits):
-			## NOTE: The lecture provided a basic mathematical formula to calculate this, which we will use for our basic implememntation at the moment.
-			iterableTour = iter(ant.tour)
-			currentCity = next(iterableTour)
-			for nextCity in iterableTour:
-				deposit = self._calculatePheremoneDeposit(currentCity, nextCity, ant.tourDistance)
-				self._incrementDepositDistance(deposits, deposit, currentCity, nextCity)
-				currentCity = nextCity
-
-			## We also need to add the distance of the final city back to the startCity
-			## NOTE: Instead of going from current --> start (i.e. chronologically), we are going the same way
-			## as it is symmetric TSP so doens't matter -- it in fact helps us reduce redundancy
-			deposit = self._calculatePheremoneDeposit(ant.startCity, currentCity, ant.tourDistance)
-			self._incrementDepositDistance(deposits, deposit, ant.startCity, currentCity)
-
-
-	def _calculatePheremoneDeposit(self, startCity: cityType, currentCity: cityType, tourDistance: int) -> float:
-		if tourDistance > 0:
-			return self.TSPInstance.distance(startCity, currentCity) / tourDistance
-		return float("inf")
-
-
-	def _calculateNewPheremone(self, deposits: Dict[Tuple[cityType, cityType], float]) -> None:
-		## Calculate the evaporation, and update the pheremone matrix with the new values
-		for (currentCity, nextCity), deposit in deposits.items():
-			evaporation = (1 - self.hyperparameters['rho']) * self.pheremoneMatrix[currentCity][nextCity]
-			newPheremoneLevel = evaporation + deposit ## NOTE: Elist Ant System adds an additional weighting to the best route's edges
-			self.pheremoneMatrix[currentCity][nextCity] = newPheremoneLevel
-			self.pheremoneMatrix[nextCity][currentCity] = newPheremoneLevel
-
-
-	def _incrementDepositDistance(self, dictionary: Dict[Tuple[int, int], Union[int, float]], value: Union[int, float], currentCity: cityType, nextCity: cityType) -> None:
-		## NOTE: This is a STSP (I think), so we need to ensure that any matrices don't have redundant mismatches
-		## ==> Hence updating values in both directions
-		if dictionary.get((currentCity, nextCity)):
-			dictionary[(currentCity, nextCity)] += value
-		elif dictionary.get((nextCity, currentCity)):
-			dictionary[(nextCity, currentCity)] += value
-		else:
-			dictionary[(currentCity, nextCity)] = value
 
+	def _calculatePheremoneDeposits(self, tourDistances: np.ndarray) -> np.ndarray:
+		## NOTE: The lecture provided a basic mathematical formula (deposit = 1/L) which we use for our basic implementation
+		with np.errstate(divide='ignore'):
+			return 1 / np.asarray(tourDistances, dtype=np.float64)
 
-	def _runAntCycle(self, ant: Ant) -> None:
-		## NOTE: THis is the main body that directs the ant on how to perform its cycle
-		currentCity = ant.startCity
-		## NOTE: This is not needed as the ant is already initialied with the startCity
-		## ant.tour[currentCity] = None 
-		for _ in range(self.TSPInstance.numberOfCities-1):
-			selectedCity = self._probabilisticallySelectNextCity(ant, currentCity)
-			self._incrementVisitedEdges(currentCity, selectedCity)
-			ant.tour[selectedCity] = None
-			ant.tourDistance += self.TSPInstance.distance(currentCity, selectedCity)
-			currentCity = selectedCity
-
-		## NOTE: We still need to add the final edge from endCity ---> startCity
-		self._incrementVisitedEdges(currentCity, selectedCity)
-		ant.tourDistance += self.TSPInstance.distance(selectedCity, ant.startCity)
-		## We need to ensure that we keep track of the best-tour in the current iteration
-		self._updateBestIterationTour(ant.tour, ant.tourDistance)
 
+	def _evaporatePheremone(self) -> None:
+		self.pheremoneMatrix.evaporate(self.hyperparameters['rho'])
 
-	def _incrementVisitedEdges(self, currentCity: cityType, selectedCity: cityType) -> None:
-		self.visitedEdges[(currentCity, selectedCity)] += 1
 
+	def _depositPheremone(self, tours: np.ndarray, deposits: np.ndarray) -> None:
+		## Each tour deposits the same amount on all of its edges (including the edge from the last city back to the start)
+		startCities, endCities = self._getTourEdges(tours)
+		self._depositPheremoneEdges(startCities, endCities, np.repeat(deposits, tours.shape[1]))
 
-	def _updateBestIterationTour(self, tour: tourType, tourDistance: int) -> None:
-		if tourDistance < self._bestIterationDistance:
-			self._bestIterationTour = tour
-			self._bestIterationDistance = tourDistance
 
+	def _getTourEdges(self, tours: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		return tours.ravel(), np.roll(tours, -1, axis=1).ravel()
 
-	def _probabilisticallySelectNextCity(self, ant: Ant,  currentCity: cityType) -> cityType:
-		## TODO: Evaluate the code below to see if the time complexity can be improved
-		denominator = 0
-		numerators = []
-		probabilities = []
 
-		for neighbour, distance in enumerate(self.TSPInstance.neighbours(currentCity)):
-			if neighbour not in ant.tour:
-				pheremoneLevel = self.pheremoneMatrix[currentCity][neighbour]
-				heuristicDesirability = 100000000 if distance == 0 else 1 / distance
-				## NOTE: Weird things happen at infinity !!!
-				numerator = (pheremoneLevel**self.hyperparameters['alpha']) * (heuristicDesirability**self.hyperparameters['beta'])
-				# input(numerator)
-				numerators.append((neighbour, numerator))
-				denominator += numerator
+	def _depositPheremoneEdges(self, startCities: np.ndarray, endCities: np.ndarray, deposits: np.ndarray) -> None:
+		## NOTE: This is a STSP, so the pheremoneMatrix updates the values in both directions
+		self.pheremoneMatrix.deposit(startCities, endCities, deposits)
 
-		## With the numerators and denominator we can calculate each of the probabilities
-		for neighbour, numerator in numerators:
-			probabilities.append((neighbour, numerator/denominator))
 
-		## Now that we have the exact probabilities of each neighbour, we can now select the city
-		## NOTE: Maybe this could use structure the problem so that we can use binary search 
-		## (e.g. logarithmic time complexity instead of linear time)
-		selectedProbability = random.uniform(0, 1)
-		cumulativeProbability = 0
-		selectedCity = None
-		for neighbour, probability in probabilities:
-			cumulativeProbability += probability
-			if cumulativeProbability >= selectedProbability:
-				selectedCity = neighbour
-				break
+	def _runColonyCycle(self) -> None:
+		## NOTE: All ants in the colony build their tours together (see constructColonyTours)
+		colony = self.colony
+		self.colonyTours, self.colonyDistances = self._constructTours(colony.startCities, out=(colony.tours, colony.tourDistances))
+		colony.completeTours()
+		self._improveTours(self.colonyTours, self.colonyDistances)
 
-		if selectedCity is None:
-			## BUG: There may be an issue where cumulativeprobability (0.9999) >= selectedProbability (1) due to floating point inprecission
-			raise Exception("There was no city selected when trying to create an ant-cycle")
+		## We need to ensure that we keep track of the best-tour in the current iteration
+		self._updateBestIterationTour(self.colonyTours, self.colonyDistances)
 
-		return selectedCity
+
+	def _runAntCycle(self, ant: Ant) -> None:
+		## NOTE: This directs a single ant on how to perform its cycle (i.e. a colony of one ant)
+		tours, tourDistances = self._constructTours(np.array([ant.startCity], dtype=np.int64))
+		self._improveTours(tours, tourDistances)
+		ant.tour = tours[0]
+		ant.tourDistance = tourDistances[0].item()
+		self._updateBestIterationTour(tours, tourDistances)
+
+
+	def _constructTours(self, startCities: np.ndarray, out: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+		if self.parallelColony is not None:
+			tours, tourDistances = self.parallelColony.constructTours(startCities)
+			if out is None:
+				return tours, tourDistances
+			out[0][:], out[1][:] = tours, tourDistances
+			return out
+		return constructColonyTours(self.choiceInfo, self.TSPInstance.distanceMatrix, startCities, self.rng, self.candidates, out)
+
+
+	def _improveTours(self, tours: np.ndarray, tourDistances: np.ndarray) -> None:
+		## The local search improves either the best tour of the colony, or every tour (in place)
+		if self.localSearch is None:
+			return
+		if self.hyperparameters['localSearch'] == "best":
+			improvedAnts = [int(np.argmin(tourDistances))]
+		else:
+			improvedAnts = range(len(tours))
+
+		for ant in improvedAnts:
+			tours[ant], tourDistances[ant] = self.localSearch.improveTour(tours[ant])
 
 
-	def _createAnts(self) -> None:
+	def _updateBestIterationTour(self, tours: np.ndarray, tourDistances: np.ndarray) -> None:
+		bestAnt = int(np.argmin(tourDistances))
+		if tourDistances[bestAnt] < self._bestIterationDistance:
+			self._bestIterationTour = Tour(tours[bestAnt])
+			self._bestIterationDistance = tourDistances[bestAnt].item()
+
+
+	def _createAnts(self) -> List[Ant]:
 		## NOTE: How should we place ants on vertices??
-		return {Ant(self._selectAntPlacement()) for _ in range(self.hyperparameters['numberOfAnts'])}
+		## NOTE: The ants are kept in a list (rather than a set), so that their order (and so a seeded run) is reproducible
+		startCities = [self._selectAntPlacement() for _ in range(self.hyperparameters['numberOfAnts'])]
+		self.colony = Colony(startCities, self.TSPInstance.numberOfCities, self.TSPInstance.distanceMatrix.dtype)
+		return self.colony.ants
 		
 	
 	def _selectAntPlacement(self) -> cityType:
@@ -309,7 +547,7 @@ class AntSystem(TSPSolver):
 
 		## TODO: Remove this exception, it's fine for multiple ants to start on the same city
 		if self.TSPInstance.numberOfCities - len(_initialPlacements) > 0:
-			while ((startCity := random.randint(0, self.TSPInstance.numberOfCities-1)) in _initialPlacements): pass
+			while ((startCity := int(self.rng.integers(self.TSPInstance.numberOfCities))) in _initialPlacements): pass
 			_initialPlacements.add(startCity)
 			return startCity
 		else:
@@ -317,20 +555,15 @@ class AntSystem(TSPSolver):
 
 	
 	def _resetAntCycle(self) -> None:
-		for ant in self.ants:
-			ant.tourDistance = 0
-			ant.tour = {ant.startCity: None}
-
-		self.visitedEdges.clear()
+		## NOTE: This only resets the colony arrays in place (nothing is allocated per ant)
+		self.colony.reset()
 
 
 def main() -> None:
-	distanceMatrix = [] ## NOTE: This will need to be loaded in from a file (or defined here)
-	numberOfCities = len(distanceMatrix)
-
-	## NOTE: You can add another potiional argument "hyperparameters" to tune the hyperparmaeters
-	AS = AntSystem()
-	AS.run(distanceMatrix, numberOfCities, timer=59.0)
+	## Usage: python AntSystem.py <instance files...> [--timer seconds] [--workers n] [--hyperparameters json] [--noTours]
+	## NOTE: The import is here, as the BatchSolver module depends on this module
+	from BatchSolver import main as solveBatch
+	solveBatch(solverName="AntSystem")
 
 
 if __name__ == "__main__":
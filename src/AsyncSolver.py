@@ -0,0 +1,179 @@
+import queue
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Optional, Tuple, Union
+
+from supportingDS import TSPSolver, Improvement
+
+distanceType = Union[int, float]
+tourType = Any
+
+
+class SolveHandle:
+	## A solve that is in flight, which can be awaited for its final (tour, distance), and iterated over (async for)
+	## for its improvements (see supportingDS.Improvement) as they are found
+	## NOTE: The improvements are kept until they are iterated over, so they can also be iterated over after the solve
+	def __init__(self) -> None:
+		self._improvements: asyncio.Queue = asyncio.Queue()
+		self._task: Optional[asyncio.Task] = None
+
+	def __await__(self):
+		return self._task.__await__()
+
+	def __aiter__(self) -> "SolveHandle":
+		return self
+
+	async def __anext__(self) -> Improvement:
+		improvement = await self._improvements.get()
+		if improvement is None:
+			## NOTE: The end marker is put back, so that iterating again also ends straight away
+			self._improvements.put_nowait(None)
+			raise StopAsyncIteration
+		return improvement
+
+	def cancel(self) -> bool:
+		## The solver is stopped at its next iteration (and awaiting the handle raises asyncio.CancelledError)
+		return self._task.cancel()
+
+	def done(self) -> bool:
+		return self._task.done()
+
+
+class AsyncSolver:
+	## This runs solves on an executor, so that an event loop isn't blocked by them
+	## 	- executor: None runs each solve on a thread of the event loop's default executor (where the solver object
+	## 	  itself is run), whilst a ProcessPoolExecutor runs each solve on a new solver of the same type in a worker process
+	## 	- maxConcurrentSolves: the number of solves that can run at once (None means no limit), where the other
+	## 	  solves wait for their turn (and their timers start once they are running)
+	## NOTE: A solver object can only run one solve at a time when it runs on a thread, so concurrent solves need
+	## their own solver objects (e.g. AntSystem() for each request)
+	## NOTE: The improvements are passed back through a queue that is polled every pollInterval seconds
+	pollInterval: float = 0.05
+
+	def __init__(self, executor: Optional[Executor] = None, maxConcurrentSolves: Optional[int] = None) -> None:
+		if maxConcurrentSolves is not None and maxConcurrentSolves < 1:
+			raise Exception("You need to specify a valid maxConcurrentSolves value")
+		self.executor = executor
+		self.maxConcurrentSolves = maxConcurrentSolves
+		self.isProcessExecutor = isinstance(executor, ProcessPoolExecutor)
+		## NOTE: The queues and events of a process pool need to be proxies (as they are passed along with each task)
+		self._manager: Optional[asyncio.Future] = None
+		self._semaphore: Optional[asyncio.Semaphore] = None
+
+	def submit(self, solver: TSPSolver, *args, timer: float = 59.0, minInterval: float = 0.0, **kwargs) -> SolveHandle:
+		## This starts the solve (of the arguments of solver.run) as a task on the running event loop
+		if timer != -1 and timer < 0:
+			raise Exception("You need to specify a valid timer value")
+		handle = SolveHandle()
+		handle._task = asyncio.get_running_loop().create_task(self._solve(handle, solver, args, kwargs, timer, minInterval))
+		return handle
+
+	async def solve(self, solver: TSPSolver, *args, timer: float = 59.0, **kwargs) -> Tuple[tourType, distanceType]:
+		return await self.submit(solver, *args, timer=timer, **kwargs)
+
+	def close(self) -> None:
+		## NOTE: The executor belongs to the caller, so it isn't shut down here
+		if self._manager is not None:
+			## NOTE: A manager that is still starting is shut down once it has started
+			if self._manager.done():
+				_shutdownManager(self._manager)
+			else:
+				self._manager.add_done_callback(_shutdownManager)
+			self._manager = None
+
+	async def __aenter__(self) -> "AsyncSolver":
+		return self
+
+	async def __aexit__(self, *excInfo) -> None:
+		self.close()
+
+	def _getSemaphore(self) -> Optional[asyncio.Semaphore]:
+		if self.maxConcurrentSolves is not None and self._semaphore is None:
+			self._semaphore = asyncio.Semaphore(self.maxConcurrentSolves)
+		return self._semaphore
+
+	async def _createChannel(self) -> Tuple[Any, Any]:
+		## The queue of improvements and the stop event that are shared with the worker
+		if not self.isProcessExecutor:
+			return queue.Queue(), threading.Event()
+		if self._manager is None:
+			## NOTE: Starting the manager spawns its process, so it is started on the default executor (rather than
+			## blocking the event loop), and the solves that are submitted meanwhile wait for the same manager
+			self._manager = asyncio.get_running_loop().run_in_executor(None, multiprocessing.get_context("spawn").Manager)
+		## NOTE: The manager is shielded, as cancelling one of the solves waiting for it would otherwise cancel it
+		manager = await asyncio.shield(self._manager)
+		return await asyncio.get_running_loop().run_in_executor(None, _createManagerChannel, manager)
+
+	async def _solve(self, handle: SolveHandle, solver: TSPSolver, args: Tuple, kwargs: dict,
+						timer: float, minInterval: float) -> Tuple[tourType, distanceType]:
+		semaphore = self._getSemaphore()
+		try:
+			if semaphore is not None:
+				await semaphore.acquire()
+			try:
+				return await self._runSolve(handle, solver, args, kwargs, timer, minInterval)
+			finally:
+				if semaphore is not None:
+					semaphore.release()
+		finally:
+			handle._improvements.put_nowait(None)
+
+	async def _runSolve(self, handle: SolveHandle, solver: TSPSolver, args: Tuple, kwargs: dict,
+						timer: float, minInterval: float) -> Tuple[tourType, distanceType]:
+		improvementQueue, stopEvent = await self._createChannel()
+		## NOTE: A solver object can't be sent to another process, so the worker process creates its own
+		target = type(solver) if self.isProcessExecutor else solver
+		future = asyncio.get_running_loop().run_in_executor(self.executor, _solveInWorker, target, args, kwargs,
+																timer, minInterval, improvementQueue, stopEvent)
+		try:
+			while not future.done():
+				await asyncio.wait({future}, timeout=self.pollInterval)
+				self._passOnImprovements(handle, improvementQueue)
+		except asyncio.CancelledError:
+			## NOTE: The worker is waited for, so that a cancelled solve doesn't keep running beyond the concurrency limit
+			stopEvent.set()
+			await asyncio.wait({future})
+			raise
+		finally:
+			self._passOnImprovements(handle, improvementQueue)
+		return future.result()
+
+	def _passOnImprovements(self, handle: SolveHandle, improvementQueue: Any) -> None:
+		while True:
+			try:
+				improvement = improvementQueue.get_nowait()
+			except queue.Empty:
+				return
+			handle._improvements.put_nowait(improvement)
+
+
+def _createManagerChannel(manager: Any) -> Tuple[Any, Any]:
+	## NOTE: Each proxy is created by a round trip to the manager process
+	return manager.Queue(), manager.Event()
+
+
+def _shutdownManager(managerFuture: asyncio.Future) -> None:
+	if not managerFuture.cancelled() and managerFuture.exception() is None:
+		managerFuture.result().shutdown()
+
+
+def _solveInWorker(solver: Union[TSPSolver, type], args: Tuple, kwargs: dict, timer: float, minInterval: float,
+					improvementQueue: Any, stopEvent: Any) -> Tuple[tourType, distanceType]:
+	## This runs a solve on a thread (or process) of the executor, until it finishes or the stop event is set
+	if isinstance(solver, type):
+		solver = solver()
+	if stopEvent.is_set():
+		return None, float('inf')
+
+	improvementCallback = solver.addImprovementCallback(improvementQueue.put, minInterval)
+	try:
+		solver.start(*args, timer=timer, **kwargs)
+		while not solver.mainThreadEvent.wait(AsyncSolver.pollInterval):
+			if stopEvent.is_set():
+				solver.stop()
+				break
+	finally:
+		solver.removeImprovementCallback(improvementCallback)
+	return solver._returnResults()
@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+import numpy as np
+
+from supportingDS import TSPInstance, CoordinateTSPInstance, PackedSymmetricMatrix, InstancePublisher
+from AntSystem import AntSystem
+from MinMaxAntSystem import MaxMinAntSystem
+from ParticleSwarm import ParticleSwarm
+from GeneticParticleSwarm import GeneticParticleSwarm
+from IslandAntSystem import IslandMaxMinAntSystem
+from TSPLIB import readTSPLIBFile
+from InstanceFile import instanceFileMagic
+
+distanceType = Union[int, float]
+
+## The solvers that a batch can be run with (by name)
+solverTypes = {solverType.__name__: solverType for solverType in
+				(AntSystem, MaxMinAntSystem, ParticleSwarm, GeneticParticleSwarm, IslandMaxMinAntSystem)}
+
+
+class BatchTask(NamedTuple):
+	## An instance of a batch, with the name, timer and hyperparameters that it should be solved with (where None
+	## means those of the batch), and where the instance is anything BatchSolver.solve accepts
+	instance: Any
+	name: Optional[str] = None
+	timer: Optional[float] = None
+	hyperparameters: Optional[Dict[str, Any]] = None
+
+
+class BatchResult(NamedTuple):
+	## The result of an instance of a batch, where index is its position in the batch, and error is None unless
+	## the instance couldn't be solved (in which case the tour is None and the distance is inf)
+	index: int
+	name: str
+	numberOfCities: int
+	distance: distanceType
+	tour: Optional[np.ndarray]
+	elapsed: float
+	error: Optional[str] = None
+
+	def toDict(self, includeTour: bool = True) -> Dict[str, Any]:
+		record = {"index": self.index, "name": self.name, "numberOfCities": self.numberOfCities,
+					"distance": None if self.tour is None else self.distance, "elapsed": round(self.elapsed, 3), "error": self.error}
+		if includeTour:
+			record["tour"] = None if self.tour is None else self.tour.tolist()
+		return record
+
+
+class BatchSolver:
+	## This solves a stream of instances with one of the solvers (see solverTypes) on a pool of worker processes,
+	## yielding the results in the order that they finish
+	## 	- An instance can be a distance matrix, a TSPInstance, or the path of a TSPLIB or instance file (see
+	## 	  InstanceFile), where the files are opened by the workers themselves
+	## 	- Every instance is solved by a new solver for timer seconds (or until it finishes if the timer is -1)
+	## NOTE: The distance matrices of at least sharedMemoryThreshold bytes are published (see InstancePublisher), so
+	## the workers attach to them instead of having them pickled, and each is released once its instance is solved
+	## NOTE: Only a few instances per worker are taken from the stream at a time, so a stream can be longer than
+	## what fits in memory
+	sharedMemoryThreshold: int = 1 << 20
+	tasksPerWorker: int = 2
+
+	def __init__(self, solverName: str, hyperparameters: Optional[Dict[str, Any]] = None, timer: float = 1.0,
+					maxWorkers: Optional[int] = None) -> None:
+		if solverName not in solverTypes:
+			raise Exception(f"The solver {solverName} is not supported, it needs to be one of {tuple(solverTypes)}")
+		if timer != -1 and timer < 0:
+			raise Exception("You need to specify a valid timer value")
+		## NOTE: The hyperparameters are checked here, rather than failing every instance of the batch
+		solverTypes[solverName]()._setHyperparameters(hyperparameters)
+		self.solverName = solverName
+		self.hyperparameters = dict(hyperparameters) if hyperparameters is not None else {}
+		self.timer = timer
+		self.maxWorkers = (os.cpu_count() or 1) if maxWorkers is None else maxWorkers
+
+	def solve(self, instances: Iterable[Any]) -> Iterator[BatchResult]:
+		## NOTE: We use spawn, as forking a process that runs threads (e.g. the solvers) is unsafe
+		context = multiprocessing.get_context("spawn")
+		with ProcessPoolExecutor(max_workers=self.maxWorkers, mp_context=context) as executor:
+			pendingTasks: Dict[Any, Optional[InstancePublisher]] = {}
+			tasks = enumerate(instances)
+			try:
+				while True:
+					while len(pendingTasks) < self.maxWorkers * self.tasksPerWorker:
+						nextTask = next(tasks, None)
+						if nextTask is None:
+							break
+						future, publisher = self._submitTask(executor, *nextTask)
+						pendingTasks[future] = publisher
+					if not pendingTasks:
+						return
+
+					finishedTasks, _ = wait(pendingTasks, return_when=FIRST_COMPLETED)
+					for future in finishedTasks:
+						publisher = pendingTasks.pop(future)
+						if publisher is not None:
+							publisher.close()
+						yield future.result()
+			finally:
+				## NOTE: If the results stop being consumed, the queued instances are dropped, and the shared memory
+				## of the running ones is released once they have finished
+				for future in pendingTasks:
+					future.cancel()
+				wait(pendingTasks)
+				for publisher in pendingTasks.values():
+					if publisher is not None:
+						publisher.close()
+
+	def _submitTask(self, executor: ProcessPoolExecutor, index: int, task: Any) -> Tuple[Any, Optional[InstancePublisher]]:
+		if not isinstance(task, BatchTask):
+			task = BatchTask(task)
+		hyperparameters = self.hyperparameters if task.hyperparameters is None else {**self.hyperparameters, **task.hyperparameters}
+		timer = self.timer if task.timer is None else task.timer
+
+		isPath = isinstance(task.instance, (str, os.PathLike))
+		if task.name is not None:
+			name = task.name
+		else:
+			name = os.fspath(task.instance) if isPath else str(index)
+		try:
+			## NOTE: The hyperparameters of the batch were checked when it was created, so only those of the task are checked
+			if task.hyperparameters is not None:
+				solverTypes[self.solverName]()._setHyperparameters(task.hyperparameters)
+			payload, publisher = (("path", os.fspath(task.instance)), None) if isPath else self._createPayload(task.instance)
+		except Exception as error:
+			## NOTE: A task that can't be sent to the workers (e.g. a matrix of the wrong shape, or an invalid
+			## hyperparameter) is reported in the same way as one that the worker fails on
+			future = Future()
+			future.set_result(BatchResult(index, name, 0, float('inf'), None, 0.0, f"{type(error).__name__}: {error}"))
+			return future, None
+
+		future = executor.submit(_solveTask, self.solverName, hyperparameters, timer, index, name, payload)
+		return future, publisher
+
+	def _createPayload(self, instance: Any) -> Tuple[Tuple, Optional[InstancePublisher]]:
+		## This is what the worker needs to recreate the instance (where a large matrix is sent as the handle it is published with)
+		if isinstance(instance, CoordinateTSPInstance):
+			return ("instance", instance), None
+		if not isinstance(instance, TSPInstance):
+			instance = TSPInstance(instance, len(instance))
+
+		isPacked = instance.isPacked
+		values = instance.distanceMatrix.values if isPacked else instance.distanceMatrix
+		if values.nbytes < self.sharedMemoryThreshold:
+			return ("matrix", np.asarray(values), isPacked, instance.numberOfCities), None
+		publisher = InstancePublisher(instance)
+		return ("handle", publisher.handle), publisher
+
+
+def _solveTask(solverName: str, hyperparameters: Dict[str, Any], timer: float, index: int, name: str, payload: Tuple) -> BatchResult:
+	## This runs in a worker process, where a failed instance is reported as an error (rather than stopping the batch)
+	startTime = time.time()
+	numberOfCities = 0
+	attachedInstance = None
+	try:
+		if payload[0] == "handle":
+			instance = attachedInstance = TSPInstance.attach(payload[1])
+		elif payload[0] == "matrix":
+			_, values, isPacked, numberOfCities = payload
+			instance = _createInstance(values, isPacked, numberOfCities)
+		else:
+			instance = _loadInstance(payload[1]) if payload[0] == "path" else payload[1]
+		numberOfCities = instance.numberOfCities
+
+		tour, distance = _runSolver(solverTypes[solverName](), instance, hyperparameters, timer)
+		## NOTE: The solver has been released by now, so nothing else refers to the shared memory when it is closed
+		del instance
+		if tour is None:
+			raise Exception("The solver stopped before it found a tour")
+		tour = np.asarray(tour, dtype=np.int32)
+		if isinstance(distance, np.generic):
+			distance = distance.item()
+		return BatchResult(index, name, numberOfCities, distance, tour, time.time() - startTime)
+	except Exception as error:
+		return BatchResult(index, name, numberOfCities, float('inf'), None, time.time() - startTime, f"{type(error).__name__}: {error}")
+	finally:
+		if attachedInstance is not None:
+			attachedInstance.close()
+
+
+def _createInstance(values: np.ndarray, isPacked: bool, numberOfCities: int) -> TSPInstance:
+	distanceMatrix = PackedSymmetricMatrix(numberOfCities, values) if isPacked else values
+	return TSPInstance(distanceMatrix, numberOfCities, storage="dense")
+
+
+def _loadInstance(path: str) -> TSPInstance:
+	## An instance file (see InstanceFile) is recognised by its magic bytes, and any other file is read as a TSPLIB file
+	with open(path, "rb") as instanceFile:
+		isInstanceFile = instanceFile.read(len(instanceFileMagic)) == instanceFileMagic
+	return TSPInstance.fromFile(path) if isInstanceFile else readTSPLIBFile(path)
+
+
+def _runSolver(solver: Any, instance: TSPInstance, hyperparameters: Dict[str, Any], timer: float) -> Tuple[Any, distanceType]:
+	## This is TSPSolver.run, without its output (which would be printed for every instance of the batch)
+	solver.start(instance, instance.numberOfCities, hyperparameters, timer=timer)
+	if timer == -1:
+		solver.executionThread.join()
+	else:
+		solver.mainThreadEvent.wait(timer)
+		solver.stop()
+	return solver._returnResults()
+
+
+def _readInstancePaths(paths: List[str]) -> Iterator[str]:
+	## NOTE: The path "-" streams the paths from stdin (one per line), so a batch can be piped in
+	for path in paths:
+		if path != "-":
+			yield path
+			continue
+		for line in sys.stdin:
+			if line.strip():
+				yield line.strip()
+
+
+def main(argv: Optional[List[str]] = None, solverName: Optional[str] = None) -> None:
+	## Usage: python BatchSolver.py <solver> <instance files...> [--timer seconds] [--workers n] [--hyperparameters json] [--noTours]
+	## NOTE: The solver modules call this with their own solver (e.g. python AntSystem.py <instance files...>)
+	parser = argparse.ArgumentParser(description="Solves TSPLIB and instance files, writing a JSON line per result as it finishes")
+	if solverName is None:
+		parser.add_argument("solver", choices=tuple(solverTypes))
+	parser.add_argument("paths", nargs="+", help="the instance files (or - to read their paths from stdin)")
+	parser.add_argument("--timer", type=float, default=1.0, help="the seconds spent on each instance (-1 runs each solver until it finishes)")
+	parser.add_argument("--workers", type=int, default=None, help="the number of worker processes (the number of CPUs by default)")
+	parser.add_argument("--hyperparameters", type=json.loads, default=None, help="the hyperparameters of the solver as a JSON object")
+	parser.add_argument("--noTours", action="store_true", help="leaves the tours out of the results")
+	arguments = parser.parse_args(argv)
+
+	batchSolver = BatchSolver(solverName or arguments.solver, arguments.hyperparameters, arguments.timer, arguments.workers)
+	for result in batchSolver.solve(_readInstancePaths(arguments.paths)):
+		print(json.dumps(result.toDict(includeTour=not arguments.noTours)), flush=True)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,149 @@
+from typing import List, Optional, Tuple, Union
+import numpy as np
+
+from supportingDS import TSPInstance
+
+distanceType = Union[int, float]
+cityType = int
+
+
+class Crossover:
+	## This breeds child tours from pairs of parent tours, where every operator takes linear time in the number of cities
+	## 	- heuristic: a few random cities, followed by the closer of the next unused cities of either parent
+	## 	- order (OX): a segment of the first parent, with the rest of the cities in the order of the second parent
+	## 	- partiallyMapped (PMX): a segment of the first parent, with the rest of the cities where the second parent has
+	## 	  them (or where the segment mapping moves them)
+	## 	- edgeRecombination (ERX): a tour that is built from the edges of both parents
+	## NOTE: The used cities are tracked in boolean masks (rather than by searching the child), and a whole generation
+	## is bred by a single call of breed (where the order crossover is vectorized over the population)
+	supportedOperators = ("heuristic", "order", "partiallyMapped", "edgeRecombination")
+
+	def __init__(self, instance: TSPInstance, operator: str = "heuristic", rng: Optional[np.random.Generator] = None) -> None:
+		if operator not in self.supportedOperators:
+			raise Exception(f"The crossover operator {operator} is not supported, it needs to be one of {self.supportedOperators}")
+		self.TSPInstance = instance
+		self.numberOfCities = instance.numberOfCities
+		self.operator = operator
+		self.rng = np.random.default_rng() if rng is None else rng
+
+	def breed(self, firstParents: np.ndarray, secondParents: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+		## This returns the (children x cities) array of the child of each pair of parents (i.e. of each row)
+		firstParents, secondParents = np.broadcast_arrays(np.asarray(firstParents, dtype=np.int64), np.asarray(secondParents, dtype=np.int64))
+		children = np.empty(firstParents.shape, dtype=np.int64) if out is None else out
+		if self.operator == "order":
+			children[:] = self._orderCrossover(firstParents, secondParents)
+			return children
+
+		crossover = getattr(self, f"_{self.operator}Crossover")
+		for child, (firstParent, secondParent) in enumerate(zip(firstParents.tolist(), secondParents.tolist())):
+			children[child] = crossover(firstParent, secondParent)
+		return children
+
+	def _segments(self, numberOfChildren: int) -> Tuple[np.ndarray, np.ndarray]:
+		## The [start, end) segments of the first parents, which are never empty (nor the whole tour)
+		starts = self.rng.integers(0, self.numberOfCities, size=numberOfChildren)
+		lengths = self.rng.integers(1, max(self.numberOfCities, 2), size=numberOfChildren)
+		return starts, np.minimum(starts + lengths, self.numberOfCities)
+
+	def _heuristicCrossover(self, firstParent: List[cityType], secondParent: List[cityType]) -> List[cityType]:
+		## The child starts with a few random cities, and is then extended by the closer (to its last city) of the next
+		## unused city of each parent
+		## NOTE: Each parent is walked by a pointer that only moves forward (over the used cities), so this is O(n)
+		numberOfCities, distance = self.numberOfCities, self.TSPInstance.distance
+		numberOfSeeds = min(max(2, numberOfCities // 10), numberOfCities)
+		child = self.rng.choice(numberOfCities, size=numberOfSeeds, replace=False).tolist()
+		isUsed = [False] * numberOfCities
+		for city in child:
+			isUsed[city] = True
+
+		i = j = 0
+		while len(child) < numberOfCities:
+			while isUsed[firstParent[i]]:
+				i += 1
+			while isUsed[secondParent[j]]:
+				j += 1
+			lastCity = child[-1]
+			if distance(lastCity, firstParent[i]) < distance(lastCity, secondParent[j]):
+				city = firstParent[i]
+			else:
+				city = secondParent[j]
+			isUsed[city] = True
+			child.append(city)
+		return child
+
+	def _orderCrossover(self, firstParents: np.ndarray, secondParents: np.ndarray) -> np.ndarray:
+		## Each child keeps a segment of its first parent, and the other positions (from the end of the segment, wrapping
+		## around) get the cities that aren't in the segment, in the order the second parent visits them (from the same place)
+		numberOfChildren, numberOfCities = firstParents.shape
+		starts, ends = self._segments(numberOfChildren)
+		positions = np.arange(numberOfCities)
+		inSegment = (positions >= starts[:, None]) & (positions < ends[:, None])
+
+		isSegmentCity = np.zeros((numberOfChildren, numberOfCities), dtype=bool)
+		isSegmentCity[np.nonzero(inSegment)[0], firstParents[inSegment]] = True
+
+		## NOTE: Each row has the same number of cities outside of its segment as positions outside of its segment, and
+		## boolean indexing keeps the order within each row, so the cities are placed with a single assignment
+		rotatedPositions = (ends[:, None] + positions) % numberOfCities
+		rotatedSecondParents = np.take_along_axis(secondParents, rotatedPositions, axis=1)
+		isKept = ~np.take_along_axis(isSegmentCity, rotatedSecondParents, axis=1)
+		isFree = ~np.take_along_axis(inSegment, rotatedPositions, axis=1)
+
+		children = np.empty((numberOfChildren, numberOfCities), dtype=np.int64)
+		children[inSegment] = firstParents[inSegment]
+		children[np.nonzero(isFree)[0], rotatedPositions[isFree]] = rotatedSecondParents[isKept]
+		return children
+
+	def _partiallyMappedCrossover(self, firstParent: List[cityType], secondParent: List[cityType]) -> List[cityType]:
+		## The child starts as the second parent, and each position of the segment is given the city of the first parent
+		## by swapping it with the position that the child has it at (which moves the displaced city along the mapping)
+		## NOTE: The positions of the child's cities are kept up to date, so each swap is O(1)
+		(start,), (end,) = self._segments(1)
+		child = list(secondParent)
+		positions = [0] * self.numberOfCities
+		for position, city in enumerate(child):
+			positions[city] = position
+
+		for position in range(start, end):
+			city = firstParent[position]
+			otherPosition = positions[city]
+			displacedCity = child[position]
+			child[position], child[otherPosition] = city, displacedCity
+			positions[city], positions[displacedCity] = position, otherPosition
+		return child
+
+	def _edgeRecombinationCrossover(self, firstParent: List[cityType], secondParent: List[cityType]) -> List[cityType]:
+		## The child follows the edges of either parent, always moving to the neighbour with the fewest unused neighbours
+		## left (so the cities that are about to run out of edges are visited first), or to an unused city if it is stuck
+		## NOTE: Every city has at most 4 neighbours, and the unused cities are found by a pointer that only moves forward
+		## (along the first parent), so this is O(n)
+		numberOfCities = self.numberOfCities
+		neighbours = [[] for _ in range(numberOfCities)]
+		for parent in (firstParent, secondParent):
+			for position, city in enumerate(parent):
+				for neighbour in (parent[position-1], parent[(position+1) % numberOfCities]):
+					if neighbour != city and neighbour not in neighbours[city]:
+						neighbours[city].append(neighbour)
+
+		isUsed = [False] * numberOfCities
+		city = firstParent[0]
+		child = []
+		unusedPointer = 0
+		## NOTE: The ties are broken with random numbers drawn for the whole child at once (rather than one draw per step)
+		tieBreakers = self.rng.random(numberOfCities).tolist()
+		while True:
+			isUsed[city] = True
+			child.append(city)
+			if len(child) == numberOfCities:
+				return child
+			for neighbour in neighbours[city]:
+				neighbours[neighbour].remove(city)
+
+			if neighbours[city]:
+				fewestNeighbours = min(len(neighbours[neighbour]) for neighbour in neighbours[city])
+				candidates = [neighbour for neighbour in neighbours[city] if len(neighbours[neighbour]) == fewestNeighbours]
+				city = candidates[int(tieBreakers[len(child)] * len(candidates))]
+			else:
+				while isUsed[firstParent[unusedPointer]]:
+					unusedPointer += 1
+				city = firstParent[unusedPointer]
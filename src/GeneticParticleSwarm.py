@@ -1,45 +1,25 @@
 # https://www.researchgate.net/publication/281415529_A_combination_of_genetic_algorithm_and_particle_swarm_optimization_method_for_solving_traveling_salesman_problem
-import math
-import random
-from typing import List, Dict, Set, Tuple, Optional, Any
+import sys
+from typing import List, Dict, Set, Tuple, Optional, Any, Union
+import numpy as np
 
-from ParticleSwarm import ParticleSwarm
+from ParticleSwarm import ParticleSwarm, Particle, Swarm
+from supportingDS import Tour
+from LocalSearch import LocalSearch
+from Crossover import Crossover
 
-## TODO: It is possible that distance is float -- we need to check this
-distanceType = int 
+distanceType = Union[int, float]
 cityType = int
-matrixType = List[List[distanceType]]
+matrixType = Union[List[List[distanceType]], np.ndarray]
 neighboursType = Set[cityType]
-tourType = Dict[cityType, None]
+tourType = Tour
 velocityType = List[Tuple[cityType, cityType]]
 
 
 
-class Particle:
-	def __init__(self, startTour: tourType, startVelocity: Any, startDistance: int) -> None:
-		self.bestTour: tourType = startTour
-		self.currentTour: tourType = startTour
-		self.nextTour: Optional[tourType] = None
-
-		self.bestDistance: int = startDistance
-		self.currentDistance: int = startDistance
-
-		self.currentVelocity: velocityType = startVelocity
-		self.nextVelocity: Optional[velocityType] = None
-
-		return None
-
-class GeneticParticle:
-	def __init__(self, startTour: tourType, startDistance: int) -> None:
-		self.bestTour: tourType = startTour
-		self.bestDistance: int = startDistance
-
-		self.currentTour: tourType = startTour
-		self.currentDistance: int = startDistance
-
-
-
-
+class GeneticParticle(Particle):
+	## A genetic particle only has a current and a best tour (it moves by crossover, rather than by a velocity)
+	__slots__ = ()
 
 
 class GeneticParticleSwarm(ParticleSwarm):
@@ -52,97 +32,87 @@ class GeneticParticleSwarm(ParticleSwarm):
 			"alpha": 0.7,			    ## The cognitive factor - Lecture recommends 0.5 <= x <= 1
 			"beta": 2.8, 			    ## The social learning factor - Lecture recommends 2.5 <= x <= 3.0
 			"theta": 0.50,              ## THe inertia function - Lecture Recommends 0.4 <= x <= 0.8
+			"localSearch": False,		## improves every child tour with 2-opt/Or-opt before it is evaluated
+			"localSearchNeighbours": 10,## number of nearest cities searched for the local search moves of a city
+			"tourCacheSize": 0,			## number of child tours (and local search results) kept in an LRU cache (0 means no cache)
+			"crossover": "heuristic",	## the crossover operator that breeds the children (see Crossover.supportedOperators)
 		}
-
-	def _createParticles(self):
-		particles = set()
-		for _ in range(self.hyperparameters["numberOfParticles"]):
-			startTour = self._selectParticleStartTour()
-			startDistance = self._calculateTourDistance(startTour)
-			particles.add(GeneticParticle(startTour, startDistance))
+		self.localSearch: Optional[LocalSearch] = None
+		self.crossover: Optional[Crossover] = None
+
+	_supportedHyperparameters: Dict[str, Dict[str, Any]] = {
+		**ParticleSwarm._supportedHyperparameters,
+		"localSearch": {"valType": bool},
+		"crossover": {"valType": str,
+						"options": Crossover.supportedOperators
+		},
+		"localSearchNeighbours": {"valType": int,
+							"start": 1,
+							"end": sys.maxsize
+		},
+	}
+
+	def _initializeDataStructures(self, distanceMatrix: matrixType, numberOfCities: int) -> None:
+		super()._initializeDataStructures(distanceMatrix, numberOfCities)
+		self.crossover = Crossover(self.TSPInstance, self.hyperparameters["crossover"])
+		## NOTE: The local search of a previous run is bound to its instance, so it is always replaced (or removed)
+		self.localSearch = None
+		if self.hyperparameters["localSearch"]:
+			self.localSearch = LocalSearch(self.TSPInstance, self.hyperparameters["localSearchNeighbours"])
+
+	def _createParticles(self) -> List[GeneticParticle]:
+		self.swarm = self._createSwarm()
+		particles = [GeneticParticle(self.swarm, index) for index in range(self.hyperparameters["numberOfParticles"])]
+		for particle in particles:
+			particle.currentTour = self._selectParticleStartTour()
+		self._initializeParticleDistances()
 		return particles
 
+	def _createSwarm(self) -> Swarm:
+		return Swarm(self.hyperparameters["numberOfParticles"], self.TSPInstance.numberOfCities,
+						self.TSPInstance.distanceMatrix.dtype, hasVelocities=False)
+
 	def _selectParticleStartTour(self):
 		tour, _ = self.TSPInstance.nearestNeighbour()
 		return tour
 
 	def _heuristicCrossover(self, tour1: tourType, tour2: tourType) -> tourType:
-		## THis takes two tours and ouputs a single one
-		tourList1 = self._tourToList(tour1)
-		tourList2 = self._tourToList(tour2)
-
-		outputTourList = []
-		outputTourDict = {}
-		x = 0
-		while x < max(2,math.ceil(self.TSPInstance.numberOfCities//10)):
-			selectedCity = self._selectRandomCity()
-			if selectedCity not in outputTourList:
-				outputTourList.append(selectedCity)
-				outputTourDict[selectedCity] = True
-				x += 1
-
-		## NOTE: Divergences between report and pseudocode
-		## There's somehting fucked with the pseucode presented in the report
-		## There's some weird expression in the while loop condition, and the
-		## counters i and j are set to 2 (I believe they are using 1-indexing)
-		i = j = 0
-		while len(outputTourList) != self.TSPInstance.numberOfCities:
-			if tourList1[i] in outputTourDict and tourList2[j] in outputTourDict:
-				## we skip crossover iteration, and increment both counters
-				i =  min(i+1, self.TSPInstance.numberOfCities-1)
-				j =  min(j+1, self.TSPInstance.numberOfCities-1)
-			elif tourList1[i] in outputTourDict:
-				## We concatenate tourList[j] into the output (since it is not there yet)
-				outputTourDict[tourList2[j]] = True
-				outputTourList.append(tourList2[j])
-				j =  min(j+1, self.TSPInstance.numberOfCities-1)
-			elif tourList2[j] in outputTourDict:
-				## We concatenate tourList[i] into the output (since it is not there yet)
-				outputTourDict[tourList1[i]] = True
-				outputTourList.append(tourList1[i])
-				i =  min(i+1, self.TSPInstance.numberOfCities-1)
-			else:
-				lastCity = outputTourList[-1]
-				if self.TSPInstance.distance(lastCity, tourList1[i]) \
-					 < self.TSPInstance.distance(lastCity, tourList2[j]):
-					outputTourList.append(tourList1[i])
-					outputTourDict[tourList1[i]] = True
-					i =  min(i+1, self.TSPInstance.numberOfCities-1)
-				else:
-					outputTourList.append(tourList2[j])
-					outputTourDict[tourList2[j]] = True
-					j =  min(j+1, self.TSPInstance.numberOfCities-1)
-
-		return outputTourDict
+		## THis takes two tours and ouputs a single one (see Crossover)
+		return Tour(self.crossover._heuristicCrossover(tour1.tolist(), tour2.tolist()))
 
 	def _runParticleMainBody(self) -> None:
-		for particle in self.particles:
-			childTour = self._heuristicCrossover(particle.bestTour, self._bestTour)
-			childTourDistance = self._calculateTourDistance(childTour)
-			
-			if childTourDistance < particle.bestDistance:
-				particle.childTour = childTour
-				particle.bestDistance = childTourDistance
-
-			if childTourDistance < self._bestDistance:
-				self._bestTour = childTour
-				self._bestDistance = childTourDistance
-				
-		## Insert the selected City at the beginning of both solutions
-	def _tourToList(self, tour: tourType) -> List[int]:
-		return list(tour.keys())
-
-	def _selectRandomCity(self):
-		return random.randint(0, self.TSPInstance.numberOfCities-1)
+		## NOTE: Every particle breeds a child with the best tour, and the children are evaluated together as a generation
+		self.iterationCount += 1
+		childTours = self.crossover.breed(self.swarm.bestTours, self._bestTour.cities, out=self.swarm.nextTours)
+
+		if self.localSearch is not None:
+			childDistances = np.empty_like(self.swarm.bestDistances)
+			for index, childTour in enumerate(childTours):
+				improvedTour, childDistances[index] = self._improveChildTour(Tour(childTour))
+				childTours[index] = improvedTour.cities
+		else:
+			childDistances = self._evaluateTours(childTours)
+
+		## A child replaces the best tour of its particle if it is shorter
+		isImproved = childDistances < self.swarm.bestDistances
+		self.swarm.bestTours[isImproved] = childTours[isImproved]
+		self.swarm.bestDistances[isImproved] = childDistances[isImproved]
+		self._updateBestTour()
+
+	def _improveChildTour(self, childTour: tourType) -> Tuple[tourType, distanceType]:
+		## NOTE: The same children are bred again and again, so their local search results are cached (if there is a cache)
+		if self.tourCache is not None:
+			tour, tourDistance = self.tourCache.improveTour(childTour.cities, self.localSearch.improveTour)
+		else:
+			tour, tourDistance = self.localSearch.improveTour(childTour.cities)
+		return Tour(tour), tourDistance
 
 
 def main() -> None:
-	distanceMatrix = [] ## NOTE: This will need to be loaded in from a file (or defined here)
-	numberOfCities = len(distanceMatrix)
-
-	## NOTE: You can add another potiional argument "hyperparameters" to tune the hyperparmaeters
-	GPS = GeneticParticleSwarm()
-	GPS.run(distanceMatrix, numberOfCities, timer=59.0)
+	## Usage: python GeneticParticleSwarm.py <instance files...> [--timer seconds] [--workers n] [--hyperparameters json] [--noTours]
+	## NOTE: The import is here, as the BatchSolver module depends on this module
+	from BatchSolver import main as solveBatch
+	solveBatch(solverName="GeneticParticleSwarm")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+import os
+import sys
+import struct
+import itertools
+from typing import Any, Iterator, List, Optional, Tuple, Union
+import numpy as np
+
+from supportingDS import TSPInstance, PackedSymmetricMatrix
+
+## A binary instance file is a fixed size header followed by the raw distance matrix (row-major, little-endian)
+## 	- The header holds the magic bytes, the format version, the storage, the distance type and the number of cities
+## 	- The matrix is either the whole (n x n) matrix ("dense"), or its upper triangle ("packed", see PackedSymmetricMatrix)
+## NOTE: The matrix is opened with np.memmap, so opening a file costs next to nothing, and the processes
+## that open the same file share its pages through the page cache (instead of each having their own copy)
+instanceFileMagic = b"TSPINST\x00"
+instanceFileVersion = 1
+instanceFileStorages = ("dense", "packed")
+headerFormat = "<8sHH8sQ"
+## NOTE: The header is padded, so that the matrix starts on an aligned offset
+headerSize = 64
+
+
+def writeInstanceHeader(instanceFile: Any, numberOfCities: int, dtype: Any, storage: str) -> None:
+	dtype = np.dtype(dtype).newbyteorder("<")
+	header = struct.pack(headerFormat, instanceFileMagic, instanceFileVersion, instanceFileStorages.index(storage),
+							dtype.str.encode("ascii"), numberOfCities)
+	instanceFile.write(header.ljust(headerSize, b"\x00"))
+
+
+def readInstanceHeader(path: str) -> Tuple[int, np.dtype, str]:
+	with open(path, "rb") as instanceFile:
+		header = instanceFile.read(headerSize)
+	if len(header) != headerSize:
+		raise Exception(f"The file {path} is too small to be an instance file")
+
+	magic, version, storageIndex, dtype, numberOfCities = struct.unpack_from(headerFormat, header)
+	if magic != instanceFileMagic:
+		raise Exception(f"The file {path} is not an instance file")
+	if version != instanceFileVersion:
+		raise Exception(f"The instance file version {version} is not supported (expected {instanceFileVersion})")
+	if storageIndex >= len(instanceFileStorages):
+		raise Exception(f"The instance file storage {storageIndex} is not supported")
+	return numberOfCities, np.dtype(dtype.rstrip(b"\x00").decode("ascii")), instanceFileStorages[storageIndex]
+
+
+def matrixSize(numberOfCities: int, storage: str) -> int:
+	return PackedSymmetricMatrix.packedSize(numberOfCities) if storage == "packed" else numberOfCities * numberOfCities
+
+
+def openInstanceFile(path: str, mode: str = "r") -> Tuple[Union[np.memmap, PackedSymmetricMatrix], int]:
+	## This maps the matrix of the file into memory (read-only by default), without reading it
+	numberOfCities, dtype, storage = readInstanceHeader(path)
+	expectedSize = headerSize + matrixSize(numberOfCities, storage) * dtype.itemsize
+	if os.path.getsize(path) != expectedSize:
+		raise Exception(f"The instance file {path} should have {expectedSize} bytes, not {os.path.getsize(path)}")
+
+	if storage == "packed":
+		values = np.memmap(path, dtype=dtype, mode=mode, offset=headerSize, shape=(matrixSize(numberOfCities, storage),))
+		return PackedSymmetricMatrix(numberOfCities, values), numberOfCities
+	return np.memmap(path, dtype=dtype, mode=mode, offset=headerSize, shape=(numberOfCities, numberOfCities)), numberOfCities
+
+
+def writeInstanceFile(path: str, instance: TSPInstance) -> None:
+	## The matrix is written with the same storage (dense or packed) and distance type as the instance
+	distanceMatrix = instance.distanceMatrix
+	storage = "packed" if instance.isPacked else "dense"
+	values = distanceMatrix.values if instance.isPacked else distanceMatrix
+	with open(path, "wb") as instanceFile:
+		writeInstanceHeader(instanceFile, instance.numberOfCities, values.dtype, storage)
+		np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<")).tofile(instanceFile)
+
+
+def _readMatrixRows(lines: List[str], dtype: Any, delimiter: Optional[str]) -> np.ndarray:
+	try:
+		return np.loadtxt(lines, dtype=dtype, delimiter=delimiter, ndmin=2)
+	except ValueError as error:
+		raise Exception(f"The matrix rows can't be read as {np.dtype(dtype)} distances ({error})")
+
+
+def _inferDistanceType(line: str, delimiter: Optional[str]) -> np.dtype:
+	## NOTE: The type is inferred from the first row, as we never look at the whole file before converting it
+	try:
+		np.loadtxt([line], dtype=np.int64, delimiter=delimiter)
+		return np.dtype(np.int64)
+	except ValueError:
+		return np.dtype(np.float64)
+
+
+def _nonEmptyLines(textFile: Any) -> Iterator[str]:
+	for line in textFile:
+		if line.strip():
+			yield line
+
+
+def convertMatrixFile(textPath: str, instancePath: str, delimiter: Optional[str] = None, dtype: Optional[Any] = None,
+						storage: str = "dense", chunkSize: int = 256) -> int:
+	## This converts a text matrix (one row per line, separated by whitespace or a delimiter such as ",") into an instance file
+	## NOTE: The text file is read chunkSize rows at a time, and each chunk is written straight into the mapped
+	## instance file, so neither the text nor the whole matrix is ever held in memory
+	if storage not in instanceFileStorages:
+		raise Exception(f"The storage {storage} is not supported, it needs to be one of {instanceFileStorages}")
+
+	with open(textPath, "r") as textFile:
+		lines = _nonEmptyLines(textFile)
+		firstLine = next(lines, None)
+		if firstLine is None:
+			raise Exception(f"The matrix file {textPath} is empty")
+		if delimiter is None and "," in firstLine:
+			delimiter = ","
+
+		dtype = _inferDistanceType(firstLine, delimiter) if dtype is None else np.dtype(dtype)
+		if dtype not in [np.dtype(supportedType) for supportedType in TSPInstance.supportedDistanceTypes]:
+			raise Exception(f"The distance type {dtype} is not supported, it needs to be one of {[np.dtype(supportedType).name for supportedType in TSPInstance.supportedDistanceTypes]}")
+		numberOfCities = _readMatrixRows([firstLine], dtype, delimiter).shape[1]
+
+		with open(instancePath, "wb") as instanceFile:
+			writeInstanceHeader(instanceFile, numberOfCities, dtype, storage)
+			instanceFile.truncate(headerSize + matrixSize(numberOfCities, storage) * dtype.itemsize)
+		matrix, _ = openInstanceFile(instancePath, mode="r+")
+
+		rowStart = 0
+		lines = itertools.chain([firstLine], lines)
+		while True:
+			chunk = list(itertools.islice(lines, chunkSize))
+			if not chunk:
+				break
+			rows = _readMatrixRows(chunk, dtype, delimiter)
+			if rows.shape[1] != numberOfCities or rowStart + len(rows) > numberOfCities:
+				raise Exception(f"The matrix file {textPath} needs to contain a ({numberOfCities} x {numberOfCities}) matrix")
+
+			if storage == "packed":
+				_writePackedRows(matrix, rows, rowStart)
+			else:
+				matrix[rowStart:rowStart + len(rows)] = rows
+			rowStart += len(rows)
+
+	if rowStart != numberOfCities:
+		raise Exception(f"The matrix file {textPath} has {rowStart} rows, but it needs {numberOfCities}")
+	(matrix.values if storage == "packed" else matrix).flush()
+	return numberOfCities
+
+
+def _writePackedRows(matrix: PackedSymmetricMatrix, rows: np.ndarray, rowStart: int) -> None:
+	## NOTE: The rows are checked for symmetry against the rows already written (and within the chunk itself)
+	rowEnd = rowStart + len(rows)
+	cities = np.arange(rowStart, rowEnd)
+	isSymmetric = np.array_equal(rows[:, rowStart:rowEnd], rows[:, rowStart:rowEnd].T)
+	if rowStart > 0:
+		isSymmetric = isSymmetric and np.array_equal(rows[:, :rowStart], matrix[cities[:, None], np.arange(rowStart)])
+	if not isSymmetric:
+		raise Exception("The packed storage can only be used with a symmetric distance matrix")
+
+	for city, row in zip(cities, rows):
+		index = matrix.index(city, city)
+		matrix.values[index:index + matrix.numberOfCities - city] = row[city:]
+
+
+def main():
+	## Usage: python InstanceFile.py <matrix file> <instance file> [dense|packed]
+	if len(sys.argv) not in (3, 4):
+		raise Exception("Usage: python InstanceFile.py <matrix file> <instance file> [dense|packed]")
+	storage = sys.argv[3] if len(sys.argv) == 4 else "dense"
+	numberOfCities = convertMatrixFile(sys.argv[1], sys.argv[2], storage=storage)
+	print(f"Converted a matrix with {numberOfCities} cities into {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,272 @@
+## This runs several independent MaxMinAntSystem colonies (islands), one per process, which
+## periodically exchange their best tours (migration) to increase the diversity of the search
+import sys
+import queue
+import traceback
+import multiprocessing
+from typing import Any, Dict, List, Optional, Set, Union
+import numpy as np
+
+from MinMaxAntSystem import MaxMinAntSystem
+from supportingDS import TSPInstance, TSPSolver, Tour, InstanceHandle, InstancePublisher, asTSPInstance
+
+distanceType = Union[int, float]
+cityType = int
+matrixType = Union[List[List[distanceType]], np.ndarray]
+neighboursType = Set[cityType]
+tourType = Tour
+
+
+class MigratingMaxMinAntSystem(MaxMinAntSystem):
+	## This is the colony that runs on each island, which sends its best tour to its neighbouring islands
+	## (and adopts the best tour it receives) every migrationInterval iterations
+	def __init__(self, islandIndex: int, inbox: Any, neighbourInboxes: List[Any], resultQueue: Any, migrationInterval: int,
+					islandStopEvent: Optional[Any] = None) -> None:
+		super().__init__()
+		self.islandIndex = islandIndex
+		self.islandStopEvent = islandStopEvent
+		self.inbox = inbox
+		self.neighbourInboxes = neighbourInboxes
+		self.resultQueue = resultQueue
+		self.migrationInterval = migrationInterval
+		self._lastSentDistance = float('inf')
+
+	def _shouldStop(self) -> bool:
+		## NOTE: The islands are stopped by the parent process (through an event that is shared between the processes)
+		return super()._shouldStop() or (self.islandStopEvent is not None and self.islandStopEvent.is_set())
+
+	def _runIteration(self) -> None:
+		super()._runIteration()
+		if self.iterationCount % self.migrationInterval == 0:
+			self._sendMigrant()
+			self._receiveMigrants()
+
+	def _executeNewBestTourTrigger(self, bestDistance):
+		super()._executeNewBestTourTrigger(bestDistance)
+		## The parent process keeps track of the best tour across all of the islands
+		self.resultQueue.put((self.islandIndex, self._getBestTourArray(), bestDistance, self.iterationCount))
+
+	def _getBestTourArray(self) -> np.ndarray:
+		return self._bestTour.cities.astype(np.int32)
+
+	def _sendMigrant(self) -> None:
+		## NOTE: We only send the best tour if it has improved since it was last sent
+		if self._bestDistance < self._lastSentDistance:
+			migrant = (self._getBestTourArray(), self._bestDistance)
+			for neighbourInbox in self.neighbourInboxes:
+				neighbourInbox.put(migrant)
+			self._lastSentDistance = self._bestDistance
+
+	def _receiveMigrants(self) -> None:
+		bestMigrant = None
+		while True:
+			try:
+				migrant = self.inbox.get_nowait()
+			except queue.Empty:
+				break
+			if bestMigrant is None or migrant[1] < bestMigrant[1]:
+				bestMigrant = migrant
+
+		if bestMigrant is not None:
+			self._adoptMigrant(*bestMigrant)
+
+	def _adoptMigrant(self, tour: np.ndarray, tourDistance: distanceType) -> None:
+		## A better migrant replaces the best tour of the island, and reinforces its edges like an iteration-best tour would
+		if tourDistance >= self._bestDistance:
+			return
+
+		self._bestTour = Tour(tour)
+		self._bestDistance = tourDistance
+		self._publishBestResult()
+		## NOTE: The migrant has already been reported by its own island, so we don't call _executeNewBestTourTrigger
+		self._calculateTauMax(tourDistance)
+		self._lastSentDistance = tourDistance
+
+		startCities, endCities = self._getBestIterationEdges(np.asarray(tour, dtype=np.int64)[None, :])
+		deposit = 1 / tourDistance if tourDistance != 0 else float("inf")
+		self._depositPheremoneEdges(startCities, endCities, np.full(len(startCities), deposit))
+		self._employMinMaxPheremoneBoundaries()
+		self._updateChoiceInfo()
+
+
+class IslandMaxMinAntSystem(TSPSolver):
+	def __init__(self) -> None:
+		super().__init__()
+		self.TSPInstance: Optional[TSPInstance] = None
+		self._bestTour = None
+		self._bestDistance = float('inf')
+
+		self.hyperparameters: Dict[str, Any] = {
+			"numberOfIslands": 4,		## number of colonies (and processes) -- ideally one per core
+			"migrationInterval": 10,	## number of iterations between each exchange of best tours
+			"topology": "ring",			## which islands receive an island's best tour ("ring" or "fullyConnected")
+			"seed": None,				## seeds the random streams of every island so that runs are reproducible
+			"colonyHyperparameters": {}	## hyperparameters passed to the MaxMinAntSystem of each island
+		}
+
+	_supportedHyperparameters: Dict[str, Dict[str, Any]] = {
+		"numberOfIslands": {"valType": int,
+							"start": 1,
+							"end": sys.maxsize
+		},
+		"migrationInterval": {"valType": int,
+							"start": 1,
+							"end": sys.maxsize
+		},
+		"topology": {"valType": str,
+					"options": ("ring", "fullyConnected")
+		},
+		"seed": {"valType": int,
+					"start": 0,
+					"end": sys.maxsize
+		},
+		"colonyHyperparameters": {"valType": dict},
+	}
+
+
+	def _solve(self, distanceMatrix: matrixType, 
+					 numberOfCities: int, 
+					 hyperparameters: Optional[Dict[str, Any]] = None) -> None:
+		self._setHyperparameters(hyperparameters)
+		self.TSPInstance = asTSPInstance(distanceMatrix, numberOfCities)
+		## NOTE: The nearest neighbour tour means that there is a best tour to return before any island reports back
+		self._bestTour, self._bestDistance = self.TSPInstance.nearestNeighbour()
+		self._publishBestResult()
+
+		numberOfIslands = self.hyperparameters["numberOfIslands"]
+		## NOTE: The instance is published once, and every island attaches to it (see InstancePublisher)
+		publisher = InstancePublisher(self.TSPInstance)
+		## NOTE: We use spawn as the solver runs in a background thread (forking a threaded process is unsafe)
+		context = multiprocessing.get_context("spawn")
+		resultQueue = context.Queue()
+		islandStopEvent = context.Event()
+		inboxes = [context.Queue() for _ in range(numberOfIslands)]
+		islandSeeds = np.random.SeedSequence(self.hyperparameters["seed"]).spawn(numberOfIslands)
+
+		islands = []
+		for islandIndex in range(numberOfIslands):
+			colonyHyperparameters = dict(self.hyperparameters["colonyHyperparameters"])
+			colonyHyperparameters["seed"] = int(islandSeeds[islandIndex].generate_state(1)[0])
+			neighbourInboxes = [inboxes[neighbour] for neighbour in self._getNeighbourIslands(islandIndex)]
+			islands.append(context.Process(target=_runIsland, daemon=True,
+											args=(islandIndex, publisher.handle, colonyHyperparameters,
+													inboxes[islandIndex], neighbourInboxes, resultQueue, self.hyperparameters["migrationInterval"],
+													islandStopEvent)))
+
+		for island in islands:
+			island.start()
+
+		try:
+			self._collectIslandResults(islands, resultQueue, islandStopEvent)
+		finally:
+			## NOTE: An island that doesn't stop within the grace period (e.g. it is stuck) is terminated
+			islandStopEvent.set()
+			for island in islands:
+				island.join(self.gracePeriod)
+				if island.is_alive():
+					island.terminate()
+					island.join()
+			publisher.close()
+
+		return None
+
+	def _getNeighbourIslands(self, islandIndex: int) -> List[int]:
+		numberOfIslands = self.hyperparameters["numberOfIslands"]
+		if numberOfIslands == 1:
+			return []
+		if self.hyperparameters["topology"] == "ring":
+			return [(islandIndex + 1) % numberOfIslands]
+		return [neighbour for neighbour in range(numberOfIslands) if neighbour != islandIndex]
+
+	def _collectIslandResults(self, islands: List[Any], resultQueue: Any, islandStopEvent: Any) -> None:
+		## Each island reports its new best tours (with the iteration that found them), and a None tour when it has finished
+		## NOTE: When this solver is asked to stop, the islands are asked to stop too (and their last reports are collected)
+		runningIslands = len(islands)
+		while runningIslands:
+			if self._shouldStop() and not islandStopEvent.is_set():
+				islandStopEvent.set()
+			try:
+				islandIndex, tour, tourDistance, iteration = resultQueue.get(timeout=0.1)
+			except queue.Empty:
+				## NOTE: If an island process dies without reporting back, we would otherwise wait forever
+				if not any(island.is_alive() for island in islands):
+					break
+				continue
+
+			if tour is None:
+				## NOTE: The last report of a failed island has the traceback of its exception in place of an iteration,
+				## which stops the other islands (as the exception leaves this method, see _solve)
+				if iteration is not None:
+					raise Exception(f"The island {islandIndex} failed with the exception:\n{iteration}")
+				runningIslands -= 1
+			elif tourDistance < self._bestDistance:
+				## NOTE: The islands run side by side, so the iteration of an improvement is that of the island that found it
+				self.iterationCount = iteration
+				self._bestTour = Tour(tour)
+				self._bestDistance = tourDistance
+				self._publishBestResult()
+
+
+	def _setHyperparameters(self, hyperparameters: Optional[Dict[str, any]] = None) -> None:
+		## Checks the hyperparameter object type
+		if hyperparameters is None:
+			return
+		elif not isinstance(hyperparameters, dict):
+			raise Exception(f'The hyperparameters argument needs to be a dictionary, not a {type(hyperparameters)}')
+		
+		for key, val in hyperparameters.items():
+			## Checks parameter existence
+			try:
+				definition = IslandMaxMinAntSystem._supportedHyperparameters[key]
+			except KeyError as e:
+				raise Exception(f"The parameter {key} is not a supported hyperparameter by the IslandMaxMinAntSystem class") from e
+
+			## Checks parameter  type
+			if not isinstance(val, definition['valType']):
+				raise Exception(f"The parameter {key} needs to be a {definition['valType']}, not a {type(val)}")
+				
+			## Checks parameter value
+			if definition['valType'] in (int, float):
+				if not (definition['start'] <= val <= definition['end']):
+					raise Exception(f"The parameter {key} needs to be a value in between {definition['start']} and {definition['end']}")
+			elif 'options' in definition and val not in definition['options']:
+				raise Exception(f"The parameter {key} needs to be one of {definition['options']}")
+			
+			## NOTE: The colony hyperparameters are checked here, rather than failing every island once it has started
+			if key == "colonyHyperparameters":
+				MaxMinAntSystem()._setHyperparameters(val)
+
+			## Finally set the new hyperparameter value
+			self.hyperparameters[key] = val
+
+
+def _runIsland(islandIndex: int, instanceHandle: InstanceHandle, colonyHyperparameters: Dict[str, Any],
+				inbox: Any, neighbourInboxes: List[Any], resultQueue: Any, migrationInterval: int, islandStopEvent: Any) -> None:
+	instance, island, error = None, None, None
+	try:
+		instance = TSPInstance.attach(instanceHandle)
+		island = MigratingMaxMinAntSystem(islandIndex, inbox, neighbourInboxes, resultQueue, migrationInterval, islandStopEvent)
+		island._solve(instance, instance.numberOfCities, colonyHyperparameters)
+	except Exception:
+		## NOTE: The exception is sent as its traceback, as an exception can't always be pickled
+		error = traceback.format_exc()
+	finally:
+		## NOTE: Migrants that were never received would otherwise stop this process from exiting (see multiprocessing.Queue)
+		for neighbourInbox in neighbourInboxes:
+			neighbourInbox.cancel_join_thread()
+		resultQueue.put((islandIndex, None, None, error))
+		## NOTE: The island refers to the shared memory, so it is released before the instance is closed
+		island = None
+		if instance is not None:
+			instance.close()
+
+
+def main() -> None:
+	## Usage: python IslandAntSystem.py <instance files...> [--timer seconds] [--workers n] [--hyperparameters json] [--noTours]
+	## NOTE: The import is here, as the BatchSolver module depends on this module
+	from BatchSolver import main as solveBatch
+	solveBatch(solverName="IslandMaxMinAntSystem")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,143 @@
+from collections import deque
+from typing import List, Optional, Tuple, Union
+import numpy as np
+
+from supportingDS import TSPInstance
+
+distanceType = Union[int, float]
+cityType = int
+
+## NOTE: A move is only applied if it shortens the tour by more than this (so float distances can't make it cycle)
+improvementThreshold = 1e-10
+
+
+class LocalSearch:
+	## This improves a tour with 2-opt and Or-opt moves until it is locally optimal
+	## 	- The tour is an array of cities, together with the position of every city in the tour, so that the
+	## 	  successor/predecessor of a city and the delta of a move are found in O(1)
+	## 	- The moves of a city are only searched among its nearest neighbours (candidate lists), as an improving
+	## 	  move needs a new edge that is shorter than the edge it removes
+	## 	- Cities whose neighbourhood didn't change since they were last searched are skipped (don't-look bits),
+	## 	  i.e. only the queued cities are searched, and a move queues the cities at the end of the changed edges
+	## NOTE: The moves assume a symmetric distance matrix (a reversed segment has the same length)
+	def __init__(self, instance: TSPInstance, neighbourListSize: int = 10, maxSegmentLength: int = 3) -> None:
+		self.TSPInstance = instance
+		self.numberOfCities = instance.numberOfCities
+		self.maxSegmentLength = maxSegmentLength
+		## NOTE: Python lists are much faster than arrays for the scalar lookups of the search
+		self.neighbours: List[List[cityType]] = instance.candidateLists(neighbourListSize).tolist() if self.numberOfCities > 1 else []
+		self.distance = instance.distance
+
+	def improveTour(self, tour: np.ndarray, tourDistance: Optional[distanceType] = None) -> Tuple[np.ndarray, distanceType]:
+		## This returns the improved tour (a new array) and its distance
+		tour = np.array(tour, dtype=np.int64)
+		if self.numberOfCities < 5:
+			return tour, self.tourDistance(tour)
+
+		positions = np.empty(self.numberOfCities, dtype=np.int64)
+		positions[tour] = np.arange(self.numberOfCities)
+		self.tour, self.positions = tour, positions
+
+		queuedCities = deque(tour.tolist())
+		isQueued = [True] * self.numberOfCities
+		while queuedCities:
+			city = queuedCities.popleft()
+			isQueued[city] = False
+			changedCities = self._improveTwoOpt(city) or self._improveOrOpt(city)
+			if changedCities:
+				for changedCity in changedCities:
+					if not isQueued[changedCity]:
+						isQueued[changedCity] = True
+						queuedCities.append(changedCity)
+
+		self.tour = self.positions = None
+		## NOTE: The distance is recomputed, so that it is exact (rather than an accumulation of float deltas)
+		return tour, self.tourDistance(tour)
+
+	def tourDistance(self, tour: np.ndarray) -> distanceType:
+		return self.TSPInstance.tourDistance(tour)
+
+	def _successor(self, city: cityType) -> cityType:
+		return int(self.tour[(self.positions[city] + 1) % self.numberOfCities])
+
+	def _predecessor(self, city: cityType) -> cityType:
+		return int(self.tour[self.positions[city] - 1])
+
+	def _improveTwoOpt(self, city: cityType) -> Optional[Tuple[cityType, ...]]:
+		## A 2-opt move replaces the edges (a, b) and (c, d) with (a, c) and (b, d), where b and d are both the
+		## successors (or both the predecessors) of a and c, by reversing the path between them
+		distance = self.distance
+		for isSuccessor in (True, False):
+			nextCity = self._successor(city) if isSuccessor else self._predecessor(city)
+			removedDistance = distance(city, nextCity)
+			for neighbour in self.neighbours[city]:
+				addedDistance = distance(city, neighbour)
+				if addedDistance >= removedDistance:
+					break
+				neighbourNext = self._successor(neighbour) if isSuccessor else self._predecessor(neighbour)
+				if neighbour == nextCity or neighbourNext == city:
+					continue
+
+				delta = addedDistance + distance(nextCity, neighbourNext) - removedDistance - distance(neighbour, neighbourNext)
+				if delta < -improvementThreshold:
+					if isSuccessor:
+						self._reversePath(nextCity, neighbour)
+					else:
+						self._reversePath(neighbour, nextCity)
+					return (city, nextCity, neighbour, neighbourNext)
+		return None
+
+	def _improveOrOpt(self, city: cityType) -> Optional[Tuple[cityType, ...]]:
+		## An Or-opt move takes a segment of up to maxSegmentLength cities (starting at city) out of the tour,
+		## and inserts it (in either direction) between two neighbouring cities elsewhere in the tour
+		distance = self.distance
+		segmentEnd = city
+		for segmentLength in range(1, min(self.maxSegmentLength, self.numberOfCities - 3) + 1):
+			if segmentLength > 1:
+				segmentEnd = self._successor(segmentEnd)
+			previousCity, nextCity = self._predecessor(city), self._successor(segmentEnd)
+			removedDistance = distance(previousCity, city) + distance(segmentEnd, nextCity) - distance(previousCity, nextCity)
+			segmentStart = self.positions[city]
+
+			for neighbour in self.neighbours[city]:
+				if distance(city, neighbour) >= removedDistance:
+					break
+				## The segment can be inserted after the neighbour, or before it
+				for insertAfter in (neighbour, self._predecessor(neighbour)):
+					insertBefore = self._successor(insertAfter)
+					if (self.positions[insertAfter] - segmentStart) % self.numberOfCities < segmentLength or insertBefore == city:
+						continue
+
+					forwardDistance = distance(insertAfter, city) + distance(segmentEnd, insertBefore)
+					reversedDistance = distance(insertAfter, segmentEnd) + distance(city, insertBefore)
+					delta = min(forwardDistance, reversedDistance) - distance(insertAfter, insertBefore) - removedDistance
+					if delta < -improvementThreshold:
+						self._moveSegment(city, segmentLength, insertAfter, isReversed=reversedDistance < forwardDistance)
+						return (city, segmentEnd, previousCity, nextCity, insertAfter, insertBefore)
+		return None
+
+	def _reversePath(self, firstCity: cityType, lastCity: cityType) -> None:
+		## This reverses the path from firstCity to lastCity (following the tour, which can wrap around its end)
+		## NOTE: Reversing the rest of the tour gives the same cycle, so we always reverse the shorter of the two paths
+		n = self.numberOfCities
+		start, end = self.positions[firstCity], self.positions[lastCity]
+		pathLength = (end - start) % n + 1
+		if 2 * pathLength > n:
+			start, end = (end + 1) % n, (start - 1) % n
+			pathLength = n - pathLength
+
+		indices = (start + np.arange(pathLength)) % n
+		self.tour[indices] = self.tour[indices[::-1]]
+		self.positions[self.tour[indices]] = indices
+
+	def _moveSegment(self, segmentStartCity: cityType, segmentLength: int, insertAfter: cityType, isReversed: bool) -> None:
+		## NOTE: The tour is rotated so that the segment starts it, which makes the move a simple concatenation
+		n = self.numberOfCities
+		rotatedTour = np.roll(self.tour, -self.positions[segmentStartCity])
+		segment, rest = rotatedTour[:segmentLength], rotatedTour[segmentLength:]
+		insertIndex = (self.positions[insertAfter] - self.positions[segmentStartCity]) % n - segmentLength + 1
+		if isReversed:
+			segment = segment[::-1]
+
+		self.tour[:] = np.concatenate((rest[:insertIndex], segment, rest[insertIndex:]))
+		self.positions[self.tour] = np.arange(n)
@@ -1,17 +1,17 @@
 ## Consider hyperparameter automated setting and implementing a min-max system
 ## Here's a link https://www.diva-portal.org/smash/get/diva2:1214402/FULLTEXT01.pdf
 import sys
-import collections
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Set, Tuple, Union
+import numpy as np
 
 from AntSystem import AntSystem
-from supportingDS import TSPInstance
+from supportingDS import Tour, PheremoneMatrix, asTSPInstance
 
-distanceType = int 
+distanceType = Union[int, float]
 cityType = int
-matrixType = List[List[distanceType]]
+matrixType = Union[List[List[distanceType]], np.ndarray]
 neighboursType = Set[cityType]
-tourType = Dict[cityType, None]
+tourType = Tour
 
 ## TODO Our enhancement priorities in order are:
 ##      1. Implementing a function to automate ant and iterations setting (DONE)
@@ -30,7 +30,13 @@ class MaxMinAntSystem(AntSystem):
 			"beta": 3.0,			## pheremone weighting in city selection (experimental says around 2 <= x <= 5 is a good value)
 			"rho": 0.5,				## pheremone decay rate after a synchronized cycle
 			"min_p": None,            ## the minimum pheremone rate ## TODO: Find a good value
-			"max_p": None             ## the maximum pheremone rate ## TODO: Find a good value
+			"max_p": None,            ## the maximum pheremone rate ## TODO: Find a good value
+			"candidateListSize": 0,	## number of nearest cities an ant samples from (0 means every unvisited city)
+			"lazyEvaporation": False,## evaporate with a global multiplier so that only deposited edges are updated
+			"numberOfWorkers": 0,	## number of processes constructing the ant tours (0 means this process)
+			"localSearch": "none",	## which constructed tours are improved with 2-opt/Or-opt ("none", "best" or "all")
+			"localSearchNeighbours": 10,## number of nearest cities searched for the local search moves of a city
+			"seed": None			## seeds all of the random streams so that runs are reproducible
 		}
 
 
@@ -46,7 +52,27 @@ class MaxMinAntSystem(AntSystem):
 		"rho": {"valType": float,
 					"start": 0.0,
 					"end": 1.0
-		},				
+		},
+		"candidateListSize": {"valType": int,
+							"start": 0,
+							"end": sys.maxsize
+		},
+		"lazyEvaporation": {"valType": bool},
+		"numberOfWorkers": {"valType": int,
+							"start": 0,
+							"end": sys.maxsize
+		},
+		"localSearch": {"valType": str,
+						"options": ("none", "best", "all")
+		},
+		"localSearchNeighbours": {"valType": int,
+							"start": 1,
+							"end": sys.maxsize
+		},
+		"seed": {"valType": int,
+					"start": 0,
+					"end": sys.maxsize
+		},
 	}
 
 
@@ -54,23 +80,25 @@ class MaxMinAntSystem(AntSystem):
 		self._calculateTauMax(bestDistance)
 
 	def _initializeDataStructures(self, distanceMatrix: matrixType, numberOfCities: int) -> None:
-		self.visitedEdges = collections.Counter()
-		self.TSPInstance = TSPInstance(distanceMatrix, numberOfCities)
+		self.TSPInstance = asTSPInstance(distanceMatrix, numberOfCities)
+		self._initializeRandomState()
 		self._setNumberOfAnts()
 		self._setNumberOfIterations()
 
-		self._bestTour, self._bestDistance = self.TSPInstance.nearestNeighbour()
+		self._bestTour, self._bestDistance = self.TSPInstance.nearestNeighbour(self._selectAntPlacement())
+		self._publishBestResult()
 		self._calculateTauMax(self._bestDistance)
 		self._calculateTauMin()
 
 		self.pheremoneMatrix = self._createPheremoneMatrix()
+		self._initializeConstructionStructures()
 		self.ants = self._createAnts()
 
-	def _createPheremoneMatrix(self):
+	def _createPheremoneMatrix(self) -> PheremoneMatrix:
 		## If the initial pheremones is too low, then the initial movements of the ant will heavily influence future iterations
 		## If the initial pheremones are too high, then the many iterations can be wasted by ants doing the same thing
 		initialPheromoneDeposit = self.hyperparameters["max_p"]
-		return [[initialPheromoneDeposit for _ in range(self.TSPInstance.numberOfCities)] for _ in range(self.TSPInstance.numberOfCities)]
+		return self._newPheremoneMatrix(initialPheromoneDeposit)
 
 
 	def _setNumberOfAnts(self) -> int:
@@ -82,118 +110,53 @@ class MaxMinAntSystem(AntSystem):
 
 	def _setNumberOfIterations(self) -> int:
 		## This is pretty irrelevant during our timer as we will keep on executing until the solver class kicks us out
-		self.hyperparameters['maxIterations'] //= self.hyperparameters["numberOfAnts"]
+		## NOTE: The maxIterations hyperparameter is left as it is, so a reused solver divides the same value every run
+		self.numberOfIterations = max(1, self.hyperparameters['maxIterations'] // self.hyperparameters["numberOfAnts"])
 
 
 	def _advancePheremoneCycle(self) -> None:
-		iterAnts = iter(self.ants)
-		startAnt = next(iterAnts)
-
-		worstAnts = []
-		bestAnts = [startAnt]
-		bestDistance = startAnt.tourDistance
-		for ant in iterAnts:
-			if ant.tourDistance < bestDistance:
-				worstAnts.extend(bestAnts)
-				bestAnts = [ant]
-				bestDistance = ant.tourDistance
-			elif ant.tourDistance == bestDistance:
-				bestAnts.append(ant)
-			else:
-				worstAnts.append(ant)
-
-		bestCityTrips = self._getBestIterationCities(bestAnts)
-		worstCityTrips = self._getWorstIterationCities(worstAnts)
-
-
-		## Now we need to perform the evaporation/deposit
-		self._calculateNewPheremoneWorst(worstCityTrips)
+		## Only the best ants of the iteration deposit pheremones, but every edge evaporates
+		bestDistance = self.colonyDistances.min()
+		bestTours = self.colonyTours[self.colonyDistances == bestDistance]
+		bestStartCities, bestEndCities = self._getBestIterationEdges(bestTours)
 
+		self._evaporatePheremone()
 		## If we have multiple best paths, then we use them all 
-		self._calculateNewPheremoneBest(bestCityTrips, bestDistance)
-
-	def _getBestIterationCities(self, bestAnts):
-		bestCities = collections.Counter()
-		for ant in bestAnts:
-			iterableTour = iter(ant.tour)
-			currentCity = next(iterableTour)
-			for nextCity in iterableTour:
-				self._addCityToCounter(bestCities, currentCity, nextCity)
-
-			self._addCityToCounter(bestCities, ant.startCity, nextCity)
-
-		return bestCities
-
-	def _getWorstIterationCities(self, worstAnts):
-		worstCities = set()
-		for ant in worstAnts:
-			iterableTour = iter(ant.tour)
-			currentCity = next(iterableTour)
-			for nextCity in iterableTour:
-				self._addCityToSet(worstCities, currentCity, nextCity)
-
-			self._addCityToSet(worstCities, ant.startCity, nextCity)
-
-		return worstCities
-
-	def _addCityToCounter(self, counter, current, destination):
-		if counter[(current, destination)]:
-			counter[(current, destination)] += 1
-		elif counter[(destination, current)]:
-			counter[(destination, current)] += 1
-		else: 
-			counter[(current, destination)] += 1
+		deposit = 1 / bestDistance if bestDistance != 0 else float("inf")
+		self._depositPheremoneEdges(bestStartCities, bestEndCities, np.full(len(bestStartCities), deposit))
+		## NOTE: We added a basic pheremone min max system here !!!!
+		self._employMinMaxPheremoneBoundaries()
 
-	def _addCityToSet(self, citySet, current, destination):
-		if (current, destination) not in citySet and (destination, current) not in citySet:
-			citySet.add((current, destination,))
+	def _getBestIterationEdges(self, bestTours: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		## NOTE: Edges shared between the best ants only receive a single deposit, so we remove duplicates
+		## (an edge is identified by its smallest city first, as it is symmetric TSP)
+		startCities, endCities = self._getTourEdges(bestTours)
+		edges = np.unique(np.minimum(startCities, endCities) * self.TSPInstance.numberOfCities + np.maximum(startCities, endCities))
+		return np.divmod(edges, self.TSPInstance.numberOfCities)
 
-	def _calculateNewPheremoneBest(self, bestCityTrips: collections.Counter[Tuple[cityType, cityType]], bestDistance: float) -> None:
-		deposit = 1 / bestDistance if bestDistance != 0 else float("inf")
-		## TODO: Consider doubling up for cities that overlap between ants
-		for (currentCity, nextCity), count in bestCityTrips.items():
-			evaporation = (1 - self.hyperparameters['rho']) * self.pheremoneMatrix[currentCity][nextCity]
-			newPheremoneLevel = evaporation + deposit
-			## NOTE: We added a basic pheremone min max system here !!!!
-			newPheremoneLevel = self._employMinMaxPheremoneBoundaries(newPheremoneLevel)
-			self.pheremoneMatrix[currentCity][nextCity] = newPheremoneLevel
-			self.pheremoneMatrix[nextCity][currentCity] = newPheremoneLevel
-
-	def _calculateNewPheremoneWorst(self, worstCityTrips: Set[Tuple[cityType, cityType]]) -> None:
-		## TODO: Consider doubling up for cities that overlap between ants
-		for currentCity, nextCity in worstCityTrips:
-			evaporation = (1 - self.hyperparameters['rho']) * self.pheremoneMatrix[currentCity][nextCity]
-			newPheremoneLevel = evaporation ## There is no adding of values here
-			## NOTE: We added a basic pheremone min max system here !!!!
-			newPheremoneLevel = self._employMinMaxPheremoneBoundaries(newPheremoneLevel)
-			self.pheremoneMatrix[currentCity][nextCity] = newPheremoneLevel
-			self.pheremoneMatrix[nextCity][currentCity] = newPheremoneLevel
-
-
-	def _employMinMaxPheremoneBoundaries(self, newPheremoneLevel: float) -> float:
-		if newPheremoneLevel > self.hyperparameters['max_p']:
-			newPheremoneLevel = self.hyperparameters['max_p']
-		elif newPheremoneLevel < self.hyperparameters['min_p']:
-			newPheremoneLevel = self.hyperparameters['min_p']
-		return newPheremoneLevel
+	def _employMinMaxPheremoneBoundaries(self) -> None:
+		self.pheremoneMatrix.clip(self.hyperparameters['min_p'], self.hyperparameters['max_p'])
 
 	def _calculateTauMax(self, bestDistance):
 		self.hyperparameters["max_p"] = 1 / (self.hyperparameters["rho"] * bestDistance)
 
 	def _calculateTauMin(self):
 		## https://stackoverflow.com/questions/30056657/in-a-max-min-ant-system-mmas-how-does-the-initial-pheromone-depend-on-the-bes
-		n = self.hyperparameters["maxIterations"]
+		n = self.numberOfIterations
+		if n <= 2:
+			## The formula is undefined for so few iterations, so the pheremones are only bounded from above
+			self.hyperparameters["min_p"] = 0.0
+			return
 		self.hyperparameters["min_p"] = self.hyperparameters["max_p"] * (1-(0.05)**(1/n))/((n/2-1)*(0.05)**(1/n))
 
 
 
 def main() -> None:
-	distanceMatrix = [] ## NOTE: This will need to be loaded in from a file (or defined here)
-	numberOfCities = len(distanceMatrix)
+	## Usage: python MinMaxAntSystem.py <instance files...> [--timer seconds] [--workers n] [--hyperparameters json] [--noTours]
+	## NOTE: The import is here, as the BatchSolver module depends on this module
+	from BatchSolver import main as solveBatch
+	solveBatch(solverName="MaxMinAntSystem")
 
-	## NOTE: You can add another potiional argument "hyperparameters" to tune the hyperparamaeters
-	MMAS = MaxMinAntSystem()
-	MMAS.run(distanceMatrix, numberOfCities, timer=59.0)
 
 if __name__ == "__main__":
 	main()
@@ -0,0 +1,90 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple, Union
+import numpy as np
+
+from supportingDS import SharedArray, PackedSymmetricMatrix
+from AntSystem import constructColonyTours
+
+## NOTE: Each worker process attaches to the shared arrays once (when it is started), and keeps them here
+_workerSharedArrays: Dict[str, SharedArray] = {}
+_workerMatrices: Dict[str, Any] = {}
+
+
+class ParallelColony:
+	## This splits the construction of the colony's tours across a pool of worker processes
+	## NOTE: The distance matrix, choice info and candidate lists live in shared memory, so nothing
+	## is pickled per iteration except the start cities of each chunk and its random seed
+	def __init__(self, distanceMatrix: Union[np.ndarray, PackedSymmetricMatrix], candidates: Optional[np.ndarray], numberOfWorkers: int, seed: Optional[int] = None) -> None:
+		## NOTE: If the distances are packed, then the choice info is packed too (and we share the packed values)
+		self.numberOfCities = len(distanceMatrix)
+		self.isPacked = isinstance(distanceMatrix, PackedSymmetricMatrix)
+		distanceValues = distanceMatrix.values if self.isPacked else np.ascontiguousarray(distanceMatrix)
+		self.numberOfWorkers = numberOfWorkers
+		self.executor: Optional[ProcessPoolExecutor] = None
+		self.sharedArrays: Dict[str, SharedArray] = {}
+
+		## Each chunk of ants gets its own random stream (spawned from the seed), so that runs are reproducible
+		## no matter which worker ends up constructing which chunk
+		self.seedSequence = np.random.SeedSequence(seed)
+
+		try:
+			self.sharedArrays["distanceMatrix"] = SharedArray.fromArray(distanceValues)
+			self.sharedArrays["choiceInfo"] = SharedArray.create(distanceValues.shape, np.float64)
+			if candidates is not None:
+				self.sharedArrays["candidates"] = SharedArray.fromArray(candidates)
+
+			handles = {key: sharedArray.handle for key, sharedArray in self.sharedArrays.items()}
+			## NOTE: We use spawn as the solver runs in a background thread (forking a threaded process is unsafe)
+			self.executor = ProcessPoolExecutor(max_workers=numberOfWorkers, mp_context=multiprocessing.get_context("spawn"),
+												initializer=_initializeWorker, initargs=(handles, self.numberOfCities, self.isPacked))
+		except BaseException:
+			## NOTE: The shared memory that was already created would otherwise never be removed
+			self.close()
+			raise
+
+	@property
+	def choiceInfo(self) -> Union[np.ndarray, PackedSymmetricMatrix]:
+		## NOTE: The solver needs to write the choice info of each iteration into this array (in place)
+		return _wrapSharedMatrix(self.sharedArrays["choiceInfo"].array, self.numberOfCities, self.isPacked)
+
+	def constructTours(self, startCities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		chunks = [chunk for chunk in np.array_split(startCities, self.numberOfWorkers) if len(chunk)]
+		seeds = self.seedSequence.spawn(len(chunks))
+		futures = [self.executor.submit(_constructWorkerTours, chunk, seed) for chunk, seed in zip(chunks, seeds)]
+
+		results = [future.result() for future in futures]
+		tours = np.concatenate([tours for tours, _ in results]).astype(np.int64)
+		tourDistances = np.concatenate([tourDistances for _, tourDistances in results])
+		return tours, tourDistances
+
+	def close(self) -> None:
+		## NOTE: This also closes a partly created colony (e.g. if its executor couldn't be created)
+		if self.executor is not None:
+			self.executor.shutdown(wait=True, cancel_futures=True)
+			self.executor = None
+		for sharedArray in self.sharedArrays.values():
+			sharedArray.close()
+		self.sharedArrays.clear()
+
+
+def _wrapSharedMatrix(array: np.ndarray, numberOfCities: int, isPacked: bool) -> Union[np.ndarray, PackedSymmetricMatrix]:
+	return PackedSymmetricMatrix(numberOfCities, array) if isPacked else array
+
+
+def _initializeWorker(handles: Dict[str, Tuple], numberOfCities: int, isPacked: bool) -> None:
+	for key, handle in handles.items():
+		_workerSharedArrays[key] = SharedArray.attach(handle)
+
+	_workerMatrices["distanceMatrix"] = _wrapSharedMatrix(_workerSharedArrays["distanceMatrix"].array, numberOfCities, isPacked)
+	_workerMatrices["choiceInfo"] = _wrapSharedMatrix(_workerSharedArrays["choiceInfo"].array, numberOfCities, isPacked)
+	_workerMatrices["candidates"] = _workerSharedArrays["candidates"].array if "candidates" in _workerSharedArrays else None
+
+
+def _constructWorkerTours(startCities: np.ndarray, seed: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray]:
+	tours, tourDistances = constructColonyTours(_workerMatrices["choiceInfo"], _workerMatrices["distanceMatrix"],
+												startCities, np.random.default_rng(seed), _workerMatrices["candidates"])
+
+	## NOTE: The tours are sent back in the most compact integer type that can hold the cities
+	tourDtype = np.int16 if tours.shape[1] <= np.iinfo(np.int16).max else np.int32
+	return tours.astype(tourDtype), tourDistances
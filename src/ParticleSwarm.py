@@ -1,16 +1,17 @@
 import sys
 import math
 import random
-from typing import List, Dict, Any, Set, Optional, Union, Tuple
-from supportingDS import TSPInstance, TSPSolver
+from typing import List, Dict, Any, Set, Optional, Union, Tuple, Callable
+import numpy as np
+from supportingDS import TSPInstance, TSPSolver, Tour, TourCache, asTSPInstance
 
-## TODO: It is possible that distance is float -- we need to check this
-distanceType = int 
+distanceType = Union[int, float]
 cityType = int
-matrixType = List[List[distanceType]]
+matrixType = Union[List[List[distanceType]], np.ndarray]
 neighboursType = Set[cityType]
-tourType = Dict[cityType, None]
-velocityType = List[Tuple[cityType, cityType]]
+tourType = Tour
+## NOTE: A velocity is a (k x 2) integer array of tour position swaps (see velocityDtype)
+velocityType = np.ndarray
 
 ## NOTE: I't would be better to subclass `ParticleSwarm` and `AntSystem` and create a superclass with
 ## basic functions needed by generic TSPSolvers (e.g. hyperparameter setting) and creating abstract methods
@@ -21,26 +22,187 @@ velocityType = List[Tuple[cityType, cityType]]
 
 ## TODO: Perform a systematic sweep of the algorithm implementation
 
-class Particle:
-	def __init__(self, startTour: tourType, startVelocity: Any, startDistance: int) -> None:
-		self.bestTour: tourType = startTour
-		self.currentTour: tourType = startTour
-		self.nextTour: Optional[tourType] = None
-
-		self.bestDistance: int = startDistance
-		self.currentDistance: int = startDistance
+def swapSequence(targetTour: List[cityType], currentTour: List[cityType]) -> List[Tuple[int, int]]:
+	## This returns the fewest swaps (of tour positions) that turn currentTour into targetTour, in O(n)
+	## NOTE: Position i has to receive the city at position source[i] of currentTour, and each cycle of source
+	## (i0 -> i1 -> ... -> ik) is solved by k swaps of consecutive positions (i0, i1), (i1, i2), ..., so there
+	## are (n - number of cycles) <= n-1 swaps (whilst bubble sort needed up to n^2/2 swaps of neighbours)
+	currentPositions = {city: position for position, city in enumerate(currentTour)}
+	return _cycleSwaps([currentPositions[city] for city in targetTour])
+
+
+def _cycleSwaps(source: List[int]) -> List[Tuple[int, int]]:
+	isVisited = [False] * len(source)
+	swaps = []
+	for cycleStart in range(len(source)):
+		if isVisited[cycleStart]:
+			continue
+		position = cycleStart
+		isVisited[position] = True
+		while not isVisited[source[position]]:
+			swaps.append((position, source[position]))
+			position = source[position]
+			isVisited[position] = True
+	return swaps
+
+
+def velocityDtype(numberOfCities: int) -> np.dtype:
+	## The positions of the swaps are stored in the smallest integer type that can hold them
+	return np.dtype(np.int16) if numberOfCities <= np.iinfo(np.int16).max else np.dtype(np.int32)
+
+
+def createVelocity(swaps: Any, numberOfCities: int) -> velocityType:
+	return np.array(swaps, dtype=velocityDtype(numberOfCities)).reshape(-1, 2)
+
+
+def normalizeVelocity(velocity: velocityType, numberOfCities: int, maxVelocityLength: int) -> velocityType:
+	## This composes the swaps into the permutation of positions that they perform, and rebuilds the velocity as the
+	## fewest swaps for that permutation, so redundant swaps cancel out (e.g. a swap repeated twice, or swaps undone
+	## by later swaps) and the velocity never has more than n-1 swaps, which is then bounded by maxVelocityLength
+	permutation = list(range(numberOfCities))
+	for first, second in velocity.tolist():
+		permutation[first], permutation[second] = permutation[second], permutation[first]
+	return createVelocity(_cycleSwaps(permutation)[:maxVelocityLength], numberOfCities)
+
+
+def applySwaps(tour: List[cityType], swaps: List[Tuple[int, int]], distance: Callable[[cityType, cityType], distanceType],
+				tourDistance: distanceType) -> distanceType:
+	## This swaps the cities at each pair of positions of the tour (in place), and returns the new tour distance
+	## NOTE: A swap only changes the edges on either side of its two positions, so the distance is updated by the
+	## change of those (at most four) edges in O(1), rather than summing the whole tour again
+	numberOfCities = len(tour)
+	for first, second in swaps:
+		if first == second:
+			continue
+		## The edge at position p is (tour[p], tour[p+1]), and the set removes the edges shared by adjacent positions
+		changedEdges = {(first - 1) % numberOfCities, first, (second - 1) % numberOfCities, second}
+		removedDistance = sum(distance(tour[edge], tour[(edge + 1) % numberOfCities]) for edge in changedEdges)
+		tour[first], tour[second] = tour[second], tour[first]
+		addedDistance = sum(distance(tour[edge], tour[(edge + 1) % numberOfCities]) for edge in changedEdges)
+		tourDistance += addedDistance - removedDistance
+	return tourDistance
+
+
+class Swarm:
+	## The state of the swarm is held in (particles x cities) arrays, which are allocated once and reused every iteration
+	## 	- currentTours/nextTours are the positions of the particles, and bestTours are their personal best positions
+	## 	- The velocities have different lengths, so they are kept in lists (with one velocity array per particle)
+	## NOTE: A swarm without velocities (e.g. of a GeneticParticleSwarm) uses the next tours for its children
+	## NOTE: The current and next tours are swapped (rather than copied) when the swarm moves to its next positions
+	def __init__(self, numberOfParticles: int, numberOfCities: int, distanceDtype: np.dtype, hasVelocities: bool = True) -> None:
+		self.numberOfCities = numberOfCities
+		distanceDtype = np.result_type(distanceDtype, np.int64)
+
+		self.currentTours = np.empty((numberOfParticles, numberOfCities), dtype=np.int64)
+		self.bestTours = np.empty((numberOfParticles, numberOfCities), dtype=np.int64)
+		self.currentDistances = np.zeros(numberOfParticles, dtype=distanceDtype)
+		self.bestDistances = np.zeros(numberOfParticles, dtype=distanceDtype)
+
+		self.nextTours = np.empty((numberOfParticles, numberOfCities), dtype=np.int64)
+		## NOTE: The distance of a next tour is only known if it was updated with the swaps that created it
+		self.nextDistances = np.zeros(numberOfParticles, dtype=distanceDtype)
+		self.hasNextDistances = np.zeros(numberOfParticles, dtype=bool)
+
+		self.currentVelocities: Optional[List[velocityType]] = None
+		self.nextVelocities: Optional[List[Optional[velocityType]]] = None
+		if hasVelocities:
+			self.currentVelocities = [createVelocity([], numberOfCities)] * numberOfParticles
+			self.nextVelocities = [None] * numberOfParticles
+
+	def advance(self) -> None:
+		## The next positions and velocities of every particle become their current ones
+		self.currentTours, self.nextTours = self.nextTours, self.currentTours
+		self.currentDistances, self.nextDistances = self.nextDistances, self.currentDistances
+		self.hasNextDistances.fill(False)
+		self.currentVelocities, self.nextVelocities = self.nextVelocities, [None] * len(self.nextVelocities)
 
-		self.currentVelocity: velocityType = startVelocity
-		self.nextVelocity: Optional[velocityType] = None
-
-		return None
 
+class Particle:
+	## A particle is a thin view of its rows in the swarm arrays (so it holds no state of its own)
+	## NOTE: The tours are read-only views of the rows (see Tour.view), so they are only valid until the rows are
+	## overwritten (e.g. by the next iteration), and a tour that is kept needs to be copied
+	__slots__ = ("swarm", "index")
+
+	def __init__(self, swarm: Swarm, index: int) -> None:
+		self.swarm = swarm
+		self.index = index
+
+	@property
+	def currentTour(self) -> tourType:
+		return Tour.view(self.swarm.currentTours[self.index])
+
+	@currentTour.setter
+	def currentTour(self, tour: tourType) -> None:
+		self.swarm.currentTours[self.index] = np.asarray(tour)
+
+	@property
+	def nextTour(self) -> tourType:
+		return Tour.view(self.swarm.nextTours[self.index])
+
+	@nextTour.setter
+	def nextTour(self, tour: tourType) -> None:
+		self.swarm.nextTours[self.index] = np.asarray(tour)
+
+	@property
+	def nextDistance(self) -> Optional[distanceType]:
+		if not self.swarm.hasNextDistances[self.index]:
+			return None
+		return self.swarm.nextDistances[self.index].item()
+
+	@nextDistance.setter
+	def nextDistance(self, distance: Optional[distanceType]) -> None:
+		self.swarm.hasNextDistances[self.index] = distance is not None
+		if distance is not None:
+			self.swarm.nextDistances[self.index] = distance
+
+	@property
+	def bestTour(self) -> tourType:
+		return Tour.view(self.swarm.bestTours[self.index])
+
+	@bestTour.setter
+	def bestTour(self, tour: tourType) -> None:
+		self.swarm.bestTours[self.index] = np.asarray(tour)
+
+	@property
+	def currentDistance(self) -> distanceType:
+		return self.swarm.currentDistances[self.index].item()
+
+	@currentDistance.setter
+	def currentDistance(self, distance: distanceType) -> None:
+		self.swarm.currentDistances[self.index] = distance
+
+	@property
+	def bestDistance(self) -> distanceType:
+		return self.swarm.bestDistances[self.index].item()
+
+	@bestDistance.setter
+	def bestDistance(self, distance: distanceType) -> None:
+		self.swarm.bestDistances[self.index] = distance
+
+	@property
+	def currentVelocity(self) -> velocityType:
+		return self.swarm.currentVelocities[self.index]
+
+	@currentVelocity.setter
+	def currentVelocity(self, velocity: velocityType) -> None:
+		self.swarm.currentVelocities[self.index] = velocity
+
+	@property
+	def nextVelocity(self) -> Optional[velocityType]:
+		return self.swarm.nextVelocities[self.index]
+
+	@nextVelocity.setter
+	def nextVelocity(self, velocity: Optional[velocityType]) -> None:
+		self.swarm.nextVelocities[self.index] = velocity
 
 class ParticleSwarm(TSPSolver):
 	def __init__(self) -> None:
 		super().__init__()
-		self.particles: Optional[Set[Particle]] = set()
+		## NOTE: The particles are kept in a list (rather than a set), so that their order is reproducible
+		self.particles: Optional[List[Particle]] = []
+		self.swarm: Optional[Swarm] = None
 		self.TSPInstance: Optional[TSPInstance] = None
+		self.tourCache: Optional[TourCache] = None
 		self._bestTour = None
 		self._bestDistance = float("inf")
 
@@ -50,6 +212,10 @@ class ParticleSwarm(TSPSolver):
 			"alpha": 0.7,			    ## The cognitive factor - Lecture recommends 0.5 <= x <= 1
 			"beta": 2.8, 			    ## The social learning factor - Lecture recommends 2.5 <= x <= 3.0
 			"theta": 0.50,              ## THe inertia function - Lecture Recommends 0.4 <= x <= 0.8
+			"maxVelocityLength": 0,		## maximum number of swaps in a velocity (0 means n-1, the most a normalized velocity has)
+			"deltaEvaluationFraction": 0.05,## velocities of up to this fraction of n swaps update the tour distance swap by swap
+			"checkDeltaEvaluation": False,	## (debug) checks every updated tour distance against the whole tour
+			"tourCacheSize": 0,			## number of tour distances kept in an LRU cache (0 means no cache)
 		}
 
 		return None
@@ -61,8 +227,12 @@ class ParticleSwarm(TSPSolver):
 		
 		## THis needs to be defined after the initialization of the particles
 		self._bestTour, self._bestDistance = self._bestCurrentParticleTour()
+		self._publishBestResult()
 		
 		for _ in range(self.hyperparameters["maxIterations"]):
+			## NOTE: The solver stops between iterations when it is asked to (see TSPSolver.stop)
+			if self._shouldStop():
+				break
 			self._runParticleMainBody()
 
 		return None
@@ -70,66 +240,93 @@ class ParticleSwarm(TSPSolver):
 	def _runParticleMainBody(self) -> None:
 		## TODO: Rename this to something nicer
 		for _ in range(self.hyperparameters["maxIterations"]):
+			if self._shouldStop():
+				break
+			self.iterationCount += 1
 			## NOTE: It is important to evaluate the structures and order of operations
 			## as this formulas may use updated positions, when we wish to use the old one
 			for particle in self.particles:
 				self._runParticleIteration(particle)
 
-			## Splitting the two for loops allows to avoid using new values instead of old ones if we use a non-global neighbourhood
-			for particle in self.particles:
-				self._cleanupForNextIteration(particle)
+			## Splitting the iteration from the cleanup allows to avoid using new values instead of old ones if we use a non-global neighbourhood
+			self._cleanupForNextIteration()
 
 		return None
 
-	def _returnResults(self) -> Tuple[List[int], int]:
-		## TODO: Maybe check the current uncompleted iteration in case there was a better tour that wasn't updated yet
-		return list(self._bestTour), self._bestDistance
-
-
 	def _runParticleIteration(self, particle: Particle) -> None:
 		# bestNeighbourhoodTour = self.getBestNeighbourhoodTour(particle)
 		## NOTE: This is likley to be computationaly expensive, so consider ditching it,
 		## and using the global values instead (e.g. _bestTour variable) 
 		bestNeighbourhoodTour = self._bestTour
+		## NOTE: The current tour is read once, so its positions are only built once for both of the tour differences
+		currentTour = particle.currentTour
 		# print("Calculating Next Tour")
-		particle.nextTour = self._getNewParticlePosition(particle)
+		particle.nextTour, particle.nextDistance = self._getNewParticlePosition(particle, currentTour)
 		# print("Calculating Next Velocity")
-		particle.nextVelocity = self._getNewParticleVelocity(particle, bestNeighbourhoodTour)			
+		particle.nextVelocity = self._getNewParticleVelocity(particle, bestNeighbourhoodTour, currentTour)
 		# print("Calculating New Best Tour")
-		particle.bestTour, particle.bestDistance = self._getNewParticleBestPosition(particle)
+		particle.bestTour, particle.bestDistance = self._getNewParticleBestPosition(particle, currentTour)
 		# print(f"Particle Velocity Length: {len(particle.nextVelocity)}")
 
-	def _cleanupForNextIteration(self, particle: Particle) -> None:
-		particle.currentTour = particle.nextTour
-		particle.nextTour = None
-		particle.currentDistance = self._calculateTourDistance(particle.currentTour)
-
-		particle.currentVelocity = particle.nextVelocity
-		particle.nextVelocity = None
+	def _cleanupForNextIteration(self) -> None:
+		## NOTE: The whole swarm moves at once, so the distances of all of its new tours are evaluated together
+		## NOTE: Only the next tours whose distances weren't updated by their swaps are evaluated (together)
+		swarm = self.swarm
+		isUnknown = ~swarm.hasNextDistances
+		if isUnknown.any():
+			swarm.nextDistances[isUnknown] = self._evaluateTours(swarm.nextTours[isUnknown])
+		if self.hyperparameters["checkDeltaEvaluation"]:
+			self._checkNextDistances()
+		swarm.advance()
+		## NOTE: A new best tour is passed on to the improvement callbacks (see TSPSolver.addImprovementCallback)
+		self._updateBestTour()
+
+
+	def _updateBestTour(self) -> bool:
+		## The best tour of the swarm is the shortest of the personal best tours
+		bestParticle = self.particles[int(np.argmin(self.swarm.bestDistances))]
+		if bestParticle.bestDistance < self._bestDistance:
+			self._bestDistance = bestParticle.bestDistance
+			## NOTE: The best tour is copied, as the row of the particle is overwritten when it finds a better tour
+			self._bestTour = Tour(bestParticle.bestTour)
+			self._publishBestResult()
+			return True
+		return False
+
+
+	def _getNewParticlePosition(self, particle: Particle, currentTour: tourType) -> Tuple[tourType, Optional[distanceType]]:
+		## This applies the set of velocity (ammendments) to a tour to get a new tour (position)
+		## NOTE: The distance of the new tour is only updated swap by swap for short velocities (otherwise it is None, and
+		## the tour is evaluated with the rest of the swarm), as each swap costs about as much as 8 edges of a whole tour
+		velocity = particle.currentVelocity
+		if len(velocity) > self.hyperparameters["deltaEvaluationFraction"] * self.TSPInstance.numberOfCities:
+			return self._applyAmmendments(currentTour, velocity), None
 
-		if particle.bestDistance < self._bestDistance:
-			print(f"New best distance: {self._bestDistance}")
-			self._bestDistance = particle.bestDistance
-			self._bestTour = particle.bestTour
+		tourList = currentTour.tolist()
+		tourDistance = applySwaps(tourList, velocity.tolist(), self.TSPInstance.distance, particle.currentDistance)
+		return Tour(tourList), tourDistance
 
 
-	def _getNewParticlePosition(self, particle: Particle) -> tourType:
-		## This applies the set of velocity (ammendments) to a tour to get a new tour (position)
-		return self._applyAmmendments(particle.currentTour, particle.currentVelocity)
+	def _checkNextDistances(self) -> None:
+		## This checks the (swap by swap) updated distances against the distances of the whole tours
+		swarm = self.swarm
+		tourDistances = self.TSPInstance.tourDistances(swarm.nextTours)
+		if not np.allclose(swarm.nextDistances, tourDistances, rtol=1e-9, atol=0):
+			particles = np.flatnonzero(~np.isclose(swarm.nextDistances, tourDistances, rtol=1e-9, atol=0)).tolist()
+			raise Exception(f"The updated tour distances of the particles {particles} don't match the distances of their tours")
 
 
 	## TODO: Consider adding memoization
 	def _applyAmmendments(self, tour: tourType, velocity: velocityType) -> tourType:
-		tourList = list(tour.keys())
-		for first, second in velocity:
+		tourList = tour.tolist()
+		for first, second in velocity.tolist():
 			temp = tourList[first]
 			tourList[first] = tourList[second]
 			tourList[second] = temp
-		tour = dict.fromkeys(tourList, None)
-		return tour
+		return Tour(tourList)
 
 
-	def _getNewParticleVelocity(self, particle: Particle, bestNeighbourhoodTour: tourType) -> velocityType:
+	def _getNewParticleVelocity(self, particle: Particle, bestNeighbourhoodTour: tourType, currentTour: tourType) -> velocityType:
 		## NOTE: The general formula is as below
 
 		## p.nextVelocity = theta*p.currentVelocity + 
@@ -144,49 +341,37 @@ class ParticleSwarm(TSPSolver):
 		epsilon1 = random.uniform(0.6,1.0)
 		epsilon2 = random.uniform(0.6,1.0)
 
-		velocity =  self._velocityMultiply(theta, particle.currentVelocity) + \
-					self._velocityMultiply(alpha*epsilon1, self._tourSubtract(particle.bestTour, particle.currentTour)) + \
-					self._velocityMultiply(beta*epsilon2, self._tourSubtract(bestNeighbourhoodTour, particle.currentTour))
+		velocity = np.concatenate((self._velocityMultiply(theta, particle.currentVelocity),
+									self._velocityMultiply(alpha*epsilon1, self._tourSubtract(particle.bestTour, currentTour)),
+									self._velocityMultiply(beta*epsilon2, self._tourSubtract(bestNeighbourhoodTour, currentTour))))
 
-		## NOTE: Works better without dimension limit
-		# velocity = velocity[:self.TSPInstance.numberOfCities]
-		return velocity
+		## NOTE: Without normalizing, the velocity grows every iteration (as beta > 1)
+		return normalizeVelocity(velocity, self.TSPInstance.numberOfCities, self._getMaxVelocityLength())
 
 
 	def _velocityMultiply(self, constant: Union[int, float], velocity: velocityType) -> velocityType:
 		velocityLength = len(velocity)
-		return [velocity[i%velocityLength] for i in range(math.ceil(velocityLength*constant))]
+		if velocityLength == 0:
+			return velocity
+		return velocity[np.arange(math.ceil(velocityLength*constant)) % velocityLength]
 
 
-	def _tourSubtract(self, firstTour: tourType, secondTour: tourType) -> velocityType:
-		## NOTE: This performs a bubble swap against secondTour
-		keyOrder = {city:counter for counter, city in enumerate(secondTour.keys())}
-		workingTour = {counter:city for counter, city in enumerate(firstTour.keys())}
-		ammendments = []
-		## TODO: This requires performing bubble sort to get from firstTour --> secondTour using secondTour as the keys
-		for _ in range(len(firstTour)):
-			isSwapPerformed = False
-			iterableTour = iter(workingTour.keys())
-			currentCity = next(iterableTour)
-
-			for counter, nextCity in enumerate(iterableTour, 1):
-				if keyOrder[currentCity] > keyOrder[nextCity]:
-					temp = workingTour[counter-1]
-					workingTour[counter-1] = workingTour[counter]
-					workingTour[counter] = temp
-
-					isSwapPerformed = True
-					ammendments.append((counter-1, counter))
-
-			if isSwapPerformed is False:
-				break
+	def _getMaxVelocityLength(self) -> int:
+		## NOTE: A normalized velocity has at most n-1 swaps, which is the limit when maxVelocityLength is 0
+		if self.hyperparameters["maxVelocityLength"] > 0:
+			return self.hyperparameters["maxVelocityLength"]
+		return max(self.TSPInstance.numberOfCities - 1, 0)
+
 
-		return ammendments
+	def _tourSubtract(self, firstTour: tourType, secondTour: tourType) -> velocityType:
+		## The difference of two tours is the velocity that moves secondTour onto firstTour (i.e. secondTour + velocity = firstTour)
+		## NOTE: The position array of secondTour gives the source of every position directly (see swapSequence)
+		return createVelocity(_cycleSwaps(secondTour.positions[firstTour.cities].tolist()), self.TSPInstance.numberOfCities)
 
 
-	def _getNewParticleBestPosition(self, particle: Particle) -> tourType:
+	def _getNewParticleBestPosition(self, particle: Particle, currentTour: tourType) -> tourType:
 		if particle.currentDistance < particle.bestDistance:
-			return particle.currentTour, particle.currentDistance
+			return currentTour, particle.currentDistance
 		return particle.bestTour, particle.bestDistance
 
 
@@ -216,6 +401,19 @@ class ParticleSwarm(TSPSolver):
 					"start": 0.0,
 					"end": sys.float_info.max
 		},
+		"maxVelocityLength": {"valType": int,
+							"start": 0,
+							"end": sys.maxsize
+		},
+		"deltaEvaluationFraction": {"valType": float,
+							"start": 0.0,
+							"end": 1.0
+		},
+		"checkDeltaEvaluation": {"valType": bool},
+		"tourCacheSize": {"valType": int,
+							"start": 0,
+							"end": sys.maxsize
+		},
 						
 	}
 
@@ -231,9 +429,9 @@ class ParticleSwarm(TSPSolver):
 		for key, val in hyperparameters.items():
 			## Checks parameter existence
 			try:
-				definition = ParticleSwarm._supportedHyperparameters[key]
+				definition = self._supportedHyperparameters[key]
 			except KeyError as e:
-				raise Exception(f"The parameter {key} is not a supported hyperparameter by the `ParticleSwarm` class") from e
+				raise Exception(f"The parameter {key} is not a supported hyperparameter by the `{type(self).__name__}` class") from e
 
 			## Checks parameter  type
 			if not isinstance(val, definition['valType']):
@@ -243,30 +441,44 @@ class ParticleSwarm(TSPSolver):
 			if definition['valType'] in (int, float):
 				if not (definition['start'] <= val <= definition['end']):
 					raise Exception(f"The parameter {key} needs to be a value in between {definition['start']} and {definition['end']}")
+			elif 'options' in definition and val not in definition['options']:
+				raise Exception(f"The parameter {key} needs to be one of {definition['options']}")
 			
 			## Finally set the new hyperparameter value
 			self.hyperparameters[key] = val
 
 
 	def _initializeDataStructures(self, distanceMatrix: matrixType, numberOfCities: int) -> None:
-		self.TSPInstance = TSPInstance(distanceMatrix, numberOfCities)
+		self.TSPInstance = asTSPInstance(distanceMatrix, numberOfCities)
+		self.tourCache = TourCache(self.hyperparameters["tourCacheSize"]) if self.hyperparameters["tourCacheSize"] > 0 else None
 		self.particles = self._createParticles()
 		return None
 
 
-	def _createParticles(self) -> Set[Particle]:
-		particles = set()
-		for _ in range(self.hyperparameters["numberOfParticles"]):
-			startTour = self._selectParticleStartTour()
-			startVelocity = self._selectParticleStartVelocity()
-			startDistance = self._calculateTourDistance(startTour)
-			particles.add(Particle(startTour, startVelocity, startDistance))
+	def _createParticles(self) -> List[Particle]:
+		self.swarm = self._createSwarm()
+		particles = [Particle(self.swarm, index) for index in range(self.hyperparameters["numberOfParticles"])]
+		for particle in particles:
+			particle.currentTour = self._selectParticleStartTour()
+			particle.currentVelocity = self._selectParticleStartVelocity()
 
+		self._initializeParticleDistances()
 		return particles
 
 
+	def _initializeParticleDistances(self) -> None:
+		## The start tours are evaluated together, and they are the first personal best tours of the particles
+		self.swarm.currentDistances[:] = self._evaluateTours(self.swarm.currentTours)
+		self.swarm.bestTours[:] = self.swarm.currentTours
+		self.swarm.bestDistances[:] = self.swarm.currentDistances
+
+
+	def _createSwarm(self) -> Swarm:
+		return Swarm(self.hyperparameters["numberOfParticles"], self.TSPInstance.numberOfCities, self.TSPInstance.distanceMatrix.dtype)
+
+
 	def _selectParticleStartTour(self) -> tourType:
-		return dict.fromkeys(random.sample(self.TSPInstance.cities, self.TSPInstance.numberOfCities), None)
+		return Tour(random.sample(self.TSPInstance.cities, self.TSPInstance.numberOfCities))
 
 
 	def _selectParticleStartVelocity(self) -> velocityType:
@@ -283,48 +495,33 @@ class ParticleSwarm(TSPSolver):
 		## For now we'll do 20% rounded up of the self.TSPInstance.numberOfCities, or at least one swap
 		velocity = [tuple(random.randint(0, self.TSPInstance.numberOfCities-1) for _ in range(2)) \
 					for _ in range(max(5,self.TSPInstance.numberOfCities//10))]
-		return velocity
-
-
-	def _bestCurrentParticleTour(self):
-		iterableParticles = iter(self.particles)
-		firstParticle = next(iterableParticles)
+		return createVelocity(velocity, self.TSPInstance.numberOfCities)
 
-		bestTour = firstParticle.currentTour
-		bestDistance = self._calculateTourDistance(bestTour)
 
-		for particle in iterableParticles:
-			tour = particle.currentTour
-			distance = self._calculateTourDistance(tour)
-			if distance < bestDistance:
-				bestDistance = distance
-				bestTour = tour
+	def _bestCurrentParticleTour(self) -> Tuple[tourType, distanceType]:
+		## NOTE: The current distances are kept in the swarm, so the best particle is found without recomputing them
+		bestParticle = self.particles[int(np.argmin(self.swarm.currentDistances))]
+		return Tour(bestParticle.currentTour), bestParticle.currentDistance
 
-		return bestTour, bestDistance
 
+	def _calculateTourDistance(self, tour: tourType) -> distanceType:
+		## NOTE: The tours of the swarm are evaluated together (see _evaluateTours), this is for a single tour
+		return self._evaluateTours(np.asarray(tour)[None]).item()
 
-	## NOTE: Consider memoization -- but make sure to validate that it works with dict
-	def _calculateTourDistance(self, tour: tourType) -> int:
-		distance = 0
-		iterableTour = iter(tour)
-		startCity = next(iterableTour)
-		currentCity = startCity
-		for nextCity in iterableTour:
-			distance += self.TSPInstance.distance(currentCity, nextCity)
-			currentCity = nextCity
 
-		## NOTE: We need to add the final distance from final city to the start city
-		distance += self.TSPInstance.distance(currentCity, startCity)
-		return distance
+	def _evaluateTours(self, tours: np.ndarray) -> np.ndarray:
+		## This returns the distances of a (tours x cities) array, where the cached tours aren't evaluated again
+		if self.tourCache is None:
+			return self.TSPInstance.tourDistances(tours)
+		return self.tourCache.tourDistances(tours, self.TSPInstance.tourDistances)
 
 
 def main() -> None:
-	distanceMatrix = [] ## NOTE: This will need to be loaded in from a file (or defined here)
-	numberOfCities = len(distanceMatrix)
+	## Usage: python ParticleSwarm.py <instance files...> [--timer seconds] [--workers n] [--hyperparameters json] [--noTours]
+	## NOTE: The import is here, as the BatchSolver module depends on this module
+	from BatchSolver import main as solveBatch
+	solveBatch(solverName="ParticleSwarm")
 
-	## NOTE: You can add another potiional argument "hyperparameters" to tune the hyperparmaeters
-	PS = ParticleSwarm()
-	PS.run(distanceMatrix, numberOfCities, timer=59.0)
 
 if __name__ == "__main__":
 	main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+from supportingDS import CoordinateTSPInstance, CoordinateDistanceMatrix
+
+## This reads the coordinate instances of TSPLIB (e.g. berlin52.tsp, att48.tsp or ulysses22.tsp)
+## NOTE: The instances are returned as a CoordinateTSPInstance, so the distance matrix is never created
+
+
+def readTSPLIBFile(path: str, rowCacheSize: int = 0) -> CoordinateTSPInstance:
+	with open(path, "r") as instanceFile:
+		specification, coordinateLines = _readSections(instanceFile.read().splitlines())
+
+	if specification.get("TYPE", "TSP") != "TSP":
+		raise Exception(f"The TSPLIB type {specification['TYPE']} is not supported, only TSP instances are")
+	edgeWeightType = specification.get("EDGE_WEIGHT_TYPE")
+	if edgeWeightType not in CoordinateDistanceMatrix.supportedEdgeWeightTypes:
+		raise Exception(f"The edge weight type {edgeWeightType} is not supported, it needs to be one of {CoordinateDistanceMatrix.supportedEdgeWeightTypes}")
+	if "DIMENSION" not in specification:
+		raise Exception(f"The TSPLIB file {path} needs to specify its DIMENSION")
+
+	numberOfCities = int(specification["DIMENSION"])
+	coordinates = _readCoordinates(coordinateLines, numberOfCities)
+	return CoordinateTSPInstance(coordinates, edgeWeightType, rowCacheSize)
+
+
+def _readSections(lines: List[str]) -> Tuple[Dict[str, str], List[str]]:
+	## The specification is a list of "KEY : VALUE" lines, followed by the NODE_COORD_SECTION (which ends at EOF)
+	specification = {}
+	for lineNumber, line in enumerate(lines):
+		line = line.strip()
+		if line.startswith("NODE_COORD_SECTION"):
+			coordinateLines = []
+			for coordinateLine in lines[lineNumber+1:]:
+				coordinateLine = coordinateLine.strip()
+				if coordinateLine == "EOF" or (coordinateLine and not coordinateLine[0].isdigit()):
+					break
+				if coordinateLine:
+					coordinateLines.append(coordinateLine)
+			return specification, coordinateLines
+		elif line == "EOF":
+			break
+		elif ":" in line:
+			key, value = line.split(":", 1)
+			specification[key.strip()] = value.strip()
+
+	raise Exception("The TSPLIB file needs to contain a NODE_COORD_SECTION")
+
+
+def _readCoordinates(coordinateLines: List[str], numberOfCities: int) -> np.ndarray:
+	## Each line is "<city number> <x> <y>", where the cities are numbered from 1
+	nodes = np.loadtxt(coordinateLines, dtype=np.float64, ndmin=2)
+	if nodes.shape != (numberOfCities, 3):
+		raise Exception(f"The NODE_COORD_SECTION needs {numberOfCities} lines of '<city> <x> <y>', not an array of shape {nodes.shape}")
+
+	cities = nodes[:, 0].astype(np.int64) - 1
+	if not np.array_equal(np.sort(cities), np.arange(numberOfCities)):
+		raise Exception(f"The NODE_COORD_SECTION needs to number the cities from 1 to {numberOfCities}")
+
+	coordinates = np.empty((numberOfCities, 2), dtype=np.float64)
+	coordinates[cities] = nodes[:, 1:]
+	return coordinates
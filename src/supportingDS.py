@@ -1,18 +1,74 @@
 import time
+import queue
 import random
+import hashlib
 import threading
-from typing import List, Set, Tuple, Any
+from multiprocessing import shared_memory, resource_tracker
+from collections import OrderedDict
+from typing import List, Set, Tuple, Any, Optional, Union, Callable, NamedTuple, Iterator
+import numpy as np
 
-## TODO: It is possible that distance is float -- we need to check this
-distanceType = int 
+## NOTE: Distances can be integers or floats (see TSPInstance.supportedDistanceTypes)
+distanceType = Union[int, float]
 cityType = int
 
-matrixType = List[List[distanceType]]
+matrixType = Union[List[List[distanceType]], np.ndarray]
 neighboursType = Set[cityType]
-tourType = Set[cityType]
+tourType = "Tour"
+
+
+class BestResult(NamedTuple):
+	## An immutable snapshot of the best tour (as a read-only array) and its distance
+	tour: np.ndarray
+	distance: distanceType
+
+
+class Improvement(NamedTuple):
+	## A new best tour, together with the seconds since the run started and the iteration that found it
+	## NOTE: The iteration is 0 for the initial tour of a solver (e.g. its nearest neighbour tour)
+	elapsed: float
+	iteration: int
+	distance: distanceType
+	tour: np.ndarray
+
+
+class ImprovementCallback:
+	## A callback that is called with every Improvement of a solver (from the thread that runs the solver)
+	## NOTE: If minInterval is given, the callback is called at most once every minInterval seconds, where the
+	## improvements in between are skipped (apart from the last one, which is passed on when the run finishes)
+	def __init__(self, callback: Callable[[Improvement], Any], minInterval: float = 0.0) -> None:
+		if minInterval < 0:
+			raise Exception("You need to specify a valid minInterval value")
+		self.callback = callback
+		self.minInterval = minInterval
+		self._lastCallTime = float('-inf')
+		self._pendingImprovement: Optional[Improvement] = None
+
+	def notify(self, improvement: Improvement) -> None:
+		if improvement.elapsed - self._lastCallTime < self.minInterval:
+			self._pendingImprovement = improvement
+			return
+		self._pendingImprovement = None
+		self._lastCallTime = improvement.elapsed
+		self.callback(improvement)
+
+	def flush(self) -> None:
+		## This passes on the improvement that was skipped last (if there is one)
+		improvement, self._pendingImprovement = self._pendingImprovement, None
+		if improvement is not None:
+			self._lastCallTime = improvement.elapsed
+			self.callback(improvement)
+
+	def reset(self) -> None:
+		self._lastCallTime = float('-inf')
+		self._pendingImprovement = None
 
 
 class TSPSolver:
+	## NOTE: When the timer of run() expires, the solver is asked to stop (at its next iteration), and run() waits up to
+	## gracePeriod seconds for it to do so
+	gracePeriod: float = 5.0
+
 	def __init__(self) -> None:
 		## These should be overwritten
 		self._bestTour = None
@@ -20,72 +76,496 @@ class TSPSolver:
 		self._outputDict = {}
 		self.mainThreadEvent = None
 		self.executionThread = None
+		## The solver checks the stopEvent (and its deadline) between its iterations, and publishes every new best tour
+		## as a BestResult (which is passed on to the improvement callbacks)
+		## NOTE: The snapshot is replaced with a single assignment, so another thread can read it at any time
+		self.stopEvent = threading.Event()
+		self._bestResult: Optional[BestResult] = None
+		self._improvementCallbacks: List[ImprovementCallback] = []
+		self._startTime = time.monotonic()
+		self._deadline: Optional[float] = None
+		## NOTE: The solvers count their iterations, so that an improvement can say when it was found
+		self.iterationCount = 0
+		## NOTE: An exception raised by the solver thread is kept, and raised again by the results of the run
+		self._solverException: Optional[BaseException] = None
 
 	def run(self, *args,  timer: float = 59.0, **kwargs) -> Tuple[tourType, distanceType]:
 		startTime = time.time()
-		self.mainThreadEvent = threading.Event()
-		self.executionThread = threading.Thread(target=self._executeSolver, args=args, kwargs=kwargs, daemon=True)
-
+		self.start(*args, timer=timer, **kwargs)
 		if timer == -1:
-			self.executionThread.start()
 			self.executionThread.join()
-		elif timer >= 0:
-			self.executionThread.start()
-			self.mainThreadEvent.wait(timer)
 		else:
-			raise Exception("You need to specify a valid timer value")
+			self.mainThreadEvent.wait(timer)
+			self.stop()
 
 		endTime = time.time()
 		print(f"\n\nTime spent executing: {round(endTime - startTime, 2)} seconds\n\n")
 		return self._returnResults()
 
+	def start(self, *args, timer: float = 59.0, **kwargs) -> None:
+		## This starts the solver in the background and returns straight away, where the solver stops itself (at its
+		## next iteration) once the timer expires, or runs until it finishes if the timer is -1
+		if timer != -1 and timer < 0:
+			raise Exception("You need to specify a valid timer value")
+		if self.isRunning():
+			raise Exception("The solver is still running (its previous run didn't stop within the grace period)")
+
+		self._resetResults()
+		self.stopEvent.clear()
+		self._deadline = None if timer == -1 else self._startTime + timer
+		self.mainThreadEvent = threading.Event()
+		self.executionThread = threading.Thread(target=self._executeSolver, args=args, kwargs=kwargs, daemon=True)
+		self.executionThread.start()
+
+	def stop(self, gracePeriod: Optional[float] = None) -> bool:
+		## This asks the solver to stop, and waits for it (up to the grace period), returning whether it has stopped
+		self.stopEvent.set()
+		if self.executionThread is not None:
+			self.executionThread.join(self.gracePeriod if gracePeriod is None else gracePeriod)
+		return not self.isRunning()
+
+	def isRunning(self) -> bool:
+		return self.executionThread is not None and self.executionThread.is_alive()
+
+	def addImprovementCallback(self, callback: Callable[[Improvement], Any], minInterval: float = 0.0) -> ImprovementCallback:
+		## The callback is called with each new best tour of every run (see ImprovementCallback for the throttling)
+		improvementCallback = ImprovementCallback(callback, minInterval)
+		self._improvementCallbacks = self._improvementCallbacks + [improvementCallback]
+		return improvementCallback
+
+	def removeImprovementCallback(self, improvementCallback: ImprovementCallback) -> None:
+		## NOTE: The list is replaced rather than changed, so the solver thread can iterate over it without a lock
+		self._improvementCallbacks = [other for other in self._improvementCallbacks if other is not improvementCallback]
+
+	def improvements(self, *args, timer: float = 59.0, minInterval: float = 0.0, **kwargs) -> Iterator[Improvement]:
+		## This starts the solver in the background, and yields its improvements as they are found, until it finishes
+		## (or its timer expires), after which the best result is available from bestResult() as usual
+		## NOTE: Closing the iterator early (e.g. breaking out of the loop) stops the solver
+		improvementQueue = queue.Queue()
+		improvementCallback = self.addImprovementCallback(improvementQueue.put, minInterval)
+		try:
+			self.start(*args, timer=timer, **kwargs)
+			while True:
+				## NOTE: The callbacks are flushed before the solver thread exits, so once it has exited the queue is complete
+				isRunning = self.isRunning()
+				try:
+					yield improvementQueue.get(timeout=0.1)
+				except queue.Empty:
+					if not isRunning:
+						self._raiseSolverException()
+						return
+		finally:
+			self.removeImprovementCallback(improvementCallback)
+			if self.isRunning():
+				self.stop()
+
+	def solveAsync(self, *args, timer: float = 59.0, asyncSolver: Optional[Any] = None, **kwargs) -> Any:
+		## This runs the solver without blocking the running event loop, returning a handle that can be awaited for the
+		## (tour, distance), and iterated over (async for) for the improvements (see AsyncSolver for the executors)
+		from AsyncSolver import AsyncSolver
+		if asyncSolver is None:
+			asyncSolver = AsyncSolver()
+		return asyncSolver.submit(self, *args, timer=timer, **kwargs)
+
+	def _shouldStop(self) -> bool:
+		return self.stopEvent.is_set() or (self._deadline is not None and time.monotonic() >= self._deadline)
+
 	def _executeSolver(self, *args, **kwargs):
-		self._solve(*args, **kwargs)
-		self._wakeupMainThread()
+		try:
+			self._solve(*args, **kwargs)
+		except BaseException as e:
+			## NOTE: The exception would otherwise only be printed by the thread, and the run would look like it succeeded
+			self._solverException = e
+		finally:
+			try:
+				for improvementCallback in self._improvementCallbacks:
+					improvementCallback.flush()
+			finally:
+				self._wakeupMainThread()
 
 	def _wakeupMainThread(self) -> None:
 		self.mainThreadEvent.set()
+
+	def _resetResults(self) -> None:
+		## NOTE: A solver can be run again, so the best tour of its previous run is cleared
+		self._bestTour = None
+		self._bestDistance = float('inf')
+		self._bestResult = None
+		self._startTime = time.monotonic()
+		self.iterationCount = 0
+		self._solverException = None
+		for improvementCallback in self._improvementCallbacks:
+			improvementCallback.reset()
+
+	def _publishBestResult(self) -> None:
+		bestResult = BestResult(np.asarray(self._bestTour), self._bestDistance)
+		self._bestResult = bestResult
+		improvementCallbacks = self._improvementCallbacks
+		if improvementCallbacks:
+			improvement = Improvement(time.monotonic() - self._startTime, self.iterationCount, bestResult.distance, bestResult.tour)
+			for improvementCallback in improvementCallbacks:
+				improvementCallback.notify(improvement)
+
+	def bestResult(self) -> Optional[BestResult]:
+		## The best tour found so far (which can be read whilst the solver is running)
+		return self._bestResult
 		
 	def _solve(self, *args, **kwargs):
 		## This should be overrided by the child class
 		...
 
+	def _raiseSolverException(self) -> None:
+		if self._solverException is not None:
+			raise self._solverException
+
 	def _returnResults(self) -> Tuple[tourType, distanceType]:
-		## This should be overrided by the child class
-		...
+		## NOTE: The tour is None if the solver didn't find a tour before it was stopped
+		self._raiseSolverException()
+		bestResult = self._bestResult
+		if bestResult is None:
+			return None, float('inf')
+		return bestResult.tour, bestResult.distance
+
+
+
+class Tour:
+	## A tour is the array of its cities (in the order they are visited), and the position of every city in it,
+	## which gives O(1) membership and position lookups (and is only built when it is first needed)
+	## NOTE: The cities are read-only, so a tour can be shared (e.g. returned by _returnResults) without copying it
+	__slots__ = ("cities", "numberOfCities", "_positions")
+
+	def __init__(self, cities: Any, numberOfCities: Optional[int] = None) -> None:
+		## NOTE: numberOfCities only needs to be given for a partial tour (i.e. when it doesn't visit every city yet)
+		self.cities = np.array(cities, dtype=np.int64).reshape(-1)
+		self.cities.flags.writeable = False
+		self.numberOfCities = len(self.cities) if numberOfCities is None else numberOfCities
+		self._positions: Optional[np.ndarray] = None
+
+	@classmethod
+	def view(cls, cities: np.ndarray) -> "Tour":
+		## A tour of an existing (int64) array of cities, which is read without copying it
+		## NOTE: The tour changes if the array is written to, so it needs to be copied (Tour(tour)) to be kept
+		tour = cls.__new__(cls)
+		tour.cities = cities.view()
+		tour.cities.flags.writeable = False
+		tour.numberOfCities = len(tour.cities)
+		tour._positions = None
+		return tour
+
+	@property
+	def positions(self) -> np.ndarray:
+		## The position of every city in the tour (or -1 if the city isn't in the tour)
+		if self._positions is None:
+			positions = np.full(self.numberOfCities, -1, dtype=np.int64)
+			positions[self.cities] = np.arange(len(self.cities))
+			positions.flags.writeable = False
+			self._positions = positions
+		return self._positions
+
+	def position(self, city: cityType) -> int:
+		return int(self.positions[city])
+
+	def successor(self, city: cityType) -> cityType:
+		return int(self.cities[(self.positions[city] + 1) % len(self.cities)])
+
+	def predecessor(self, city: cityType) -> cityType:
+		return int(self.cities[self.positions[city] - 1])
+
+	def __contains__(self, city: cityType) -> bool:
+		return 0 <= city < self.numberOfCities and self.positions[city] >= 0
+
+	def __len__(self) -> int:
+		return len(self.cities)
+
+	def __iter__(self):
+		return iter(self.cities.tolist())
+
+	def __getitem__(self, index: int) -> cityType:
+		return int(self.cities[index])
 
+	def __array__(self, dtype=None, copy=None) -> np.ndarray:
+		return self.cities if dtype is None else self.cities.astype(dtype)
+
+	def __eq__(self, other: Any) -> bool:
+		return isinstance(other, Tour) and np.array_equal(self.cities, other.cities)
+
+	__hash__ = None
+
+	def tolist(self) -> List[cityType]:
+		return self.cities.tolist()
+
+	def __repr__(self) -> str:
+		return f"Tour({self.cities.tolist()})"
+
+
+
+def canonicalTours(tours: np.ndarray) -> np.ndarray:
+	## A tour is the same cycle after any rotation or reversal, so each tour (row) is rotated to start at city 0, and
+	## reversed (after city 0) if its second city is greater than its last city
+	tours = np.atleast_2d(np.asarray(tours, dtype=np.int64))
+	numberOfCities = tours.shape[1]
+	if numberOfCities < 3:
+		return np.sort(tours, axis=1)
+
+	startPositions = np.argmin(tours, axis=1)
+	rotatedTours = np.take_along_axis(tours, (startPositions[:, None] + np.arange(numberOfCities)) % numberOfCities, axis=1)
+	isReversed = rotatedTours[:, 1] > rotatedTours[:, -1]
+	rotatedTours[isReversed, 1:] = rotatedTours[isReversed, :0:-1]
+	return rotatedTours
+
+
+class TourCache:
+	## This is a bounded LRU cache of tour distances (and optionally of their local search results), so that the
+	## tours that the solvers keep revisiting are only evaluated once
+	## NOTE: The tours are keyed by a 128-bit hash of their canonical form (see canonicalTours), so the same cycle
+	## has the same key in any rotation or direction, and the key doesn't grow with the tour
+	def __init__(self, maxSize: int = 4096) -> None:
+		if maxSize < 1:
+			raise Exception(f"The tour cache needs to hold at least one tour, not {maxSize}")
+		self.maxSize = maxSize
+		## Each entry is [tourDistance, improvedTour, improvedDistance], where the unknown values are None
+		self.entries: "OrderedDict[bytes, List[Any]]" = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	@staticmethod
+	def fingerprints(tours: np.ndarray) -> List[bytes]:
+		return [hashlib.blake2b(tour.tobytes(), digest_size=16).digest() for tour in canonicalTours(tours)]
+
+	@property
+	def hitRate(self) -> float:
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.0
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def clear(self) -> None:
+		self.entries.clear()
+		self.hits = self.misses = 0
+
+	def tourDistances(self, tours: np.ndarray, evaluateTours: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+		## This returns the distances of a (tours x cities) array, where only the tours that aren't cached are evaluated
+		## (together, by evaluateTours), and a tour that is repeated in the array is only evaluated once
+		tours = np.atleast_2d(np.asarray(tours, dtype=np.int64))
+		keys = self.fingerprints(tours)
+		tourDistances = {}
+		missingTours = []
+		for tour, key in enumerate(keys):
+			if key in tourDistances:
+				self.hits += 1
+				continue
+			tourDistances[key] = self._lookup(key, 0)
+			if tourDistances[key] is None:
+				missingTours.append(tour)
+
+		if missingTours:
+			for tour, tourDistance in zip(missingTours, evaluateTours(tours[missingTours]).tolist()):
+				tourDistances[keys[tour]] = tourDistance
+				self._store(keys[tour], 0, tourDistance)
+		return np.array([tourDistances[key] for key in keys])
+
+	def improveTour(self, tour: np.ndarray, improveTour: Callable[[np.ndarray], Tuple[np.ndarray, distanceType]]) -> Tuple[np.ndarray, distanceType]:
+		## This returns the (cached) local search result of a tour, where improveTour is only called if it isn't cached
+		## NOTE: The result of the same cycle is returned, even if it was cached from another rotation (or direction)
+		key = self.fingerprints(tour)[0]
+		improvedTour = self._lookup(key, 1)
+		if improvedTour is not None:
+			return improvedTour, self.entries[key][2]
+
+		improvedTour, improvedDistance = improveTour(tour)
+		improvedTour = np.array(improvedTour, dtype=np.int64)
+		improvedTour.flags.writeable = False
+		self._store(key, 1, improvedTour)
+		self.entries[key][2] = improvedDistance
+		## The distance of the improved tour is known as well
+		self._store(self.fingerprints(improvedTour)[0], 0, improvedDistance)
+		return improvedTour, improvedDistance
+
+	def _lookup(self, key: bytes, field: int) -> Any:
+		entry = self.entries.get(key)
+		if entry is None or entry[field] is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		self.entries.move_to_end(key)
+		return entry[field]
+
+	def _store(self, key: bytes, field: int, value: Any) -> None:
+		entry = self.entries.get(key)
+		if entry is None:
+			entry = self.entries[key] = [None, None, None]
+			if len(self.entries) > self.maxSize:
+				self.entries.popitem(last=False)
+		else:
+			self.entries.move_to_end(key)
+		entry[field] = value
 
 
 class TSPInstance:
-	def __init__(self, distanceMatrix: matrixType, numberOfCities: int) -> None:
-		self.distanceMatrix = distanceMatrix
+	## The distance matrix is held as a contiguous (n x n) NumPy array of one of these types
+	## NOTE: A smaller type (e.g. int32 or float32) halves the memory of large instances
+	supportedDistanceTypes = (np.int32, np.int64, np.float32, np.float64)
+	supportedStorages = ("auto", "dense", "packed")
+	## Symmetric instances with at least this many cities are packed (see PackedSymmetricMatrix) when storage="auto"
+	## NOTE: Reading a packed row is a gather instead of a slice, so it is only worth it once the memory matters
+	packedStorageThreshold = 2000
+
+	def __init__(self, distanceMatrix: matrixType, numberOfCities: int, dtype: Optional[Any] = None, storage: str = "auto") -> None:
+		if isinstance(distanceMatrix, PackedSymmetricMatrix):
+			self.distanceMatrix = distanceMatrix if dtype is None else distanceMatrix.astype(dtype)
+		else:
+			distanceArray = self._createDistanceArray(distanceMatrix, numberOfCities, dtype)
+			self.distanceMatrix = self._selectStorage(distanceArray, storage)
 		self.numberOfCities = numberOfCities
 		self.cities = [i for i in range(numberOfCities)]
+		self.candidates: Optional[np.ndarray] = None
+		## NOTE: An attached instance (see attach) keeps the shared memory that its distance matrix lives in, whilst an
+		## instance that was opened from an instance file keeps its path (see fromFile)
+		self.sharedArray: Optional["SharedArray"] = None
+		self.path: Optional[str] = None
+
+	@classmethod
+	def fromFile(cls, path: str) -> "TSPInstance":
+		## This opens a binary instance file (see InstanceFile) as a read-only memory map, keeping the storage of the file
+		## NOTE: The import is here, as the InstanceFile module depends on this module
+		from InstanceFile import openInstanceFile
+		distanceMatrix, numberOfCities = openInstanceFile(path)
+		instance = TSPInstance(distanceMatrix, numberOfCities, storage="dense")
+		instance.path = path
+		return instance
 
-	def neighbours(self, startCity: cityType) -> neighboursType:
+	@classmethod
+	def attach(cls, handle: "InstanceHandle") -> "TSPInstance":
+		## This opens an instance that was published by another process (see InstancePublisher), without copying its
+		## distance matrix, which is read-only (it is either mapped from an instance file or a shared memory block)
+		if handle.coordinateHandle is not None:
+			return CoordinateTSPInstance(*handle.coordinateHandle)
+		if handle.path is not None:
+			return cls.fromFile(handle.path)
+		sharedArray = SharedArray.attach(handle.sharedArrayHandle, readOnly=True)
+		values = sharedArray.array
+		distanceMatrix = PackedSymmetricMatrix(handle.numberOfCities, values) if handle.isPacked else values
+		instance = cls(distanceMatrix, handle.numberOfCities, storage="dense")
+		instance.sharedArray = sharedArray
+		return instance
+
+	def close(self) -> None:
+		## This detaches an attached instance from its shared memory (which is only ever removed by its publisher)
+		## NOTE: Nothing else (e.g. a solver) can still be using the distance matrix once it is closed
+		if self.sharedArray is not None:
+			self.distanceMatrix = None
+			self.candidates = None
+			self.sharedArray.close()
+			self.sharedArray = None
+
+	@property
+	def isPacked(self) -> bool:
+		return isinstance(self.distanceMatrix, PackedSymmetricMatrix)
+
+	def _selectStorage(self, distanceArray: np.ndarray, storage: str) -> Any:
+		if storage not in self.supportedStorages:
+			raise Exception(f"The storage {storage} is not supported, it needs to be one of {self.supportedStorages}")
+		if storage == "dense" or (storage == "auto" and len(distanceArray) < self.packedStorageThreshold):
+			return distanceArray
+
+		isSymmetric = self._isSymmetric(distanceArray)
+		if storage == "packed" and not isSymmetric:
+			raise Exception("The packed storage can only be used with a symmetric distance matrix")
+		return PackedSymmetricMatrix.fromDense(distanceArray) if isSymmetric else distanceArray
+
+	def _isSymmetric(self, distanceArray: np.ndarray) -> bool:
+		## NOTE: We compare the matrix in blocks of rows, so that we never create an (n x n) boolean matrix
+		blockSize = 1024
+		for blockStart in range(0, len(distanceArray), blockSize):
+			blockEnd = min(blockStart + blockSize, len(distanceArray))
+			if not np.array_equal(distanceArray[blockStart:blockEnd], distanceArray[:, blockStart:blockEnd].T):
+				return False
+		return True
+
+	def _createDistanceArray(self, distanceMatrix: matrixType, numberOfCities: int, dtype: Optional[Any]) -> np.ndarray:
+		## NOTE: A list of lists is converted once, whilst an array of the right type is used without copying it
+		isArray = isinstance(distanceMatrix, np.ndarray)
+		distanceArray = np.asarray(distanceMatrix)
+		if dtype is None and isArray and distanceArray.dtype in [np.dtype(supportedType) for supportedType in self.supportedDistanceTypes]:
+			dtype = distanceArray.dtype
+		elif dtype is None and isArray:
+			## Arrays of any other numeric type (e.g. uint8 or float16) are converted to the widest type of their kind
+			dtype = np.int64 if np.issubdtype(distanceArray.dtype, np.integer) or distanceArray.dtype == np.bool_ else np.float64
+		elif dtype is None and np.issubdtype(distanceArray.dtype, np.integer):
+			## Integer distances are stored as int32 unless they are too large for it
+			fitsInt32 = distanceArray.size == 0 or np.abs(distanceArray).max() <= np.iinfo(np.int32).max
+			dtype = np.int32 if fitsInt32 else np.int64
+		elif dtype is None:
+			dtype = np.float64
+
+		if np.dtype(dtype) not in [np.dtype(supportedType) for supportedType in self.supportedDistanceTypes]:
+			raise Exception(f"The distance type {np.dtype(dtype)} is not supported, it needs to be one of {[np.dtype(supportedType).name for supportedType in self.supportedDistanceTypes]}")
+
+		distanceArray = np.ascontiguousarray(distanceArray, dtype=dtype)
+		if distanceArray.shape != (numberOfCities, numberOfCities):
+			raise Exception(f"The distance matrix needs to have the shape {(numberOfCities, numberOfCities)}, not {distanceArray.shape}")
+		return distanceArray
+
+	def candidateLists(self, candidateListSize: int) -> np.ndarray:
+		## The candidate list of city i is its k nearest neighbours (excluding i) sorted by increasing distance
+		## NOTE: The lists are cached, so they are only rebuilt if a different size is requested
+		candidateListSize = min(candidateListSize, self.numberOfCities-1)
+		if self.candidates is not None and self.candidates.shape[1] == candidateListSize:
+			return self.candidates
+
+		candidates = np.empty((self.numberOfCities, candidateListSize), dtype=np.int64)
+		## NOTE: We process the rows in blocks so that we never hold a second float copy of the whole matrix
+		## (and the blocks get fewer rows as the rows get longer, e.g. for large coordinate instances)
+		blockSize = max(1, min(1024, (1 << 22) // self.numberOfCities))
+		for blockStart in range(0, self.numberOfCities, blockSize):
+			rows = np.arange(blockStart, min(blockStart + blockSize, self.numberOfCities))
+			distances = self.neighbourRows(rows).astype(np.float64)
+			distances[np.arange(len(rows)), rows] = float('inf')
+
+			nearest = np.argpartition(distances, candidateListSize-1, axis=1)[:, :candidateListSize]
+			order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind='stable')
+			candidates[rows] = np.take_along_axis(nearest, order, axis=1)
+
+		self.candidates = candidates
+		return candidates
+
+	def neighbours(self, startCity: cityType) -> np.ndarray:
 		## The neighbours of i is the i^th row (represents city i --> k)
 		return self.distanceMatrix[startCity]
 
+	def neighbourRows(self, startCities: np.ndarray) -> np.ndarray:
+		return self.distanceMatrix[startCities]
+
 	def distance(self, startCity: cityType, endCity: cityType) -> distanceType:
-		return self.distanceMatrix[startCity][endCity]
+		## NOTE: This returns a python scalar, so that sums of distances can't overflow the array type
+		return self.distanceMatrix.item(startCity, endCity)
+
+	def tourDistances(self, tours: np.ndarray) -> np.ndarray:
+		## This returns the length of every tour of a (tours x cities) array, by gathering all of their edges at once
+		## NOTE: The lengths are summed as int64 (or float64), so that they can't overflow the array type
+		tours = np.asarray(tours, dtype=np.int64)
+		edgeDistances = self.distanceMatrix[tours, np.roll(tours, -1, axis=-1)]
+		return edgeDistances.sum(axis=-1, dtype=np.result_type(self.distanceMatrix.dtype, np.int64))
 
-	def nearestNeighbour(self) -> Tuple[tourType, distanceType]:
-		startCity = random.randint(0, self.numberOfCities-1)
+	def tourDistance(self, tour: Any) -> distanceType:
+		return self.tourDistances(tour).item()
+
+	def nearestNeighbour(self, startCity: Optional[cityType] = None) -> Tuple[tourType, distanceType]:
+		if startCity is None:
+			startCity = random.randint(0, self.numberOfCities-1)
 		currentCity = startCity
-		visitedCities = {}
+		visitedCities = []
+		unvisited = np.ones(self.numberOfCities, dtype=bool)
 		visitedDistance = 0
 
 		## We don't need to search for the last city - hence -1
 		for _ in range(self.numberOfCities-1):
-			visitedCities[currentCity] = True
-			closestCity = None
-			closestDistance = float('inf')
-			for city, distance in enumerate(self.neighbours(currentCity)):
-				if city not in visitedCities and distance < closestDistance:
-					closestCity = city
-					closestDistance = distance
-
-			if closestCity is None:
+			visitedCities.append(currentCity)
+			unvisited[currentCity] = False
+			closestCity = int(np.argmin(np.where(unvisited, self.neighbours(currentCity), np.inf)))
+
+			if not unvisited[closestCity]:
 				raise Exception(f'The city {currentCity} should have a nearest neighbours')
 			
 			visitedDistance += self.distance(currentCity, closestCity)
@@ -93,9 +573,9 @@ class TSPInstance:
 
 		## Finally, we need to make a cycle back to the startCity
 		visitedDistance += self.distance(currentCity, startCity)
-		visitedCities[currentCity] = True
+		visitedCities.append(currentCity)
 		## We have the visitedCities so can now return the tour
-		return visitedCities, visitedDistance
+		return Tour(visitedCities), visitedDistance
 
 
 
@@ -103,4 +583,480 @@ class TSPInstance:
 		return
 
 	def multiFragement(self) -> Any:
-		return
\ No newline at end of file
+		return
+
+
+
+class CoordinateTSPInstance(TSPInstance):
+	## This only stores the coordinates of the cities, and computes the distances when they are needed
+	## (see CoordinateDistanceMatrix), so it needs O(n) memory instead of the O(n^2) of a distance matrix
+	## NOTE: The rows of the most recently used cities can be kept in a bounded LRU cache (rowCacheSize rows)
+	def __init__(self, coordinates: Any, edgeWeightType: str = "EUC_2D", rowCacheSize: int = 0) -> None:
+		self.distanceMatrix = CoordinateDistanceMatrix(coordinates, edgeWeightType, rowCacheSize)
+		self.coordinates = self.distanceMatrix.coordinates
+		self.numberOfCities = len(self.coordinates)
+		self.cities = [i for i in range(self.numberOfCities)]
+		self.candidates: Optional[np.ndarray] = None
+		self.sharedArray = None
+		self.path = None
+
+
+
+class CoordinateDistanceMatrix:
+	## This computes the TSPLIB distances between cities from their coordinates, whilst supporting the same indexing
+	## as the dense matrices (matrix[i, j], matrix[rows] for whole rows, and matrix[rows[:, None], columns])
+	## 	- EUC_2D: the euclidean distance rounded to the nearest integer (CEIL_2D rounds it up)
+	## 	- ATT: the pseudo-euclidean distance (of the att48/att532 instances)
+	## 	- GEO: the distance in km on an idealized earth, where the coordinates are latitudes/longitudes as DDD.MM
+	## NOTE: The distances are rounded exactly as TSPLIB does, so the tour lengths are comparable with the known optima
+	supportedEdgeWeightTypes = ("EUC_2D", "CEIL_2D", "ATT", "GEO")
+	earthRadius = 6378.388
+
+	def __init__(self, coordinates: Any, edgeWeightType: str = "EUC_2D", rowCacheSize: int = 0) -> None:
+		if edgeWeightType not in self.supportedEdgeWeightTypes:
+			raise Exception(f"The edge weight type {edgeWeightType} is not supported, it needs to be one of {self.supportedEdgeWeightTypes}")
+		coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+		if coordinates.ndim != 2 or coordinates.shape[1] != 2:
+			raise Exception(f"The coordinates need to have the shape (numberOfCities, 2), not {coordinates.shape}")
+		if rowCacheSize < 0:
+			raise Exception("The row cache size needs to be at least 0")
+
+		self.coordinates = coordinates
+		self.xCoordinates, self.yCoordinates = coordinates[:, 0].copy(), coordinates[:, 1].copy()
+		self.numberOfCities = len(coordinates)
+		self.edgeWeightType = edgeWeightType
+		self.rowCacheSize = rowCacheSize
+		self.rowCache: OrderedDict = OrderedDict()
+		## NOTE: The GEO distances are computed from the latitudes/longitudes in radians
+		if edgeWeightType == "GEO":
+			self.radians = self._toRadians(coordinates)
+
+	@staticmethod
+	def _toRadians(coordinates: np.ndarray) -> np.ndarray:
+		## TSPLIB reads DDD.MM as DDD degrees and MM minutes (and uses its own value of pi)
+		degrees = np.trunc(coordinates)
+		return 3.141592 * (degrees + 5.0 * (coordinates - degrees) / 3.0) / 180.0
+
+	@property
+	def dtype(self) -> np.dtype:
+		return np.dtype(np.int64)
+
+	@property
+	def shape(self) -> Tuple[int, int]:
+		return (self.numberOfCities, self.numberOfCities)
+
+	def __len__(self) -> int:
+		return self.numberOfCities
+
+	def __array__(self, dtype=None, copy=None) -> np.ndarray:
+		## NOTE: This creates the whole (n x n) matrix, so it should only be used for small instances
+		matrix = np.empty(self.shape, dtype=self.dtype if dtype is None else dtype)
+		blockSize = 1024
+		for blockStart in range(0, self.numberOfCities, blockSize):
+			rows = np.arange(blockStart, min(blockStart + blockSize, self.numberOfCities))
+			matrix[rows] = self._distances(rows[:, None], np.arange(self.numberOfCities))
+		return matrix
+
+	def astype(self, dtype: Any) -> np.ndarray:
+		return self.__array__(dtype)
+
+	def __getitem__(self, key: Any) -> Any:
+		if isinstance(key, tuple):
+			startCities, endCities = key
+			return self._distances(np.asarray(startCities, dtype=np.int64), np.asarray(endCities, dtype=np.int64))
+
+		## Indexing with the start cities only returns their whole rows
+		startCities = np.asarray(key, dtype=np.int64)
+		if startCities.ndim == 0 and self.rowCacheSize > 0:
+			return self._cachedRow(int(startCities))
+		return self._distances(startCities[..., None], np.arange(self.numberOfCities))
+
+	def item(self, startCity: int, endCity: int) -> int:
+		return int(self._distances(np.int64(startCity), np.int64(endCity)))
+
+	def _cachedRow(self, startCity: int) -> np.ndarray:
+		row = self.rowCache.get(startCity)
+		if row is not None:
+			self.rowCache.move_to_end(startCity)
+			return row
+
+		row = self._distances(np.int64(startCity), np.arange(self.numberOfCities))
+		## NOTE: The cached rows are shared by every caller, so they are made read-only
+		row.flags.writeable = False
+		self.rowCache[startCity] = row
+		if len(self.rowCache) > self.rowCacheSize:
+			self.rowCache.popitem(last=False)
+		return row
+
+	def _distances(self, startCities: np.ndarray, endCities: np.ndarray) -> np.ndarray:
+		## The start and end cities are broadcast against each other (e.g. a column of cities against a row)
+		if self.edgeWeightType == "GEO":
+			return self._geoDistances(startCities, endCities)
+
+		## NOTE: The axes are handled separately, so we never create a (rows x n x 2) array of coordinate deltas
+		xDeltas = self.xCoordinates[startCities] - self.xCoordinates[endCities]
+		yDeltas = self.yCoordinates[startCities] - self.yCoordinates[endCities]
+		squaredDistances = xDeltas * xDeltas + yDeltas * yDeltas
+		if self.edgeWeightType == "EUC_2D":
+			return np.floor(np.sqrt(squaredDistances) + 0.5).astype(np.int64)
+		if self.edgeWeightType == "CEIL_2D":
+			return np.ceil(np.sqrt(squaredDistances)).astype(np.int64)
+
+		## ATT rounds the pseudo-euclidean distance up, unless it is already an integer
+		pseudoDistances = np.sqrt(squaredDistances / 10.0)
+		roundedDistances = np.floor(pseudoDistances + 0.5)
+		return np.where(roundedDistances < pseudoDistances, roundedDistances + 1, roundedDistances).astype(np.int64)
+
+	def _geoDistances(self, startCities: np.ndarray, endCities: np.ndarray) -> np.ndarray:
+		startLatitudes, startLongitudes = self.radians[startCities, 0], self.radians[startCities, 1]
+		endLatitudes, endLongitudes = self.radians[endCities, 0], self.radians[endCities, 1]
+		q1 = np.cos(startLongitudes - endLongitudes)
+		q2 = np.cos(startLatitudes - endLatitudes)
+		q3 = np.cos(startLatitudes + endLatitudes)
+		angles = np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0))
+		distances = (self.earthRadius * angles + 1.0).astype(np.int64)
+		## NOTE: TSPLIB gives a city a distance of 1 to itself, but the solvers expect the diagonal to be 0
+		return np.where(startCities == endCities, 0, distances)
+
+
+
+def asTSPInstance(distanceMatrix: Union[matrixType, TSPInstance], numberOfCities: int) -> TSPInstance:
+	## The solvers accept either a distance matrix, or a TSPInstance that has already been created
+	## (e.g. to choose the distance type, or to share an instance between solvers)
+	if isinstance(distanceMatrix, TSPInstance):
+		if distanceMatrix.numberOfCities != numberOfCities:
+			raise Exception(f"The TSPInstance has {distanceMatrix.numberOfCities} cities, not {numberOfCities}")
+		return distanceMatrix
+	return TSPInstance(distanceMatrix, numberOfCities)
+
+
+
+class PackedSymmetricMatrix:
+	## This stores a symmetric (n x n) matrix as its upper triangle (including the diagonal) packed row by row,
+	## which halves its memory. The index of (i, j) with i <= j is i*(2n - i + 1)/2 + (j - i)
+	## NOTE: It supports the same indexing that the solvers use on dense matrices (i.e. matrix[i, j],
+	## matrix[rows] for whole rows, and matrix[rows[:, None], columns]), where the indices can be arrays
+	def __init__(self, numberOfCities: int, values: np.ndarray) -> None:
+		self.numberOfCities = numberOfCities
+		self.values = values
+
+	@staticmethod
+	def packedSize(numberOfCities: int) -> int:
+		return numberOfCities * (numberOfCities + 1) // 2
+
+	@classmethod
+	def full(cls, numberOfCities: int, value: Any, dtype: Any = np.float64) -> "PackedSymmetricMatrix":
+		return cls(numberOfCities, np.full(cls.packedSize(numberOfCities), value, dtype=dtype))
+
+	@classmethod
+	def fromDense(cls, matrix: np.ndarray) -> "PackedSymmetricMatrix":
+		## NOTE: We copy the upper triangle row by row, so we never create the (n^2) index arrays of np.triu_indices
+		numberOfCities = len(matrix)
+		values = np.empty(cls.packedSize(numberOfCities), dtype=matrix.dtype)
+		rowStart = 0
+		for row in range(numberOfCities):
+			values[rowStart:rowStart + numberOfCities - row] = matrix[row, row:]
+			rowStart += numberOfCities - row
+		return cls(numberOfCities, values)
+
+	@property
+	def dtype(self) -> np.dtype:
+		return self.values.dtype
+
+	@property
+	def shape(self) -> Tuple[int, int]:
+		return (self.numberOfCities, self.numberOfCities)
+
+	def __len__(self) -> int:
+		return self.numberOfCities
+
+	def __array__(self, dtype=None, copy=None) -> np.ndarray:
+		return self.toArray() if dtype is None else self.toArray().astype(dtype)
+
+	def index(self, startCities: Any, endCities: Any) -> Any:
+		lowerCities, upperCities = np.minimum(startCities, endCities), np.maximum(startCities, endCities)
+		return lowerCities * (2 * self.numberOfCities - lowerCities + 1) // 2 + (upperCities - lowerCities)
+
+	def __getitem__(self, key: Any) -> Any:
+		if isinstance(key, tuple):
+			startCities, endCities = key
+			return self.values[self.index(np.asarray(startCities, dtype=np.int64), np.asarray(endCities, dtype=np.int64))]
+
+		## Indexing with the start cities only returns their whole rows
+		startCities = np.asarray(key, dtype=np.int64)
+		return self.values[self.index(startCities[..., None], np.arange(self.numberOfCities))]
+
+	def item(self, startCity: int, endCity: int) -> Any:
+		return self.values.item(self.index(int(startCity), int(endCity)))
+
+	def withValues(self, values: np.ndarray) -> "PackedSymmetricMatrix":
+		## This wraps values computed element-wise from self.values (e.g. the heuristic from the distances)
+		return PackedSymmetricMatrix(self.numberOfCities, values)
+
+	def astype(self, dtype: Any) -> "PackedSymmetricMatrix":
+		return self.withValues(self.values.astype(dtype))
+
+	def toArray(self) -> np.ndarray:
+		matrix = np.empty(self.shape, dtype=self.values.dtype)
+		rowStart = 0
+		for row in range(self.numberOfCities):
+			rowValues = self.values[rowStart:rowStart + self.numberOfCities - row]
+			matrix[row, row:] = rowValues
+			matrix[row:, row] = rowValues
+			rowStart += self.numberOfCities - row
+		return matrix
+
+
+
+class PheremoneMatrix:
+	## This holds the pheremone level of every edge, and provides the evaporation/deposit kernels
+	## NOTE: This is a STSP, so the matrix is always kept symmetric. It is either a dense (n x n) array,
+	## or a packed upper triangle (which halves the memory and the deposit work)
+	def __init__(self, numberOfCities: int, initialPheremone: float, isPacked: bool = False) -> None:
+		self.numberOfCities = numberOfCities
+		self.isPacked = isPacked
+		if isPacked:
+			self.storage = PackedSymmetricMatrix.full(numberOfCities, initialPheremone)
+			self.values = self.storage.values
+		else:
+			self.values = np.full((numberOfCities, numberOfCities), initialPheremone, dtype=np.float64)
+			self.storage = self.values
+
+	def __array__(self, dtype=None, copy=None) -> np.ndarray:
+		return self.toArray() if dtype is None else self.toArray().astype(dtype)
+
+	def __getitem__(self, key: Any) -> Any:
+		return self.storage[key]
+
+	def __len__(self) -> int:
+		return self.numberOfCities
+
+	def __iter__(self):
+		return iter(self.toArray())
+
+	def toArray(self) -> np.ndarray:
+		return self.storage.toArray() if self.isPacked else self.values
+
+	def storedPheremones(self) -> np.ndarray:
+		## The pheremones in the storage layout (i.e. (n x n) if dense, or the packed upper triangle)
+		return self.values
+
+	def evaporate(self, evaporationRate: float) -> None:
+		self.values *= (1 - evaporationRate)
+
+	def deposit(self, startCities: np.ndarray, endCities: np.ndarray, deposits: np.ndarray) -> None:
+		## np.add.at accumulates the deposits of edges that are shared between ants
+		self._addEdges(*self._orderEdges(startCities, endCities), deposits)
+
+	def clip(self, minimumPheremone: float, maximumPheremone: float) -> None:
+		np.clip(self.values, minimumPheremone, maximumPheremone, out=self.values)
+
+	## NOTE: The edge helpers below take edges ordered as (lower city, upper city)
+	def _orderEdges(self, startCities: np.ndarray, endCities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		return np.minimum(startCities, endCities), np.maximum(startCities, endCities)
+
+	def _getEdges(self, lowerCities: np.ndarray, upperCities: np.ndarray) -> np.ndarray:
+		if self.isPacked:
+			return self.values[self.storage.index(lowerCities, upperCities)]
+		return self.values[lowerCities, upperCities]
+
+	def _setEdges(self, lowerCities: np.ndarray, upperCities: np.ndarray, values: np.ndarray) -> None:
+		## NOTE: A dense matrix mirrors the upper triangle (instead of adding in both directions) to keep both halves exactly equal
+		if self.isPacked:
+			self.values[self.storage.index(lowerCities, upperCities)] = values
+		else:
+			self.values[lowerCities, upperCities] = values
+			self.values[upperCities, lowerCities] = values
+
+	def _addEdges(self, lowerCities: np.ndarray, upperCities: np.ndarray, deposits: np.ndarray) -> None:
+		if self.isPacked:
+			np.add.at(self.values, self.storage.index(lowerCities, upperCities), deposits)
+		else:
+			np.add.at(self.values, (lowerCities, upperCities), deposits)
+			self.values[upperCities, lowerCities] = self.values[lowerCities, upperCities]
+
+
+
+class LazyPheremoneMatrix(PheremoneMatrix):
+	## This avoids evaporating all n^2 edges every iteration by keeping a global evaporation multiplier (scale)
+	## The stored values are pre-divided by the scale (i.e. pheremone = values * scale), so an iteration
+	## only costs O(edges deposited). The values are renormalized when the scale gets close to underflowing
+	renormalizationThreshold = 1e-100
+
+	def __init__(self, numberOfCities: int, initialPheremone: float, isPacked: bool = False) -> None:
+		super().__init__(numberOfCities, initialPheremone, isPacked)
+		self.scale = 1.0
+		self.evaporationRate = 0.0
+		self.minimumPheremone: Optional[float] = None
+		self.maximumPheremone: Optional[float] = None
+		self._depositedEdges: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+	## NOTE: The min/max boundaries need to stay exact (as if every edge was clipped every iteration)
+	## 	- The upper boundary is applied eagerly, as only deposited edges can increase (and max_p never decreases)
+	## 	- The lower boundary is applied lazily when reading, as an edge clipped to min_p would evaporate
+	## 	  back below it (i.e. max(values * scale, min_p) is the exact pheremone level)
+	def __getitem__(self, key: Any) -> Any:
+		return self._readPheremone(self.storage[key])
+
+	def toArray(self) -> np.ndarray:
+		return self._readPheremone(super().toArray())
+
+	def storedPheremones(self) -> np.ndarray:
+		return self._readPheremone(self.values)
+
+	def _readPheremone(self, values: Any) -> Any:
+		pheremones = values * self.scale
+		if self.minimumPheremone is not None:
+			pheremones = np.maximum(pheremones, self.minimumPheremone)
+		return pheremones
+
+	def evaporate(self, evaporationRate: float) -> None:
+		self.evaporationRate = evaporationRate
+		self.scale *= (1 - evaporationRate)
+		if self.scale < self.renormalizationThreshold:
+			self._renormalize()
+
+	def deposit(self, startCities: np.ndarray, endCities: np.ndarray, deposits: np.ndarray) -> None:
+		lowerCities, upperCities = self._orderEdges(startCities, endCities)
+		if self.minimumPheremone is not None:
+			## The exact (clipped) pheremone before the deposit was at least (1 - rho) * min_p after evaporating
+			evaporatedMinimum = (1 - self.evaporationRate) * self.minimumPheremone / self.scale
+			self._setEdges(lowerCities, upperCities, np.maximum(self._getEdges(lowerCities, upperCities), evaporatedMinimum))
+
+		self._addEdges(lowerCities, upperCities, np.asarray(deposits, dtype=np.float64) / self.scale)
+		self._depositedEdges = (lowerCities, upperCities)
+
+	def clip(self, minimumPheremone: float, maximumPheremone: float) -> None:
+		self.minimumPheremone, self.maximumPheremone = minimumPheremone, maximumPheremone
+		if self._depositedEdges is None:
+			return
+
+		lowerCities, upperCities = self._depositedEdges
+		self._setEdges(lowerCities, upperCities, np.minimum(self._getEdges(lowerCities, upperCities), maximumPheremone / self.scale))
+		self._depositedEdges = None
+
+	def _renormalize(self) -> None:
+		## NOTE: This is the only O(n^2) operation, and it only happens once every log(threshold)/log(1 - rho) iterations
+		self.values *= self.scale
+		self.scale = 1.0
+
+
+
+## NOTE: The shared memory blocks are created (and attached to) under this lock, see _attachSharedMemory
+_resourceTrackerLock = threading.Lock()
+
+
+class SharedArray:
+	## This is a NumPy array backed by a multiprocessing.shared_memory block, so that other processes can
+	## attach to it (using its handle) instead of having the array pickled and copied to them
+	## NOTE: Only the process that created the block (its owner) tracks it and removes (unlinks) it, so a process that
+	## attaches to it and then exits (or dies) never removes the block from under the others (see _attachSharedMemory)
+	def __init__(self, sharedMemory: shared_memory.SharedMemory, shape: Tuple[int, ...], dtype: Any, isOwner: bool) -> None:
+		self.sharedMemory = sharedMemory
+		self.array = np.ndarray(shape, dtype=dtype, buffer=sharedMemory.buf)
+		self.isOwner = isOwner
+
+	@classmethod
+	def create(cls, shape: Tuple[int, ...], dtype: Any) -> "SharedArray":
+		## NOTE: Shared memory blocks can't be empty, so we always allocate at least one byte
+		size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+		with _resourceTrackerLock:
+			sharedMemory = shared_memory.SharedMemory(create=True, size=size)
+		return cls(sharedMemory, tuple(shape), np.dtype(dtype), isOwner=True)
+
+	@classmethod
+	def fromArray(cls, array: np.ndarray) -> "SharedArray":
+		sharedArray = cls.create(array.shape, array.dtype)
+		sharedArray.array[...] = array
+		return sharedArray
+
+	@classmethod
+	def attach(cls, handle: Tuple[str, Tuple[int, ...], str], readOnly: bool = False) -> "SharedArray":
+		name, shape, dtype = handle
+		sharedArray = cls(_attachSharedMemory(name), shape, np.dtype(dtype), isOwner=False)
+		if readOnly:
+			sharedArray.array.flags.writeable = False
+		return sharedArray
+
+	@property
+	def handle(self) -> Tuple[str, Tuple[int, ...], str]:
+		## This is all another process needs to attach to the array (and it is cheap to pickle)
+		return self.sharedMemory.name, self.array.shape, self.array.dtype.str
+
+	def close(self) -> None:
+		## NOTE: The array needs to be released before the shared memory buffer can be closed
+		self.array = None
+		self.sharedMemory.close()
+		if self.isOwner:
+			self.sharedMemory.unlink()
+
+
+def _attachSharedMemory(name: str) -> shared_memory.SharedMemory:
+	## Before Python 3.13 (and its track argument), attaching to a block registers it with the resource tracker of the
+	## process, which unlinks it when that process exits, even though the block belongs to another process
+	## NOTE: Unregistering the block after attaching isn't enough, as the workers that are spawned by the owner share its
+	## resource tracker (so it would forget the owner's registration), hence the block is never registered instead
+	try:
+		return shared_memory.SharedMemory(name=name, track=False)
+	except TypeError:
+		pass
+
+	with _resourceTrackerLock:
+		register = resource_tracker.register
+		def registerOtherResources(resourceName: str, resourceType: str) -> None:
+			if resourceType != "shared_memory":
+				register(resourceName, resourceType)
+
+		resource_tracker.register = registerOtherResources
+		try:
+			return shared_memory.SharedMemory(name=name)
+		finally:
+			resource_tracker.register = register
+
+
+class InstanceHandle(NamedTuple):
+	## Everything another process needs to attach to a published instance (see TSPInstance.attach), which is cheap to
+	## pickle, where the matrix is either in the instance file at path, or in the shared memory block of sharedArrayHandle
+	## NOTE: A CoordinateTSPInstance is sent as its coordinates, edge weight type and row cache size (coordinateHandle)
+	numberOfCities: int
+	isPacked: bool
+	path: Optional[str] = None
+	sharedArrayHandle: Optional[Tuple[str, Tuple[int, ...], str]] = None
+	coordinateHandle: Optional[Tuple[np.ndarray, str, int]] = None
+
+
+class InstancePublisher:
+	## This publishes the distance matrix of an instance once, so that any number of processes can attach to it
+	## (through its handle) instead of each having its own copy
+	## 	- An instance that was opened from an instance file is published as the path of its file (which each process
+	## 	  maps into memory, so they share its pages through the page cache)
+	## 	- A CoordinateTSPInstance is published as its coordinates (which are only O(n), so they are pickled with the handle)
+	## 	- Any other instance is copied into a shared memory block, which is removed when the publisher is closed
+	## NOTE: The publisher owns the block, so it is removed once the publisher is closed (or by the resource tracker if
+	## the publishing process dies), but never by the processes that attach to it
+	def __init__(self, instance: TSPInstance) -> None:
+		self.sharedArray: Optional[SharedArray] = None
+		if isinstance(instance, CoordinateTSPInstance):
+			distanceMatrix = instance.distanceMatrix
+			coordinateHandle = (instance.coordinates, distanceMatrix.edgeWeightType, distanceMatrix.rowCacheSize)
+			self.handle = InstanceHandle(instance.numberOfCities, False, coordinateHandle=coordinateHandle)
+			return
+
+		isPacked = instance.isPacked
+		values = instance.distanceMatrix.values if isPacked else instance.distanceMatrix
+		if instance.path is not None:
+			self.handle = InstanceHandle(instance.numberOfCities, isPacked, path=instance.path)
+		else:
+			self.sharedArray = SharedArray.fromArray(values)
+			self.handle = InstanceHandle(instance.numberOfCities, isPacked, sharedArrayHandle=self.sharedArray.handle)
+
+	def close(self) -> None:
+		if self.sharedArray is not None:
+			self.sharedArray.close()
+			self.sharedArray = None
+
+	def __enter__(self) -> "InstancePublisher":
+		return self
+
+	def __exit__(self, *excInfo) -> None:
+		self.close()
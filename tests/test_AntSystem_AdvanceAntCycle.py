@@ -3,10 +3,12 @@ import copy
 import random
 import pprint
 import pytest
+import numpy as np
 sys.path.insert(0, "./src")
 sys.path.insert(0, "../src")
 from supportingDS import TSPInstance
-from AntSystem import AntSystem, Ant			
+from AntSystem import AntSystem, Ant
+from MinMaxAntSystem import MaxMinAntSystem
 
 ##BUG: ZeroByDivision Is possible !!! Review cases in AlgAbasic.py and fix accordingly
 
@@ -27,21 +29,31 @@ class Test_AntSystem_AdvanceAntCycle:
 		oldPheremoneMatrix = copy.deepcopy(AS.pheremoneMatrix)
 
 		citySelection = [i for i in range(numberOfCities)]
+		colonyTours = []
 		for ant in AS.ants:
 			cityTour = copy.deepcopy(citySelection)
 			random.shuffle(cityTour)
-			ant.tour.update(dict.fromkeys(cityTour, None))
-			ant.tourDistance = random.randint(1,100)
+			colonyTours.append(cityTour)
+		AS.colonyTours = np.array(colonyTours)
+		AS.colonyDistances = np.array([random.randint(1,100) for _ in AS.ants])
 
 		AS._advancePheremoneCycle()
 
-		assert AS.pheremoneMatrix != oldPheremoneMatrix
+		assert not np.array_equal(AS.pheremoneMatrix, oldPheremoneMatrix)
 		pprint.pprint(AS.pheremoneMatrix)
 		for row in range(numberOfCities):
 			for column in range(numberOfCities):
 				assert AS.pheremoneMatrix[row][column] == AS.pheremoneMatrix[column][row]
 
-		pprint.pprint(AS.pheremoneMatrix)
+		## Every edge evaporates, and each ant deposits 1/L on each edge of its tour
+		expectedPheremoneMatrix = (1 - AS.hyperparameters['rho']) * np.asarray(oldPheremoneMatrix)
+		for tour, tourDistance in zip(colonyTours, AS.colonyDistances):
+			for i in range(numberOfCities):
+				currentCity, nextCity = tour[i-1], tour[i]
+				expectedPheremoneMatrix[currentCity][nextCity] += 1 / tourDistance
+				expectedPheremoneMatrix[nextCity][currentCity] += 1 / tourDistance
+
+		assert np.allclose(AS.pheremoneMatrix, expectedPheremoneMatrix)
 		return None
 
 	def test_resetAntCycle(self):
@@ -63,7 +75,35 @@ class Test_AntSystem_AdvanceAntCycle:
 		AS._resetAntCycle()
 
 		for ant in AS.ants:
-			assert ant.tour == {ant.startCity: None}
+			assert list(ant.tour) == [ant.startCity]
 			assert ant.tourDistance == 0
 
-		return None
\ No newline at end of file
+		return None
+
+
+class Test_MaxMinAntSystem_AdvanceAntCycle:
+	def test_advancePheremoneCycle(self):
+		MMAS = MaxMinAntSystem()
+
+		numberOfCities = 20
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		MMAS._initializeDataStructures(distanceMatrix, numberOfCities)
+		oldPheremoneMatrix = copy.deepcopy(MMAS.pheremoneMatrix)
+
+		MMAS._runColonyCycle()
+		MMAS._advancePheremoneCycle()
+
+		## Only the edges of the best ants receive a deposit, and every value stays within the boundaries
+		bestTours = MMAS.colonyTours[MMAS.colonyDistances == MMAS.colonyDistances.min()].tolist()
+		bestEdges = {(bestTour[i-1], bestTour[i]) for bestTour in bestTours for i in range(numberOfCities)}
+		for row in range(numberOfCities):
+			for column in range(numberOfCities):
+				assert MMAS.hyperparameters['min_p'] <= MMAS.pheremoneMatrix[row][column] <= MMAS.hyperparameters['max_p']
+				assert MMAS.pheremoneMatrix[row][column] == MMAS.pheremoneMatrix[column][row]
+				if (row, column) not in bestEdges and (column, row) not in bestEdges:
+					expected = max((1 - MMAS.hyperparameters['rho']) * oldPheremoneMatrix[row][column], MMAS.hyperparameters['min_p'])
+					assert MMAS.pheremoneMatrix[row][column] == pytest.approx(expected)
+
+		for currentCity, nextCity in bestEdges:
+			assert MMAS.pheremoneMatrix[currentCity][nextCity] == MMAS.hyperparameters['max_p'] \
+				or MMAS.pheremoneMatrix[currentCity][nextCity] > (1 - MMAS.hyperparameters['rho']) * oldPheremoneMatrix[currentCity][nextCity]
@@ -5,7 +5,7 @@ import random
 
 sys.path.insert(0, "./src")
 sys.path.insert(0, "../src")
-from supportingDS import TSPInstance
+from supportingDS import TSPInstance, Tour
 from AntSystem import AntSystem, Ant
 
 class Test_AntSystem_InitializeDataStructures:
@@ -14,7 +14,7 @@ class Test_AntSystem_InitializeDataStructures:
     ## 1. self.TSPInstance -- this is a class that should be tested separately
     ## 2. self.PheremoneMatrix -- List[List]
     ## 3. self.visitedEdges -- Counter[tuple[city, city]]
-    ## 4. self.ants -- set()
+    ## 4. self.ants -- list()
 
 	def test_visitedEdgesInitialization(self):
 		## NOTE: There's no test here since it is a simple creation operation
@@ -67,17 +67,17 @@ class Test_AntSystem_InitializeDataStructures:
 		AS.TSPInstance = TSPInstance(distanceMatrix, numberOfCities)
 		ants = AS._createAnts()
 
-		assert isinstance(ants, set) ## check the type of the container
+		assert isinstance(ants, list) ## check the type of the container (ordered so that seeded runs are reproducible)
 		assert len(ants) == arg["numberOfAnts"] ## check the size of the container
 		
 		for ant in ants: 
 			assert isinstance(ant, Ant) ## check the contents of the container are ants
 			assert ant.tourDistance == 0 ## There should be no movement as the ant hasn't moved between cities
 
-			assert isinstance(ant.tour, dict) ## the ant.tour should be a dictionary (ordered)
+			assert isinstance(ant.tour, Tour) ## the ant.tour should be a Tour (ordered)
 			assert len(ant.tour) == 1 ## the ant should be initialized with a single start city
-			assert next(iter(ant.tour.values())) is None ## the start city should have argument set to None
-			assert 0 <= next(iter(ant.tour.keys())) < AS.TSPInstance.numberOfCities ## The startcity should be a valid index integer
+			assert ant.tour[0] == ant.startCity and ant.startCity in ant.tour ## the start city should be the only city of the tour
+			assert 0 <= ant.tour[0] < AS.TSPInstance.numberOfCities ## The startcity should be a valid index integer
 			
 	def test_SystemInitialization(self):
 		...
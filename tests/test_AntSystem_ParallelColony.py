@@ -0,0 +1,87 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import SharedArray
+from AntSystem import AntSystem
+from MinMaxAntSystem import MaxMinAntSystem
+import ParallelColony as ParallelColonyModule
+from ParallelColony import ParallelColony
+
+
+def runParallelColonyCycles(solverClass, distanceMatrix, numberOfCities, hyperparameters, numberOfCycles):
+	solver = solverClass()
+	solver._setHyperparameters(hyperparameters)
+	solver._initializeDataStructures(distanceMatrix, numberOfCities)
+	colonyTours = []
+	try:
+		for _ in range(numberOfCycles):
+			solver._runIteration()
+			colonyTours.append(solver.colonyTours.copy())
+	finally:
+		solver._closeParallelColony()
+	return solver, colonyTours
+
+
+class Test_AntSystem_ParallelColony:
+	def test_ParallelColonyTours(self):
+		numberOfCities = 25
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		arg = {"numberOfAnts": 9, "numberOfWorkers": 2, "seed": 7}
+
+		AS, colonyTours = runParallelColonyCycles(AntSystem, distanceMatrix, numberOfCities, arg, 3)
+
+		assert AS.parallelColony is None ## the worker processes are shut down
+		for tours in colonyTours:
+			assert tours.shape == (arg["numberOfAnts"], numberOfCities)
+			for tour in tours.tolist():
+				assert sorted(tour) == [city for city in range(numberOfCities)]
+
+	def test_ParallelColonyIsReproducible(self):
+		numberOfCities = 25
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		arg = {"numberOfWorkers": 3, "seed": 1234, "candidateListSize": 5}
+
+		_, firstColonyTours = runParallelColonyCycles(MaxMinAntSystem, distanceMatrix, numberOfCities, arg, 3)
+		_, secondColonyTours = runParallelColonyCycles(MaxMinAntSystem, distanceMatrix, numberOfCities, arg, 3)
+
+		for firstTours, secondTours in zip(firstColonyTours, secondColonyTours):
+			assert np.array_equal(firstTours, secondTours)
+
+	def test_FailedInitializationClosesTheColony(self, monkeypatch):
+		numberOfCities = 15
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		colonies = []
+
+		def failToCreateAnts(solver):
+			## NOTE: This fails after the worker processes have been started
+			colonies.append(solver.parallelColony)
+			raise RuntimeError("The ants couldn't be created")
+		monkeypatch.setattr(AntSystem, "_createAnts", failToCreateAnts)
+
+		AS = AntSystem()
+		with pytest.raises(RuntimeError):
+			AS._solve(distanceMatrix, numberOfCities, {"numberOfWorkers": 2})
+
+		assert AS.parallelColony is None and colonies[0] is not None
+		assert colonies[0].executor is None and colonies[0].sharedArrays == {}
+
+	def test_PartlyCreatedColonyIsClosed(self, monkeypatch):
+		sharedArrayHandles = []
+
+		def failToCreateExecutor(*args, initargs, **kwargs):
+			sharedArrayHandles.extend(initargs[0].values())
+			raise OSError("The worker processes couldn't be started")
+		monkeypatch.setattr(ParallelColonyModule, "ProcessPoolExecutor", failToCreateExecutor)
+
+		with pytest.raises(OSError):
+			ParallelColony(np.random.randint(1, 100, size=(10, 10)), np.zeros((10, 3), dtype=np.int64), 2)
+
+		## The shared memory that was created before the executor failed has been removed
+		assert len(sharedArrayHandles) == 3
+		for handle in sharedArrayHandles:
+			with pytest.raises(FileNotFoundError):
+				SharedArray.attach(handle)
@@ -2,11 +2,13 @@ import sys
 import copy
 import pytest
 import random
+import numpy as np
 
 sys.path.insert(0, "./src")
 sys.path.insert(0, "../src")
 from supportingDS import TSPInstance
-from AntSystem import AntSystem, Ant
+from AntSystem import AntSystem, Ant, constructColonyTours, _sampleColonyRows, _sampleColonyCandidates
+from MinMaxAntSystem import MaxMinAntSystem
 
 
 class Test_AntSystem_RunCycle:
@@ -26,11 +28,167 @@ class Test_AntSystem_RunCycle:
 
 		for ant in AS.ants:
 			AS._runAntCycle(ant)
-			assert len(ant.tour) == AS.TSPInstance.numberOfCities - 1
+			assert len(ant.tour) == AS.TSPInstance.numberOfCities
 			startCity = next(iter(ant.tour))
 			assert startCity == ant.startCity
 
-	## TODO: We still need to test whether the probabilitisicSelection is correct
+	def test_CandidateListAntCycle(self):
+		AS = AntSystem()
+		arg = {
+			"maxIterations": 10,
+			"numberOfAnts": 15,
+			"candidateListSize": 3,
+		}
 
-	## BUG: We need to ensure that the ZeroDivision doens't occur
+		numberOfCities = 20
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+
+		AS._setHyperparameters(arg)
+		AS._initializeDataStructures(distanceMatrix, numberOfCities)
+		assert AS.candidates.shape == (numberOfCities, arg["candidateListSize"])
+
+		for ant in AS.ants:
+			AS._runAntCycle(ant)
+			## Even when all of the candidates are visited, the ant needs to complete its tour
+			assert sorted(ant.tour) == [city for city in range(numberOfCities)]
+			assert next(iter(ant.tour)) == ant.startCity
+
+	def test_ColonyCycleTours(self):
+		AS = AntSystem()
+		arg = {
+			"maxIterations": 10,
+			"numberOfAnts": 15,
+		}
+
+		numberOfCities = 20
+		distanceMatrix = [[random.randint(0, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+
+		AS._setHyperparameters(arg)
+		AS._initializeDataStructures(distanceMatrix, numberOfCities)
+		AS._runColonyCycle()
+
+		assert AS.colonyTours.shape == (arg["numberOfAnts"], numberOfCities)
+		for ant, tour, tourDistance in zip(AS.ants, AS.colonyTours.tolist(), AS.colonyDistances.tolist()):
+			assert sorted(tour) == [city for city in range(numberOfCities)]
+			assert tour[0] == ant.startCity
+			## The tour distance is summed while the tour is constructed, so we check it against the tour itself
+			assert tourDistance == sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(numberOfCities))
+			assert list(ant.tour) == tour
+
+		assert AS._bestIterationDistance == min(AS.colonyDistances)
 
+	@pytest.mark.parametrize("solverType", [AntSystem, MaxMinAntSystem])
+	def test_PackedColonyCycleTours(self, solverType):
+		solver = solverType()
+		arg = {
+			"maxIterations": 10,
+			"numberOfAnts": 10,
+		}
+
+		numberOfCities = 20
+		distanceMatrix = [[0] * numberOfCities for _ in range(numberOfCities)]
+		for i in range(numberOfCities):
+			for j in range(i + 1, numberOfCities):
+				distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+
+		solver._setHyperparameters(arg)
+		solver._initializeDataStructures(TSPInstance(distanceMatrix, numberOfCities, storage="packed"), numberOfCities)
+		assert solver.pheremoneMatrix.storage.values.ndim == 1
+
+		for _ in range(3):
+			solver._runIteration()
+			for tour, tourDistance in zip(solver.colonyTours.tolist(), solver.colonyDistances.tolist()):
+				assert sorted(tour) == [city for city in range(numberOfCities)]
+				assert tourDistance == sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(numberOfCities))
+
+	def test_ColonyArraysAreReused(self):
+		AS = AntSystem()
+		numberOfCities = 20
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		AS._setHyperparameters({"maxIterations": 10, "numberOfAnts": 5})
+		AS._initializeDataStructures(distanceMatrix, numberOfCities)
+
+		AS._runIteration()
+		colonyTours, colonyDistances = AS.colonyTours, AS.colonyDistances
+		AS._runIteration()
+		## The tours are written into the same (ants x cities) arrays every iteration
+		assert AS.colonyTours is colonyTours and AS.colonyDistances is colonyDistances
+		assert AS.colonyTours is AS.colony.tours
+		for ant, tour in zip(AS.ants, AS.colonyTours.tolist()):
+			assert sorted(tour) == [city for city in range(numberOfCities)]
+			## After the reset, each ant is only on its start city again
+			assert list(ant.tour) == [ant.startCity] and ant.tourDistance == 0
+
+	def test_SubnormalWeightsSelectUnvisitedCities(self):
+		## The total of a row of subnormal weights has too little precision to scale the random numbers by
+		weights = np.full((50, 8), 5e-324)
+		unvisited = np.ones((50, 8), dtype=bool)
+		unvisited[:, -1] = False
+		weights[:, -1] = 0
+		selectedColumns = _sampleColonyRows(weights, unvisited, np.random.default_rng(0))
+		assert (selectedColumns < 7).all()
+
+	def test_NearZeroWeightsSelectUnvisitedCities(self):
+		## Rows that mix subnormal and tiny (but normal) weights, with the visited cities scattered across the row
+		rng = np.random.default_rng(1)
+		numberOfCities = 12
+		for _ in range(20):
+			weights = rng.choice([5e-324, 1e-320, 1e-310, 1e-300], size=(200, numberOfCities))
+			unvisited = rng.random((200, numberOfCities)) < 0.5
+			unvisited[np.arange(200), rng.integers(0, numberOfCities, 200)] = True
+			weights[~unvisited] = 0
+			selectedColumns = _sampleColonyRows(weights, unvisited, rng)
+			assert ((selectedColumns >= 0) & (selectedColumns < numberOfCities)).all()
+			assert unvisited[np.arange(200), selectedColumns].all()
+
+	def test_VisitedAndNonCandidateCitiesAreNeverSelected(self):
+		AS = AntSystem()
+		numberOfCities = 15
+		distanceMatrix = np.random.randint(1, 100, size=(numberOfCities, numberOfCities))
+		AS._setHyperparameters({"candidateListSize": 4, "seed": 0})
+		AS._initializeDataStructures(distanceMatrix, numberOfCities)
+
+		rng = np.random.default_rng(0)
+		antIndices = np.arange(500)
+		for _ in range(20):
+			currentCities = rng.integers(0, numberOfCities, 500)
+			unvisited = rng.random((500, numberOfCities)) < 0.5
+			unvisited[antIndices, currentCities] = False
+			unvisited[antIndices, (currentCities + 1) % numberOfCities] = True
+
+			selectedCities = _sampleColonyRows(AS.choiceInfo[currentCities] * unvisited, unvisited, rng)
+			assert unvisited[antIndices, selectedCities].all()
+
+			selectedCities = _sampleColonyCandidates(AS.choiceInfo, AS.candidates, currentCities, unvisited, rng)
+			assert unvisited[antIndices, selectedCities].all()
+			## The other cities are only selected once every candidate of the current city has been visited
+			candidateCities = AS.candidates[currentCities]
+			hasCandidates = unvisited[antIndices[:, None], candidateCities].any(axis=1)
+			assert (candidateCities == selectedCities[:, None]).any(axis=1)[hasCandidates].all()
+
+	def test_SelectionFrequenciesFollowChoiceInfo(self):
+		AS = AntSystem()
+		numberOfCities = 6
+		distanceMatrix = np.array([[0, 10, 20, 30, 15, 25],
+									[10, 0, 12, 18, 24, 30],
+									[20, 12, 0, 9, 14, 21],
+									[30, 18, 9, 0, 11, 16],
+									[15, 24, 14, 11, 0, 13],
+									[25, 30, 21, 16, 13, 0]])
+		AS._setHyperparameters({"alpha": 1.5, "beta": 2.0, "seed": 0})
+		AS._initializeDataStructures(distanceMatrix, numberOfCities)
+		AS.pheremoneMatrix.deposit(np.array([0, 0, 1]), np.array([1, 3, 2]), np.array([0.5, 2.0, 1.0]))
+		AS._updateChoiceInfo()
+
+		## The probability of the next city is tau^alpha * eta^beta over the same sum for all unvisited cities
+		pheremones = np.asarray(AS.pheremoneMatrix.storedPheremones())
+		weights = pheremones[0, 1:] ** 1.5 * (1 / distanceMatrix[0, 1:]) ** 2.0
+		expectedFrequencies = weights / weights.sum()
+
+		numberOfAnts = 100000
+		tours, _ = constructColonyTours(AS.choiceInfo, distanceMatrix, np.zeros(numberOfAnts, dtype=np.int64), np.random.default_rng(0))
+		frequencies = np.bincount(tours[:, 1], minlength=numberOfCities) / numberOfAnts
+		assert frequencies[0] == 0
+		assert np.allclose(frequencies[1:], expectedFrequencies, atol=0.01)
+
+	## BUG: We need to ensure that the ZeroDivision doens't occur
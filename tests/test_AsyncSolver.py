@@ -0,0 +1,133 @@
+import sys
+import time
+import random
+import asyncio
+import threading
+import multiprocessing
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+import AsyncSolver as AsyncSolverModule
+from AsyncSolver import AsyncSolver
+from AntSystem import AntSystem
+from ParticleSwarm import ParticleSwarm
+
+
+def createDistanceMatrix(numberOfCities):
+	distanceMatrix = [[0 for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+	for i in range(numberOfCities):
+		for j in range(i+1, numberOfCities):
+			distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+	return distanceMatrix
+
+
+def tourDistance(distanceMatrix, tour):
+	return sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(len(tour)))
+
+
+async def collectImprovements(handle):
+	return [improvement async for improvement in handle]
+
+
+class Test_AsyncSolver:
+	@pytest.mark.parametrize("solverType", [AntSystem, ParticleSwarm])
+	def test_SolveAsync(self, solverType):
+		numberOfCities = 25
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		hyperparameters = {"maxIterations": 10**8, "numberOfAnts": 5} if solverType is AntSystem else {"maxIterations": 10**8, "numberOfParticles": 5}
+
+		async def solve():
+			handle = solverType().solveAsync(distanceMatrix, numberOfCities, hyperparameters, timer=0.5)
+			improvements = await collectImprovements(handle)
+			return improvements, await handle
+
+		improvements, (tour, distance) = asyncio.run(solve())
+		assert sorted(tour) == list(range(numberOfCities))
+		assert distance == tourDistance(distanceMatrix, tour)
+		assert improvements and improvements[-1].distance == distance
+
+	def test_CancelledSolveIsStopped(self):
+		numberOfCities = 25
+		solver = AntSystem()
+
+		async def solve():
+			handle = solver.solveAsync(createDistanceMatrix(numberOfCities), numberOfCities, {"maxIterations": 10**8}, timer=30.0)
+			await handle.__anext__()
+			handle.cancel()
+			with pytest.raises(asyncio.CancelledError):
+				await handle
+			## The improvements that were found before the cancellation can still be iterated over
+			await collectImprovements(handle)
+
+		startTime = time.time()
+		asyncio.run(solve())
+		assert time.time() - startTime < 30.0
+		assert not solver.isRunning()
+
+	def test_ConcurrencyLimit(self):
+		numberOfCities, numberOfSolves, timer = 15, 4, 0.3
+		solvers = [AntSystem() for _ in range(numberOfSolves)]
+		mostRunningSolvers = 0
+
+		async def solve():
+			nonlocal mostRunningSolvers
+			asyncSolver = AsyncSolver(maxConcurrentSolves=2)
+			handles = [asyncSolver.submit(solver, createDistanceMatrix(numberOfCities), numberOfCities, {"maxIterations": 10**8}, timer=timer) for solver in solvers]
+			while not all(handle.done() for handle in handles):
+				mostRunningSolvers = max(mostRunningSolvers, sum(solver.isRunning() for solver in solvers))
+				await asyncio.sleep(0.01)
+			return [await handle for handle in handles]
+
+		startTime = time.time()
+		results = asyncio.run(solve())
+		## NOTE: Only two of the solves run at once, so they take (at least) two timers
+		assert time.time() - startTime >= 2 * timer
+		assert mostRunningSolvers == 2
+		assert all(sorted(tour) == list(range(numberOfCities)) for tour, _ in results)
+
+	def test_ProcessExecutor(self):
+		numberOfCities = 20
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+
+		async def solve():
+			with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+				async with AsyncSolver(executor, maxConcurrentSolves=2) as asyncSolver:
+					handles = [asyncSolver.submit(AntSystem(), distanceMatrix, numberOfCities, {"maxIterations": 10**8}, timer=0.5) for _ in range(2)]
+					improvements = await collectImprovements(handles[0])
+					return improvements, [await handle for handle in handles]
+
+		improvements, results = asyncio.run(solve())
+		for tour, distance in results:
+			assert sorted(tour) == list(range(numberOfCities))
+			assert distance == tourDistance(distanceMatrix, tour)
+		assert improvements and improvements[-1].distance == results[0][1]
+
+	def test_ManagerIsStartedOffTheEventLoop(self, monkeypatch):
+		numberOfCities = 15
+		context = multiprocessing.get_context("spawn")
+		managerThreads = []
+
+		def startManager():
+			managerThreads.append(threading.current_thread())
+			return context.Manager()
+
+		class ManagerContext:
+			Manager = staticmethod(startManager)
+		monkeypatch.setattr(AsyncSolverModule.multiprocessing, "get_context", lambda method: ManagerContext)
+
+		async def solve():
+			with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+				async with AsyncSolver(executor) as asyncSolver:
+					handles = [asyncSolver.submit(AntSystem(), createDistanceMatrix(numberOfCities), numberOfCities, {"maxIterations": 10**8}, timer=0.3) for _ in range(2)]
+					return threading.current_thread(), [await handle for handle in handles]
+
+		loopThread, results = asyncio.run(solve())
+		## The solves that are submitted together share a single manager, which isn't started on the event loop's thread
+		assert len(managerThreads) == 1 and managerThreads[0] is not loopThread
+		assert all(sorted(tour) == list(range(numberOfCities)) for tour, _ in results)
+
+	def test_InvalidConcurrencyLimit(self):
+		with pytest.raises(Exception):
+			AsyncSolver(maxConcurrentSolves=0)
@@ -0,0 +1,107 @@
+import sys
+import json
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import TSPInstance
+from InstanceFile import writeInstanceFile
+from BatchSolver import BatchSolver, BatchTask, main
+
+
+def createDistanceMatrix(numberOfCities):
+	distanceMatrix = [[0 for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+	for i in range(numberOfCities):
+		for j in range(i+1, numberOfCities):
+			distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+	return distanceMatrix
+
+
+def tourDistance(distanceMatrix, tour):
+	return sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(len(tour)))
+
+
+TSPLIBFile = """NAME : sample6
+TYPE : TSP
+DIMENSION : 6
+EDGE_WEIGHT_TYPE : EUC_2D
+NODE_COORD_SECTION
+1 38.24 20.42
+2 39.57 26.15
+3 36.26 23.12
+4 40.56 25.32
+5 33.48 10.54
+6 37.56 12.19
+EOF
+"""
+
+
+class Test_BatchSolver:
+	def test_ResultsOfEveryInstance(self):
+		distanceMatrices = [createDistanceMatrix(numberOfCities) for numberOfCities in (8, 12, 20, 16, 10)]
+		batchSolver = BatchSolver("MaxMinAntSystem", {"maxIterations": 100, "numberOfAnts": 5}, timer=0.3, maxWorkers=2)
+		## NOTE: Every matrix is put in shared memory here (rather than only the large ones)
+		batchSolver.sharedMemoryThreshold = 0
+		## The instances are streamed in (as a generator), and can be matrices or TSPInstances
+		instances = (TSPInstance(distanceMatrix, len(distanceMatrix)) if index % 2 else distanceMatrix for index, distanceMatrix in enumerate(distanceMatrices))
+
+		results = list(batchSolver.solve(instances))
+		assert sorted(result.index for result in results) == list(range(len(distanceMatrices)))
+		for result in results:
+			distanceMatrix = distanceMatrices[result.index]
+			assert result.error is None and result.name == str(result.index)
+			assert result.numberOfCities == len(distanceMatrix)
+			assert sorted(result.tour.tolist()) == list(range(len(distanceMatrix)))
+			assert result.distance == tourDistance(distanceMatrix, result.tour)
+
+	def test_TasksAndErrors(self):
+		distanceMatrix = createDistanceMatrix(10)
+		tasks = [BatchTask(distanceMatrix, name="first", timer=0.1),
+					BatchTask(np.zeros((3, 4)), name="invalid"),
+					BatchTask(distanceMatrix, name="hyperparameters", hyperparameters={"numberOfParticles": 3})]
+		results = {result.name: result for result in BatchSolver("ParticleSwarm", {"maxIterations": 10}, maxWorkers=2).solve(tasks)}
+
+		## A failed instance is reported, without stopping the rest of the batch
+		assert results["invalid"].error is not None and results["invalid"].tour is None
+		assert results["invalid"].toDict()["distance"] is None
+		for name in ("first", "hyperparameters"):
+			assert results[name].error is None
+			assert results[name].distance == tourDistance(distanceMatrix, results[name].tour)
+
+	def test_SolverErrorsAreReported(self):
+		distanceMatrix = createDistanceMatrix(10)
+		negativeMatrix = [[0 if i == j else -1 for j in range(10)] for i in range(10)]
+		tasks = [BatchTask(distanceMatrix, name="unsupported", hyperparameters={"bogus": 1}),
+					BatchTask(distanceMatrix, name="outOfRange", hyperparameters={"rho": 2.0}),
+					BatchTask(negativeMatrix, name="negative"),
+					BatchTask(distanceMatrix, name="valid")]
+		results = {result.name: result for result in BatchSolver("AntSystem", {"maxIterations": 20}, timer=1.0, maxWorkers=2).solve(tasks)}
+
+		## The invalid hyperparameters of a task are reported before it is sent to the workers
+		assert results["unsupported"].error == "Exception: The parameter bogus is not a supported hyperparameter by the AntSystem class"
+		assert results["outOfRange"].error == "Exception: The parameter rho needs to be a value in between 0.0 and 1.0"
+		assert results["unsupported"].elapsed == results["outOfRange"].elapsed == 0.0
+		## The exception of a solver that fails in a worker is reported (rather than that it stopped without a tour)
+		assert results["negative"].error == "Exception: This program does not support TSP Instances that have negative distances"
+		assert results["valid"].error is None
+
+	def test_CommandLine(self, tmp_path, capsys):
+		distanceMatrix = createDistanceMatrix(12)
+		writeInstanceFile(str(tmp_path / "matrix.tsp"), TSPInstance(distanceMatrix, 12))
+		(tmp_path / "sample6.tsp").write_text(TSPLIBFile)
+
+		main(["AntSystem", str(tmp_path / "matrix.tsp"), str(tmp_path / "sample6.tsp"), "--timer", "0.2", "--workers", "2",
+				"--hyperparameters", '{"numberOfAnts": 4}'])
+		records = {record["name"]: record for record in map(json.loads, capsys.readouterr().out.splitlines())}
+
+		assert records[str(tmp_path / "matrix.tsp")]["distance"] == tourDistance(distanceMatrix, records[str(tmp_path / "matrix.tsp")]["tour"])
+		assert records[str(tmp_path / "sample6.tsp")]["numberOfCities"] == 6
+		assert all(record["error"] is None for record in records.values())
+
+	def test_InvalidBatch(self):
+		with pytest.raises(Exception):
+			BatchSolver("SimulatedAnnealing")
+		with pytest.raises(Exception):
+			BatchSolver("AntSystem", {"numberOfAnts": "five"})
@@ -0,0 +1,77 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import TSPInstance, canonicalTours
+from Crossover import Crossover
+from GeneticParticleSwarm import GeneticParticleSwarm
+
+
+def randomInstance(numberOfCities):
+	distanceMatrix = [[0] * numberOfCities for _ in range(numberOfCities)]
+	for i in range(numberOfCities):
+		for j in range(i + 1, numberOfCities):
+			distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+	return TSPInstance(distanceMatrix, numberOfCities), distanceMatrix
+
+
+class Test_Crossover_Operators:
+	@pytest.mark.parametrize("operator", Crossover.supportedOperators)
+	@pytest.mark.parametrize("numberOfCities", [2, 5, 31])
+	def test_ChildrenArePermutations(self, operator, numberOfCities):
+		instance, _ = randomInstance(numberOfCities)
+		crossover = Crossover(instance, operator, np.random.default_rng(1))
+		firstParents = np.array([np.random.permutation(numberOfCities) for _ in range(40)])
+		secondParents = np.array([np.random.permutation(numberOfCities) for _ in range(40)])
+
+		children = crossover.breed(firstParents, secondParents)
+		assert children.shape == (40, numberOfCities)
+		assert (np.sort(children, axis=1) == np.arange(numberOfCities)).all()
+
+	@pytest.mark.parametrize("operator", ["order", "partiallyMapped", "edgeRecombination"])
+	def test_IdenticalParentsGiveTheSameTour(self, operator):
+		instance, _ = randomInstance(20)
+		parent = np.random.permutation(20)
+		children = Crossover(instance, operator).breed(np.array([parent] * 10), parent)
+		assert (canonicalTours(children) == canonicalTours(parent)).all()
+
+	def test_SegmentOperators(self, monkeypatch):
+		## This is the textbook example (with cities numbered from 0), where the segment is positions 3 to 6
+		instance, _ = randomInstance(9)
+		firstParent, secondParent = np.arange(9), np.array([8, 2, 6, 7, 1, 5, 4, 0, 3])
+		crossover = Crossover(instance, "order")
+		monkeypatch.setattr(crossover, "_segments", lambda numberOfChildren: (np.full(numberOfChildren, 3), np.full(numberOfChildren, 7)))
+
+		assert crossover.breed(firstParent[None], secondParent[None]).tolist() == [[2, 7, 1, 3, 4, 5, 6, 0, 8]]
+		crossover.operator = "partiallyMapped"
+		assert crossover.breed(firstParent[None], secondParent[None]).tolist() == [[8, 2, 1, 3, 4, 5, 6, 0, 7]]
+
+	def test_InvalidOperator(self):
+		instance, _ = randomInstance(5)
+		with pytest.raises(Exception):
+			Crossover(instance, "cycle")
+		with pytest.raises(Exception):
+			GeneticParticleSwarm()._setHyperparameters({"crossover": "cycle"})
+
+
+class Test_Crossover_GeneticParticleSwarm:
+	@pytest.mark.parametrize("operator", Crossover.supportedOperators)
+	def test_GenerationsImproveBestTours(self, operator):
+		numberOfCities = 25
+		instance, distanceMatrix = randomInstance(numberOfCities)
+		GPS = GeneticParticleSwarm()
+		GPS._setHyperparameters({"numberOfParticles": 20, "crossover": operator})
+		GPS._initializeDataStructures(instance, numberOfCities)
+		GPS._bestTour, GPS._bestDistance = GPS._bestCurrentParticleTour()
+		startDistances = GPS.swarm.bestDistances.copy()
+
+		for _ in range(5):
+			GPS._runParticleMainBody()
+		assert (GPS.swarm.bestDistances <= startDistances).all()
+		assert GPS._bestDistance == GPS.swarm.bestDistances.min()
+		for tour, tourDistance in zip(GPS.swarm.bestTours.tolist(), GPS.swarm.bestDistances.tolist()):
+			assert sorted(tour) == list(range(numberOfCities))
+			assert tourDistance == sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(numberOfCities))
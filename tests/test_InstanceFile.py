@@ -0,0 +1,86 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import TSPInstance
+from InstanceFile import convertMatrixFile, writeInstanceFile, readInstanceHeader
+from AntSystem import AntSystem
+
+
+def symmetricMatrix(numberOfCities):
+	distanceMatrix = np.triu(np.random.randint(1, 1000, size=(numberOfCities, numberOfCities)), 1)
+	return distanceMatrix + distanceMatrix.T
+
+
+class Test_InstanceFile_Convert:
+	@pytest.mark.parametrize("delimiter", [" ", ","])
+	def test_ConvertedMatrixMatchesText(self, tmp_path, delimiter):
+		numberOfCities = 23
+		distanceMatrix = np.random.randint(0, 1000, size=(numberOfCities, numberOfCities))
+		textPath = tmp_path / "matrix.txt"
+		np.savetxt(textPath, distanceMatrix, fmt="%d", delimiter=delimiter)
+
+		## NOTE: A small chunk size makes sure that the matrix is written over several chunks
+		assert convertMatrixFile(str(textPath), str(tmp_path / "matrix.tsp"), chunkSize=5) == numberOfCities
+		instance = TSPInstance.fromFile(str(tmp_path / "matrix.tsp"))
+
+		assert instance.numberOfCities == numberOfCities
+		assert instance.distanceMatrix.dtype == np.int64
+		assert np.array_equal(instance.distanceMatrix, distanceMatrix)
+
+	def test_ConvertPackedMatrix(self, tmp_path):
+		numberOfCities = 17
+		distanceMatrix = symmetricMatrix(numberOfCities).astype(np.float64) / 8
+		textPath = tmp_path / "matrix.txt"
+		np.savetxt(textPath, distanceMatrix, fmt="%.17g")
+
+		convertMatrixFile(str(textPath), str(tmp_path / "matrix.tsp"), dtype=np.float32, storage="packed", chunkSize=4)
+		instance = TSPInstance.fromFile(str(tmp_path / "matrix.tsp"))
+
+		assert instance.isPacked
+		assert readInstanceHeader(str(tmp_path / "matrix.tsp")) == (numberOfCities, np.dtype(np.float32), "packed")
+		assert np.array_equal(np.asarray(instance.distanceMatrix), distanceMatrix.astype(np.float32))
+
+	def test_InvalidMatrixFiles(self, tmp_path):
+		textPath = tmp_path / "matrix.txt"
+		distanceMatrix = np.random.randint(1, 100, size=(6, 6))
+		distanceMatrix[0, 1] = distanceMatrix[1, 0] + 1
+		np.savetxt(textPath, distanceMatrix, fmt="%d")
+		## An assymetric matrix can't be packed
+		with pytest.raises(Exception):
+			convertMatrixFile(str(textPath), str(tmp_path / "matrix.tsp"), storage="packed", chunkSize=2)
+
+		## A matrix needs as many rows as columns
+		np.savetxt(textPath, distanceMatrix[:5], fmt="%d")
+		with pytest.raises(Exception):
+			convertMatrixFile(str(textPath), str(tmp_path / "matrix.tsp"))
+
+		(tmp_path / "other.tsp").write_bytes(b"not an instance file" * 10)
+		with pytest.raises(Exception):
+			TSPInstance.fromFile(str(tmp_path / "other.tsp"))
+
+
+class Test_InstanceFile_MemoryMap:
+	@pytest.mark.parametrize("storage", ["dense", "packed"])
+	def test_WrittenInstanceRoundTrip(self, tmp_path, storage):
+		numberOfCities = 12
+		instance = TSPInstance(symmetricMatrix(numberOfCities), numberOfCities, storage=storage)
+		writeInstanceFile(str(tmp_path / "matrix.tsp"), instance)
+
+		mappedInstance = TSPInstance.fromFile(str(tmp_path / "matrix.tsp"))
+		assert mappedInstance.isPacked == instance.isPacked
+		assert np.array_equal(np.asarray(mappedInstance.distanceMatrix), np.asarray(instance.distanceMatrix))
+
+	def test_SolverRunsOnMappedInstance(self, tmp_path):
+		numberOfCities = 15
+		writeInstanceFile(str(tmp_path / "matrix.tsp"), TSPInstance(symmetricMatrix(numberOfCities), numberOfCities))
+		instance = TSPInstance.fromFile(str(tmp_path / "matrix.tsp"))
+		## NOTE: The mapped matrix is read-only, so the solver must never write into the distances
+		assert not instance.distanceMatrix.flags.writeable
+
+		AS = AntSystem()
+		tour, distance = AS.run(instance, numberOfCities, {"maxIterations": 5, "numberOfAnts": 5}, timer=-1)
+		assert sorted(tour) == list(range(numberOfCities))
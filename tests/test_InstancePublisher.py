@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import subprocess
+import multiprocessing
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import TSPInstance, CoordinateTSPInstance, SharedArray, InstancePublisher
+from InstanceFile import writeInstanceFile
+from AntSystem import AntSystem
+from MinMaxAntSystem import MaxMinAntSystem
+
+srcPath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def symmetricMatrix(numberOfCities):
+	distanceMatrix = np.random.randint(1, 100, size=(numberOfCities, numberOfCities))
+	distanceMatrix = distanceMatrix + distanceMatrix.T
+	np.fill_diagonal(distanceMatrix, 0)
+	return distanceMatrix
+
+
+def _attachAndExit(handle, exitCode):
+	## NOTE: A worker that dies (os._exit skips every cleanup) must not take the published block with it
+	instance = TSPInstance.attach(handle)
+	assert instance.distance(0, 1) >= 0
+	os._exit(exitCode)
+
+
+class Test_InstancePublisher:
+	@pytest.mark.parametrize("storage", ["dense", "packed"])
+	def test_AttachedInstanceIsSharedAndReadOnly(self, storage):
+		numberOfCities = 30
+		distanceMatrix = symmetricMatrix(numberOfCities)
+		instance = TSPInstance(distanceMatrix, numberOfCities, storage=storage)
+
+		with InstancePublisher(instance) as publisher:
+			attachedInstance = TSPInstance.attach(publisher.handle)
+			assert attachedInstance.isPacked == (storage == "packed")
+			assert np.array_equal(np.asarray(attachedInstance.distanceMatrix), distanceMatrix)
+
+			## The attached matrix is a read-only view of the published block (rather than a copy of it)
+			attachedValues = attachedInstance.distanceMatrix.values if storage == "packed" else attachedInstance.distanceMatrix
+			assert not attachedValues.flags.writeable
+			publisher.sharedArray.array.flat[0] = 12345
+			assert attachedValues.flat[0] == 12345
+			attachedInstance.close()
+
+		## Only the publisher removes the block (once it is closed)
+		with pytest.raises(FileNotFoundError):
+			SharedArray.attach(publisher.handle.sharedArrayHandle)
+
+	def test_SolversRunOnAttachedInstance(self):
+		numberOfCities = 25
+		distanceMatrix = symmetricMatrix(numberOfCities)
+		with InstancePublisher(TSPInstance(distanceMatrix, numberOfCities)) as publisher:
+			for solverType in (AntSystem, MaxMinAntSystem):
+				attachedInstance = TSPInstance.attach(publisher.handle)
+				solver = solverType()
+				solver._solve(attachedInstance, numberOfCities, {"maxIterations": 100, "numberOfAnts": 5, "candidateListSize": 8})
+				tour, distance = solver._returnResults()
+				assert distance == sum(distanceMatrix[tour[i-1], tour[i]] for i in range(numberOfCities))
+				del solver
+				attachedInstance.close()
+
+	def test_InstanceFileIsPublishedAsItsPath(self, tmp_path):
+		numberOfCities = 20
+		distanceMatrix = symmetricMatrix(numberOfCities)
+		writeInstanceFile(str(tmp_path / "matrix.tsp"), TSPInstance(distanceMatrix, numberOfCities))
+
+		with InstancePublisher(TSPInstance.fromFile(str(tmp_path / "matrix.tsp"))) as publisher:
+			assert publisher.sharedArray is None and publisher.handle.path == str(tmp_path / "matrix.tsp")
+			attachedInstance = TSPInstance.attach(publisher.handle)
+			assert not attachedInstance.distanceMatrix.flags.writeable
+			assert np.array_equal(attachedInstance.distanceMatrix, distanceMatrix)
+
+	def test_BlockSurvivesWorkersThatExitOrDie(self):
+		numberOfCities = 20
+		distanceMatrix = symmetricMatrix(numberOfCities)
+		with InstancePublisher(TSPInstance(distanceMatrix, numberOfCities)) as publisher:
+			context = multiprocessing.get_context("spawn")
+			for exitCode in (0, 1):
+				worker = context.Process(target=_attachAndExit, args=(publisher.handle, exitCode))
+				worker.start()
+				worker.join()
+				assert worker.exitcode == exitCode
+
+			## NOTE: An unrelated process has its own resource tracker, which would otherwise remove the block when it exits
+			script = f"import sys; sys.path.insert(0, {srcPath!r}); from supportingDS import TSPInstance, InstanceHandle; " \
+						f"TSPInstance.attach(InstanceHandle(*{tuple(publisher.handle)!r})).close()"
+			subprocess.run([sys.executable, "-c", script], check=True)
+
+			## NOTE: The resource tracker of the process cleans up after the process has exited, so the block is checked for a while
+			for _ in range(10):
+				time.sleep(0.05)
+				attachedInstance = TSPInstance.attach(publisher.handle)
+				assert np.array_equal(attachedInstance.distanceMatrix, distanceMatrix)
+				attachedInstance.close()
+
+	@pytest.mark.parametrize("edgeWeightType", ["EUC_2D", "GEO"])
+	def test_CoordinateInstanceIsPublishedAsItsCoordinates(self, edgeWeightType):
+		instance = CoordinateTSPInstance(np.random.uniform(0, 80, size=(10, 2)), edgeWeightType, rowCacheSize=4)
+		with InstancePublisher(instance) as publisher:
+			assert publisher.sharedArray is None and publisher.handle.path is None
+			attachedInstance = TSPInstance.attach(publisher.handle)
+			assert isinstance(attachedInstance, CoordinateTSPInstance)
+			assert attachedInstance.distanceMatrix.edgeWeightType == edgeWeightType and attachedInstance.distanceMatrix.rowCacheSize == 4
+			assert np.array_equal(attachedInstance.distanceMatrix[np.arange(10)], instance.distanceMatrix[np.arange(10)])
+			attachedInstance.close()
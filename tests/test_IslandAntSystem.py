@@ -0,0 +1,116 @@
+import sys
+import queue
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import CoordinateTSPInstance
+from IslandAntSystem import IslandMaxMinAntSystem, MigratingMaxMinAntSystem
+
+
+def createDistanceMatrix(numberOfCities):
+	distanceMatrix = [[0 for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+	for i in range(numberOfCities):
+		for j in range(i+1, numberOfCities):
+			distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+	return distanceMatrix
+
+
+class Test_IslandAntSystem:
+	def test_IslandTopology(self):
+		IMMAS = IslandMaxMinAntSystem()
+		IMMAS._setHyperparameters({"numberOfIslands": 4, "topology": "ring"})
+		assert [IMMAS._getNeighbourIslands(island) for island in range(4)] == [[1], [2], [3], [0]]
+
+		IMMAS._setHyperparameters({"topology": "fullyConnected"})
+		assert IMMAS._getNeighbourIslands(2) == [0, 1, 3]
+
+	def test_InvalidTopology(self):
+		IMMAS = IslandMaxMinAntSystem()
+		expectedMessage = f"The parameter topology needs to be one of {IslandMaxMinAntSystem._supportedHyperparameters['topology']['options']}"
+
+		with pytest.raises(expected_exception=Exception) as excinfo:
+			IMMAS._setHyperparameters({"topology": "star"})
+
+		assert str(excinfo.value) == expectedMessage
+
+	def test_InvalidColonyHyperparameters(self):
+		## The hyperparameters of the islands are checked before any island is started
+		for colonyHyperparameters in ({"bogus": 1}, {"rho": 2.0}):
+			with pytest.raises(Exception):
+				IslandMaxMinAntSystem()._setHyperparameters({"colonyHyperparameters": colonyHyperparameters})
+
+		IMMAS = IslandMaxMinAntSystem()
+		with pytest.raises(Exception) as excinfo:
+			IMMAS.run(createDistanceMatrix(10), 10, {"numberOfIslands": 2, "colonyHyperparameters": {"bogus": 1}}, timer=-1)
+		assert "The parameter bogus" in str(excinfo.value)
+		assert IMMAS.executionThread is not None and not IMMAS.isRunning()
+
+	def test_FailedIslandIsRaised(self):
+		## The islands fail on a matrix of zero distances (as their maximum pheremone is 1/(rho*0)), which the parent doesn't
+		numberOfCities = 10
+		distanceMatrix = [[0] * numberOfCities for _ in range(numberOfCities)]
+
+		IMMAS = IslandMaxMinAntSystem()
+		with pytest.raises(Exception) as excinfo:
+			IMMAS.run(distanceMatrix, numberOfCities, {"numberOfIslands": 2, "colonyHyperparameters": {"maxIterations": 10**8}}, timer=30.0)
+		assert "ZeroDivisionError" in str(excinfo.value)
+		assert not IMMAS.isRunning()
+
+	def test_MigrantAdoption(self):
+		numberOfCities = 20
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		inbox = queue.Queue()
+		island = MigratingMaxMinAntSystem(0, inbox, [], queue.Queue(), migrationInterval=1)
+		island._initializeDataStructures(distanceMatrix, numberOfCities)
+
+		## A worse migrant is ignored, whilst a better migrant replaces the best tour of the island
+		bestTour, bestDistance = list(island._bestTour), island._bestDistance
+		inbox.put((np.array(bestTour[::-1]), bestDistance + 1))
+		island._receiveMigrants()
+		assert island._bestDistance == bestDistance
+
+		migrantTour = np.array(random.sample(range(numberOfCities), numberOfCities))
+		inbox.put((migrantTour, bestDistance - 1))
+		island._receiveMigrants()
+		assert list(island._bestTour) == migrantTour.tolist()
+		assert island._bestDistance == bestDistance - 1
+		assert island.hyperparameters["max_p"] == 1 / (island.hyperparameters["rho"] * (bestDistance - 1))
+
+	def test_IslandSolve(self):
+		numberOfCities = 20
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		hyperparameters = {
+			"numberOfIslands": 2,
+			"migrationInterval": 2,
+			"seed": 3,
+			"colonyHyperparameters": {"maxIterations": 120},
+		}
+
+		IMMAS = IslandMaxMinAntSystem()
+		tour, tourDistance = IMMAS.run(distanceMatrix, numberOfCities, hyperparameters, timer=-1)
+
+		assert sorted(tour) == [city for city in range(numberOfCities)]
+		assert tourDistance == sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(numberOfCities))
+
+	def test_CoordinateIslandSolve(self):
+		## The islands attach to a coordinate instance (e.g. of a TSPLIB file) just as to a distance matrix
+		numberOfCities = 60
+		instance = CoordinateTSPInstance(np.random.default_rng(5).uniform(0, 1000, size=(numberOfCities, 2)))
+		_, nearestNeighbourDistance = instance.nearestNeighbour()
+		hyperparameters = {
+			"numberOfIslands": 2,
+			"migrationInterval": 2,
+			"seed": 3,
+			"colonyHyperparameters": {"maxIterations": 180, "localSearch": "all"},
+		}
+
+		IMMAS = IslandMaxMinAntSystem()
+		tour, tourDistance = IMMAS.run(instance, numberOfCities, hyperparameters, timer=-1)
+
+		assert sorted(tour) == [city for city in range(numberOfCities)]
+		assert tourDistance == instance.tourDistances(np.asarray(tour)[None])[0]
+		## The islands found a better tour than the nearest neighbour tour (which is all a failed island model returns)
+		assert IMMAS.iterationCount >= 1 and tourDistance < nearestNeighbourDistance
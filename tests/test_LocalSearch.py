@@ -0,0 +1,147 @@
+import sys
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import TSPInstance
+from LocalSearch import LocalSearch
+from AntSystem import AntSystem
+from MinMaxAntSystem import MaxMinAntSystem
+from GeneticParticleSwarm import GeneticParticleSwarm
+
+
+def euclideanInstance(numberOfCities):
+	coordinates = np.random.uniform(0, 1000, size=(numberOfCities, 2))
+	distanceMatrix = np.rint(np.hypot(*(coordinates[:, None] - coordinates[None]).transpose(2, 0, 1))).astype(np.int64)
+	return TSPInstance(distanceMatrix, numberOfCities), distanceMatrix
+
+
+def circleInstance(numberOfCities):
+	## The cities are evenly spaced on a circle, so the only optimal tour is the polygon (0, 1, ..., n-1)
+	angles = 2 * np.pi * np.arange(numberOfCities) / numberOfCities
+	coordinates = np.stack([np.cos(angles), np.sin(angles)], axis=1) * 1000
+	distanceMatrix = np.rint(np.hypot(*(coordinates[:, None] - coordinates[None]).transpose(2, 0, 1))).astype(np.int64)
+	return TSPInstance(distanceMatrix, numberOfCities), distanceMatrix
+
+
+def tourEdges(tour):
+	return {frozenset((int(tour[i-1]), int(tour[i]))) for i in range(len(tour))}
+
+
+class Test_LocalSearch_ImproveTour:
+	@pytest.mark.parametrize("numberOfCities", [5, 8, 40, 200])
+	def test_ImprovedTourIsShorter(self, numberOfCities):
+		instance, distanceMatrix = euclideanInstance(numberOfCities)
+		localSearch = LocalSearch(instance, neighbourListSize=10)
+		tour = np.random.permutation(numberOfCities)
+
+		improvedTour, improvedDistance = localSearch.improveTour(tour)
+
+		assert sorted(improvedTour.tolist()) == list(range(numberOfCities))
+		assert improvedDistance == sum(distanceMatrix[improvedTour[i-1], improvedTour[i]] for i in range(numberOfCities))
+		assert improvedDistance <= localSearch.tourDistance(tour)
+		## The input tour is left as it was
+		assert sorted(tour.tolist()) == list(range(numberOfCities))
+
+	def test_TwoOptUncrossesEdges(self):
+		## The cities are the corners of a square, where the tour crosses itself along both diagonals
+		distanceMatrix = np.array([[0, 10, 14, 10, 5], [10, 0, 10, 14, 7], [14, 10, 0, 10, 7], [10, 14, 10, 0, 5], [5, 7, 7, 5, 0]])
+		localSearch = LocalSearch(TSPInstance(distanceMatrix, 5), neighbourListSize=4)
+
+		improvedTour, improvedDistance = localSearch.improveTour(np.array([0, 2, 1, 3, 4]))
+		assert improvedDistance == 10 + 10 + 10 + 5 + 5
+
+	def test_MisplacedCityIsMoved(self):
+		## The cities lie on a line, where the tour visits city 1 out of order
+		numberOfCities = 8
+		coordinates = np.arange(numberOfCities)
+		distanceMatrix = np.abs(coordinates[:, None] - coordinates[None]) * 10
+		distanceMatrix[0, numberOfCities-1] = distanceMatrix[numberOfCities-1, 0] = 10
+		localSearch = LocalSearch(TSPInstance(distanceMatrix, numberOfCities), neighbourListSize=3)
+
+		improvedTour, improvedDistance = localSearch.improveTour(np.array([0, 2, 3, 4, 1, 5, 6, 7]))
+
+		assert improvedDistance == 10 * numberOfCities
+		assert tourEdges(improvedTour) == tourEdges(range(numberOfCities))
+
+	def test_ReversedSegmentIsUncrossed(self):
+		## Reversing any segment of the polygon makes the tour cross itself, which a single 2-opt move undoes
+		numberOfCities = 12
+		instance, distanceMatrix = circleInstance(numberOfCities)
+		localSearch = LocalSearch(instance, neighbourListSize=3)
+		optimalEdges = tourEdges(range(numberOfCities))
+
+		for i in range(1, numberOfCities):
+			for j in range(i+1, numberOfCities):
+				tour = np.arange(numberOfCities)
+				tour[i:j+1] = tour[i:j+1][::-1]
+				improvedTour, improvedDistance = localSearch.improveTour(tour)
+				assert tourEdges(improvedTour) == optimalEdges
+				assert improvedDistance == sum(distanceMatrix[city-1, city] for city in range(numberOfCities))
+
+	def test_RelocatedCityIsMovedBack(self):
+		## Moving a single city of the polygon elsewhere in the tour is undone by an Or-opt move
+		numberOfCities = 12
+		instance, _ = circleInstance(numberOfCities)
+		localSearch = LocalSearch(instance, neighbourListSize=3)
+		optimalEdges = tourEdges(range(numberOfCities))
+
+		for city in range(1, numberOfCities):
+			for position in range(1, numberOfCities):
+				tour = [otherCity for otherCity in range(numberOfCities) if otherCity != city]
+				tour.insert(position, city)
+				improvedTour, _ = localSearch.improveTour(np.array(tour))
+				assert tourEdges(improvedTour) == optimalEdges
+
+
+class Test_LocalSearch_Solvers:
+	@pytest.mark.parametrize("solverType", [AntSystem, MaxMinAntSystem])
+	@pytest.mark.parametrize("policy", ["best", "all"])
+	def test_ColonyToursAreImproved(self, solverType, policy):
+		numberOfCities = 30
+		instance, distanceMatrix = euclideanInstance(numberOfCities)
+		solver = solverType()
+		solver._setHyperparameters({"maxIterations": 50, "numberOfAnts": 6, "localSearch": policy, "seed": 3})
+		solver._initializeDataStructures(instance, numberOfCities)
+		startCities = np.array([solver._selectAntPlacement() for _ in range(6)])
+		tours, tourDistances = solver._constructTours(startCities)
+		improvedTours, improvedDistances = tours.copy(), tourDistances.copy()
+		solver._improveTours(improvedTours, improvedDistances)
+
+		bestAnt = int(np.argmin(tourDistances))
+		for ant in range(6):
+			tour = improvedTours[ant]
+			assert sorted(tour.tolist()) == list(range(numberOfCities))
+			assert improvedDistances[ant] == sum(distanceMatrix[tour[i-1], tour[i]] for i in range(numberOfCities))
+			assert improvedDistances[ant] <= tourDistances[ant]
+			if policy == "best" and ant != bestAnt:
+				assert np.array_equal(tour, tours[ant])
+
+	def test_InvalidLocalSearchPolicy(self):
+		with pytest.raises(Exception):
+			AntSystem()._setHyperparameters({"localSearch": "first"})
+
+	def test_GeneticParticleSwarmChildren(self):
+		numberOfCities = 25
+		instance, distanceMatrix = euclideanInstance(numberOfCities)
+		GPS = GeneticParticleSwarm()
+		GPS._setHyperparameters({"numberOfParticles": 5, "localSearch": True})
+		GPS._initializeDataStructures(instance, numberOfCities)
+		GPS._bestTour, GPS._bestDistance = GPS._bestCurrentParticleTour()
+
+		childTour, childDistance = GPS._improveChildTour(GPS._heuristicCrossover(GPS._bestTour, GPS._bestTour))
+		assert sorted(childTour) == list(range(numberOfCities))
+		assert childDistance == GPS._calculateTourDistance(childTour)
+
+	def test_GeneticParticleSwarmReuse(self):
+		## The local search of each run is that of its own instance (or none), whatever the previous run used
+		GPS = GeneticParticleSwarm()
+		for numberOfCities, localSearch in ((30, True), (40, False), (25, True)):
+			instance, distanceMatrix = euclideanInstance(numberOfCities)
+			tour, tourDistance = GPS.run(instance, numberOfCities, {"numberOfParticles": 5, "maxIterations": 3, "localSearch": localSearch}, timer=-1)
+
+			assert sorted(tour.tolist()) == list(range(numberOfCities))
+			assert tourDistance == sum(distanceMatrix[tour[i-1], tour[i]] for i in range(numberOfCities))
+			assert (GPS.localSearch is not None) == localSearch
+			assert GPS.localSearch is None or GPS.localSearch.TSPInstance is GPS.TSPInstance
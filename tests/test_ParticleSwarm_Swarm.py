@@ -0,0 +1,83 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from ParticleSwarm import ParticleSwarm, Particle
+from GeneticParticleSwarm import GeneticParticleSwarm
+
+
+def randomDistanceMatrix(numberOfCities):
+	distanceMatrix = [[0] * numberOfCities for _ in range(numberOfCities)]
+	for i in range(numberOfCities):
+		for j in range(i + 1, numberOfCities):
+			distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+	return distanceMatrix
+
+
+class Test_ParticleSwarm_Swarm:
+	@pytest.mark.parametrize("solverType", [ParticleSwarm, GeneticParticleSwarm])
+	def test_ParticlesAreViewsOfTheSwarm(self, solverType):
+		numberOfCities = 12
+		solver = solverType()
+		solver._setHyperparameters({"numberOfParticles": 6})
+		solver._initializeDataStructures(randomDistanceMatrix(numberOfCities), numberOfCities)
+
+		assert isinstance(solver.particles, list) and len(solver.particles) == 6
+		for index, particle in enumerate(solver.particles):
+			assert isinstance(particle, Particle) and not hasattr(particle, "__dict__")
+			assert np.array_equal(particle.currentTour, solver.swarm.currentTours[index])
+			assert np.array_equal(particle.bestTour, solver.swarm.bestTours[index])
+			assert particle.currentDistance == solver._calculateTourDistance(particle.currentTour)
+			assert particle.bestDistance == particle.currentDistance
+
+		bestTour, bestDistance = solver._bestCurrentParticleTour()
+		assert bestDistance == solver.swarm.currentDistances.min()
+
+	def test_ParticleToursAreReadOnlyViews(self):
+		numberOfCities = 12
+		PS = ParticleSwarm()
+		PS._setHyperparameters({"numberOfParticles": 5})
+		PS._initializeDataStructures(randomDistanceMatrix(numberOfCities), numberOfCities)
+		PS._bestTour, PS._bestDistance = PS._bestCurrentParticleTour()
+
+		for index, particle in enumerate(PS.particles):
+			## The tours are read without copying the rows, and they can't be written to
+			assert np.shares_memory(particle.currentTour.cities, PS.swarm.currentTours[index])
+			assert np.shares_memory(particle.bestTour.cities, PS.swarm.bestTours[index])
+			assert not particle.currentTour.cities.flags.writeable
+
+		## The best tour of the swarm is kept as a copy, so it isn't changed by the next iterations
+		assert not np.shares_memory(PS._bestTour.cities, PS.swarm.currentTours)
+		for _ in range(3):
+			bestTour, bestDistance = PS._bestTour, PS._bestDistance
+			bestCities = bestTour.tolist()
+			for particle in PS.particles:
+				PS._runParticleIteration(particle)
+			PS._cleanupForNextIteration()
+			assert bestTour.tolist() == bestCities
+			assert PS._calculateTourDistance(PS._bestTour) == PS._bestDistance <= bestDistance
+
+	def test_SwarmArraysAreReused(self):
+		numberOfCities = 12
+		PS = ParticleSwarm()
+		PS._setHyperparameters({"numberOfParticles": 5})
+		PS._initializeDataStructures(randomDistanceMatrix(numberOfCities), numberOfCities)
+		PS._bestTour, PS._bestDistance = PS._bestCurrentParticleTour()
+		tourArrays, bestTours = {id(PS.swarm.currentTours), id(PS.swarm.nextTours)}, PS.swarm.bestTours
+
+		for _ in range(3):
+			for particle in PS.particles:
+				PS._runParticleIteration(particle)
+			PS._cleanupForNextIteration()
+
+		## The current and next tours are swapped every iteration (rather than reallocated)
+		assert {id(PS.swarm.currentTours), id(PS.swarm.nextTours)} == tourArrays and PS.swarm.bestTours is bestTours
+		assert np.array_equal(PS.swarm.currentDistances, PS.TSPInstance.tourDistances(PS.swarm.currentTours))
+		for particle in PS.particles:
+			assert sorted(particle.currentTour) == list(range(numberOfCities))
+			assert particle.currentDistance == PS._calculateTourDistance(particle.currentTour)
+			assert particle.bestDistance == PS._calculateTourDistance(particle.bestTour)
+			assert particle.nextVelocity is None
@@ -0,0 +1,114 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import Tour
+from ParticleSwarm import ParticleSwarm, swapSequence, normalizeVelocity, createVelocity, applySwaps
+
+
+def countCycles(targetTour, currentTour):
+	currentPositions = {city: position for position, city in enumerate(currentTour)}
+	source = [currentPositions[city] for city in targetTour]
+	isVisited, cycles = [False] * len(source), 0
+	for position in range(len(source)):
+		if not isVisited[position]:
+			cycles += 1
+			while not isVisited[position]:
+				isVisited[position] = True
+				position = source[position]
+	return cycles
+
+
+class Test_ParticleSwarm_TourSubtract:
+	@pytest.mark.parametrize("numberOfCities", [1, 2, 7, 60])
+	def test_SwapSequenceMovesTourOntoTarget(self, numberOfCities):
+		PS = ParticleSwarm()
+		for _ in range(20):
+			firstTour = Tour(random.sample(range(numberOfCities), numberOfCities))
+			secondTour = Tour(random.sample(range(numberOfCities), numberOfCities))
+
+			PS._initializeDataStructures([[0] * numberOfCities for _ in range(numberOfCities)], numberOfCities)
+			velocity = PS._tourSubtract(firstTour, secondTour)
+
+			assert list(PS._applyAmmendments(secondTour, velocity)) == list(firstTour)
+			## The sequence is minimal, i.e. one swap less than the length of each cycle
+			assert len(velocity) == numberOfCities - countCycles(list(firstTour), list(secondTour))
+
+	def test_IdenticalToursHaveNoVelocity(self):
+		tour = random.sample(range(30), 30)
+		assert swapSequence(tour, list(tour)) == []
+
+
+class Test_ParticleSwarm_NormalizeVelocity:
+	def test_RedundantSwapsCancel(self):
+		numberOfCities = 10
+		velocity = createVelocity([(1, 2), (3, 4), (2, 1), (5, 5), (4, 3), (6, 7)], numberOfCities)
+
+		normalizedVelocity = normalizeVelocity(velocity, numberOfCities, numberOfCities-1)
+		assert normalizedVelocity.dtype == np.int16
+		assert normalizedVelocity.tolist() == [[6, 7]]
+
+	@pytest.mark.parametrize("numberOfCities", [2, 9, 40])
+	def test_NormalizedVelocityHasTheSameEffect(self, numberOfCities):
+		PS = ParticleSwarm()
+		PS._initializeDataStructures([[0] * numberOfCities for _ in range(numberOfCities)], numberOfCities)
+		tour = Tour(random.sample(range(numberOfCities), numberOfCities))
+		velocity = createVelocity([random.sample(range(numberOfCities), 2) for _ in range(5 * numberOfCities)], numberOfCities)
+
+		normalizedVelocity = normalizeVelocity(velocity, numberOfCities, numberOfCities-1)
+		assert len(normalizedVelocity) <= numberOfCities - 1
+		assert list(PS._applyAmmendments(tour, normalizedVelocity)) == list(PS._applyAmmendments(tour, velocity))
+		assert len(normalizeVelocity(velocity, numberOfCities, 3)) <= 3
+
+	def test_VelocityStaysBounded(self):
+		numberOfCities = 30
+		PS = ParticleSwarm()
+		PS._setHyperparameters({"numberOfParticles": 5, "maxVelocityLength": 12})
+		PS._initializeDataStructures([[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)], numberOfCities)
+		PS._bestTour, PS._bestDistance = PS._bestCurrentParticleTour()
+
+		for _ in range(20):
+			for particle in PS.particles:
+				PS._runParticleIteration(particle)
+			PS._cleanupForNextIteration()
+			for particle in PS.particles:
+				assert len(particle.currentVelocity) <= 12
+				assert sorted(particle.currentTour) == list(range(numberOfCities))
+
+
+class Test_ParticleSwarm_DeltaEvaluation:
+	def test_SwapDeltasMatchTourDistance(self):
+		numberOfCities = 12
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		distance = lambda start, end: distanceMatrix[start][end]
+		tourDistance = lambda tour: sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(numberOfCities))
+
+		## NOTE: The swaps include neighbouring positions (and the first and last positions), whose edges overlap
+		swaps = [(0, numberOfCities-1), (3, 4), (5, 5), (7, 2)] + [tuple(random.sample(range(numberOfCities), 2)) for _ in range(50)]
+		tour = random.sample(range(numberOfCities), numberOfCities)
+		swappedTour = list(tour)
+		updatedDistance = applySwaps(swappedTour, swaps, distance, tourDistance(tour))
+
+		for first, second in swaps:
+			tour[first], tour[second] = tour[second], tour[first]
+		assert swappedTour == tour
+		assert updatedDistance == tourDistance(tour)
+
+	@pytest.mark.parametrize("deltaEvaluationFraction", [0.0, 0.3, 1.0])
+	def test_CheckedSwarmIterations(self, deltaEvaluationFraction):
+		numberOfCities = 20
+		PS = ParticleSwarm()
+		PS._setHyperparameters({"numberOfParticles": 6, "deltaEvaluationFraction": deltaEvaluationFraction, "checkDeltaEvaluation": True})
+		PS._initializeDataStructures([[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)], numberOfCities)
+		PS._bestTour, PS._bestDistance = PS._bestCurrentParticleTour()
+
+		## NOTE: The check raises an exception if an updated distance doesn't match its tour
+		for _ in range(10):
+			for particle in PS.particles:
+				PS._runParticleIteration(particle)
+			PS._cleanupForNextIteration()
+		for particle in PS.particles:
+			assert particle.currentDistance == PS._calculateTourDistance(particle.currentTour)
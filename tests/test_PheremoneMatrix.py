@@ -0,0 +1,84 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import PheremoneMatrix, LazyPheremoneMatrix
+
+
+def randomTourEdges(numberOfCities, numberOfTours):
+	tours = np.array([random.sample(range(numberOfCities), numberOfCities) for _ in range(numberOfTours)])
+	return tours.ravel(), np.roll(tours, -1, axis=1).ravel()
+
+
+class Test_PheremoneMatrix_LazyEvaporation:
+	def test_LazyMatchesEagerEvaporation(self):
+		numberOfCities = 12
+		rho = 0.5
+		eagerMatrix = PheremoneMatrix(numberOfCities, 1.0)
+		lazyMatrix = LazyPheremoneMatrix(numberOfCities, 1.0)
+
+		## NOTE: 400 iterations with rho = 0.5 requires the lazy matrix to renormalize at least once
+		for _ in range(400):
+			startCities, endCities = randomTourEdges(numberOfCities, 2)
+			deposits = np.full(len(startCities), random.uniform(0.01, 1.0))
+			for matrix in (eagerMatrix, lazyMatrix):
+				matrix.evaporate(rho)
+				matrix.deposit(startCities, endCities, deposits)
+
+		assert np.allclose(np.asarray(lazyMatrix), np.asarray(eagerMatrix), rtol=1e-9, atol=0)
+		assert np.array_equal(np.asarray(lazyMatrix), np.asarray(lazyMatrix).T)
+
+	def test_LazyMatchesEagerMinMaxBoundaries(self):
+		numberOfCities = 12
+		rho = 0.3
+		minimumPheremone, maximumPheremone = 0.05, 2.0
+		eagerMatrix = PheremoneMatrix(numberOfCities, maximumPheremone)
+		lazyMatrix = LazyPheremoneMatrix(numberOfCities, maximumPheremone)
+
+		for iteration in range(400):
+			startCities, endCities = randomTourEdges(numberOfCities, 1)
+			deposits = np.full(len(startCities), random.uniform(0.1, 3.0))
+			## NOTE: The maximum boundary only ever increases (as it depends on the best tour so far)
+			maximumPheremone += 0.001
+			for matrix in (eagerMatrix, lazyMatrix):
+				matrix.evaporate(rho)
+				matrix.deposit(startCities, endCities, deposits)
+				matrix.clip(minimumPheremone, maximumPheremone)
+
+			if iteration % 50 == 0:
+				assert np.allclose(np.asarray(lazyMatrix), np.asarray(eagerMatrix), rtol=1e-9, atol=0)
+
+		assert np.allclose(np.asarray(lazyMatrix), np.asarray(eagerMatrix), rtol=1e-9, atol=0)
+		assert np.asarray(lazyMatrix).min() >= minimumPheremone
+		assert np.asarray(lazyMatrix).max() <= maximumPheremone
+
+	def test_LazyMatrixIndexing(self):
+		numberOfCities = 5
+		lazyMatrix = LazyPheremoneMatrix(numberOfCities, 1.0)
+		lazyMatrix.evaporate(0.5)
+
+		assert lazyMatrix[1][2] == 0.5
+		assert np.array_equal(lazyMatrix[np.array([0, 3])], np.full((2, numberOfCities), 0.5))
+		assert len(lazyMatrix) == numberOfCities
+
+
+class Test_PheremoneMatrix_PackedStorage:
+	@pytest.mark.parametrize("matrixType", [PheremoneMatrix, LazyPheremoneMatrix])
+	def test_PackedMatchesDense(self, matrixType):
+		numberOfCities = 10
+		denseMatrix = matrixType(numberOfCities, 1.0)
+		packedMatrix = matrixType(numberOfCities, 1.0, isPacked=True)
+
+		for _ in range(50):
+			startCities, endCities = randomTourEdges(numberOfCities, 2)
+			deposits = np.full(len(startCities), random.uniform(0.01, 1.0))
+			for matrix in (denseMatrix, packedMatrix):
+				matrix.evaporate(0.2)
+				matrix.deposit(startCities, endCities, deposits)
+				matrix.clip(0.01, 5.0)
+
+		assert np.allclose(np.asarray(packedMatrix), np.asarray(denseMatrix), rtol=1e-12, atol=0)
+		assert packedMatrix.storage.values.size == numberOfCities * (numberOfCities + 1) // 2
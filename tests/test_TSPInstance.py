@@ -0,0 +1,174 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import TSPInstance, asTSPInstance
+
+
+class Test_TSPInstance_CandidateLists:
+	def test_CandidateListsAreNearestNeighbours(self):
+		numberOfCities = 30
+		candidateListSize = 5
+		## NOTE: This provides an Assymetric TSP distance matrix
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		instance = TSPInstance(distanceMatrix, numberOfCities)
+
+		candidates = instance.candidateLists(candidateListSize)
+
+		assert candidates.shape == (numberOfCities, candidateListSize)
+		for city in range(numberOfCities):
+			assert city not in candidates[city] ## a city is never its own candidate
+			candidateDistances = [distanceMatrix[city][candidate] for candidate in candidates[city]]
+			assert candidateDistances == sorted(candidateDistances) ## the candidates are ordered nearest first
+
+			otherDistances = [distance for neighbour, distance in enumerate(distanceMatrix[city]) \
+								if neighbour != city and neighbour not in candidates[city]]
+			assert max(candidateDistances) <= min(otherDistances)
+
+	def test_CandidateListSizeIsCapped(self):
+		numberOfCities = 4
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		instance = TSPInstance(distanceMatrix, numberOfCities)
+
+		candidates = instance.candidateLists(10)
+
+		assert candidates.shape == (numberOfCities, numberOfCities-1)
+		for city in range(numberOfCities):
+			assert sorted(candidates[city]) == [neighbour for neighbour in range(numberOfCities) if neighbour != city]
+
+
+class Test_TSPInstance_DistanceArray:
+	def test_ListMatrixIsConverted(self):
+		numberOfCities = 10
+		distanceMatrix = [[random.randint(0, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		instance = TSPInstance(distanceMatrix, numberOfCities)
+
+		assert isinstance(instance.distanceMatrix, np.ndarray)
+		assert instance.distanceMatrix.dtype == np.int32
+		assert instance.distanceMatrix.flags['C_CONTIGUOUS']
+		assert instance.distanceMatrix.tolist() == distanceMatrix
+
+	def test_FloatListMatrixIsConverted(self):
+		numberOfCities = 10
+		distanceMatrix = [[random.uniform(0, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		instance = TSPInstance(distanceMatrix, numberOfCities)
+
+		assert instance.distanceMatrix.dtype == np.float64
+		assert isinstance(instance.distance(1, 2), float)
+		assert instance.distance(1, 2) == distanceMatrix[1][2]
+
+	@pytest.mark.parametrize("dtype", [np.int32, np.float32, np.float64])
+	def test_SelectedDistanceType(self, dtype):
+		numberOfCities = 10
+		distanceMatrix = [[random.randint(0, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		instance = TSPInstance(distanceMatrix, numberOfCities, dtype=dtype)
+
+		assert instance.distanceMatrix.dtype == dtype
+		tour, tourDistance = instance.nearestNeighbour()
+		tour = list(tour)
+		assert sorted(tour) == [city for city in range(numberOfCities)]
+		assert tourDistance == sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(numberOfCities))
+
+	def test_ArrayMatrixIsNotCopied(self):
+		numberOfCities = 10
+		distanceMatrix = np.random.default_rng().random((numberOfCities, numberOfCities), dtype=np.float32)
+		instance = TSPInstance(distanceMatrix, numberOfCities)
+
+		assert instance.distanceMatrix is distanceMatrix
+		assert asTSPInstance(instance, numberOfCities) is instance
+
+	@pytest.mark.parametrize("arrayType, expectedType", [(np.int8, np.int64), (np.int16, np.int64), (np.uint8, np.int64),
+															(np.uint32, np.int64), (np.float16, np.float64)])
+	def test_OtherArrayTypesAreConverted(self, arrayType, expectedType):
+		numberOfCities = 10
+		distanceMatrix = np.random.randint(0, 100, size=(numberOfCities, numberOfCities)).astype(arrayType)
+		instance = TSPInstance(distanceMatrix, numberOfCities)
+
+		assert instance.distanceMatrix.dtype == expectedType
+		assert np.array_equal(instance.distanceMatrix, distanceMatrix)
+		tour, tourDistance = instance.nearestNeighbour()
+		tour = list(tour)
+		assert tourDistance == sum(int(distanceMatrix[tour[i-1]][tour[i]]) for i in range(numberOfCities))
+
+	def test_UnsupportedDistanceType(self):
+		numberOfCities = 3
+		distanceMatrix = [[random.randint(0, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+
+		with pytest.raises(expected_exception=Exception) as excinfo:
+			TSPInstance(distanceMatrix, numberOfCities, dtype=np.int8)
+
+		assert str(excinfo.value).startswith("The distance type int8 is not supported")
+
+	def test_InvalidMatrixShape(self):
+		numberOfCities = 3
+		distanceMatrix = [[random.randint(0, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+
+		with pytest.raises(expected_exception=Exception) as excinfo:
+			TSPInstance(distanceMatrix, numberOfCities+1)
+
+		assert str(excinfo.value) == f"The distance matrix needs to have the shape {(numberOfCities+1, numberOfCities+1)}, not {(numberOfCities, numberOfCities)}"
+
+
+
+class Test_TSPInstance_PackedStorage:
+	def symmetricMatrix(self, numberOfCities):
+		distanceMatrix = np.random.randint(1, 100, size=(numberOfCities, numberOfCities))
+		distanceMatrix = np.triu(distanceMatrix, 1)
+		return distanceMatrix + distanceMatrix.T
+
+	def test_PackedMatchesDense(self):
+		numberOfCities = 15
+		distanceMatrix = self.symmetricMatrix(numberOfCities)
+		instance = TSPInstance(distanceMatrix, numberOfCities, storage="packed")
+
+		assert instance.isPacked
+		assert np.array_equal(np.asarray(instance.distanceMatrix), distanceMatrix)
+		assert np.array_equal(instance.neighbourRows(np.array([3, 7])), distanceMatrix[[3, 7]])
+		assert instance.distance(4, 9) == distanceMatrix[4, 9] == instance.distance(9, 4)
+		assert np.array_equal(instance.candidateLists(4), TSPInstance(distanceMatrix, numberOfCities).candidateLists(4))
+
+	def test_AutomaticStorageSelection(self, monkeypatch):
+		numberOfCities = 12
+		monkeypatch.setattr(TSPInstance, "packedStorageThreshold", 10)
+		distanceMatrix = self.symmetricMatrix(numberOfCities)
+		assert TSPInstance(distanceMatrix, numberOfCities).isPacked
+
+		## NOTE: An assymetric matrix is never packed automatically
+		distanceMatrix[0, 1] += 1
+		assert not TSPInstance(distanceMatrix, numberOfCities).isPacked
+
+	def test_InvalidPackedStorage(self):
+		numberOfCities = 5
+		distanceMatrix = self.symmetricMatrix(numberOfCities)
+		distanceMatrix[0, 1] += 1
+		with pytest.raises(Exception):
+			TSPInstance(distanceMatrix, numberOfCities, storage="packed")
+		with pytest.raises(Exception):
+			TSPInstance(distanceMatrix, numberOfCities, storage="sparse")
+
+
+class Test_TSPInstance_TourDistances:
+	@pytest.mark.parametrize("storage", ["dense", "packed"])
+	def test_BatchMatchesTourWalk(self, storage):
+		numberOfCities = 15
+		distanceMatrix = [[0] * numberOfCities for _ in range(numberOfCities)]
+		for i in range(numberOfCities):
+			for j in range(i + 1, numberOfCities):
+				distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+		instance = TSPInstance(distanceMatrix, numberOfCities, storage=storage)
+		tours = np.array([np.random.permutation(numberOfCities) for _ in range(7)])
+
+		tourDistances = instance.tourDistances(tours)
+		assert tourDistances.shape == (7,)
+		for tour, tourDistance in zip(tours.tolist(), tourDistances.tolist()):
+			assert tourDistance == sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(numberOfCities))
+			assert instance.tourDistance(tour) == tourDistance
+
+	def test_SumsDoNotOverflow(self):
+		## The edges of the tour sum to more than the largest int32
+		distanceMatrix = np.full((4, 4), 2**30, dtype=np.int32)
+		instance = TSPInstance(distanceMatrix, 4)
+		assert instance.tourDistances(np.array([[0, 1, 2, 3]])).tolist() == [2**32]
@@ -0,0 +1,120 @@
+import sys
+import math
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import CoordinateTSPInstance
+from TSPLIB import readTSPLIBFile
+from AntSystem import AntSystem
+from MinMaxAntSystem import MaxMinAntSystem
+from ParticleSwarm import ParticleSwarm
+from GeneticParticleSwarm import GeneticParticleSwarm
+
+
+def tsplibDistance(first, second, edgeWeightType):
+	## This is a direct (scalar) translation of the TSPLIB distance functions
+	dx, dy = first[0] - second[0], first[1] - second[1]
+	if edgeWeightType == "EUC_2D":
+		return int(math.sqrt(dx*dx + dy*dy) + 0.5)
+	if edgeWeightType == "CEIL_2D":
+		return math.ceil(math.sqrt(dx*dx + dy*dy))
+	if edgeWeightType == "ATT":
+		r = math.sqrt((dx*dx + dy*dy) / 10.0)
+		t = int(r + 0.5)
+		return t + 1 if t < r else t
+
+	def toRadians(x):
+		degrees = int(x)
+		return 3.141592 * (degrees + 5.0 * (x - degrees) / 3.0) / 180.0
+	q1 = math.cos(toRadians(first[1]) - toRadians(second[1]))
+	q2 = math.cos(toRadians(first[0]) - toRadians(second[0]))
+	q3 = math.cos(toRadians(first[0]) + toRadians(second[0]))
+	return int(6378.388 * math.acos(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)) + 1.0)
+
+
+TSPLIBFile = """NAME : sample6
+COMMENT : A small coordinate instance
+TYPE : TSP
+DIMENSION : 6
+EDGE_WEIGHT_TYPE : {}
+NODE_COORD_SECTION
+1 38.24 20.42
+2 39.57 26.15
+4 36.26 23.12
+3 40.56 25.32
+5 33.48 10.54
+6 37.56 12.19
+EOF
+"""
+
+
+class Test_TSPLIB_Reader:
+	@pytest.mark.parametrize("edgeWeightType", ["EUC_2D", "ATT", "GEO"])
+	def test_ReadCoordinateInstance(self, tmp_path, edgeWeightType):
+		path = tmp_path / "sample6.tsp"
+		path.write_text(TSPLIBFile.format(edgeWeightType))
+		instance = readTSPLIBFile(str(path))
+
+		## NOTE: The cities are ordered by their number (not by their line)
+		assert instance.numberOfCities == 6
+		assert np.array_equal(instance.coordinates[2], [40.56, 25.32])
+		for i in range(6):
+			for j in range(6):
+				expectedDistance = 0 if i == j else tsplibDistance(instance.coordinates[i], instance.coordinates[j], edgeWeightType)
+				assert instance.distance(i, j) == expectedDistance
+
+	def test_UnsupportedInstances(self, tmp_path):
+		path = tmp_path / "sample6.tsp"
+		path.write_text(TSPLIBFile.format("EXPLICIT"))
+		with pytest.raises(Exception):
+			readTSPLIBFile(str(path))
+
+		path.write_text(TSPLIBFile.format("EUC_2D").replace("DIMENSION : 6", "DIMENSION : 7"))
+		with pytest.raises(Exception):
+			readTSPLIBFile(str(path))
+
+
+class Test_CoordinateTSPInstance_Distances:
+	@pytest.mark.parametrize("edgeWeightType", ["EUC_2D", "CEIL_2D", "ATT", "GEO"])
+	def test_RowsMatchScalarDistances(self, edgeWeightType):
+		numberOfCities = 25
+		coordinates = np.random.uniform(-80, 80, size=(numberOfCities, 2))
+		instance = CoordinateTSPInstance(coordinates, edgeWeightType)
+
+		distanceMatrix = np.asarray(instance.distanceMatrix)
+		for i in range(numberOfCities):
+			assert np.array_equal(instance.neighbours(i), distanceMatrix[i])
+			for j in range(numberOfCities):
+				if i != j:
+					assert distanceMatrix[i, j] == tsplibDistance(coordinates[i], coordinates[j], edgeWeightType)
+
+		rows = np.array([3, 7, 11])
+		assert np.array_equal(instance.neighbourRows(rows), distanceMatrix[rows])
+		assert np.array_equal(instance.distanceMatrix[rows[:, None], rows], distanceMatrix[rows[:, None], rows])
+
+	def test_BoundedRowCache(self):
+		numberOfCities = 10
+		instance = CoordinateTSPInstance(np.random.uniform(0, 100, size=(numberOfCities, 2)), rowCacheSize=3)
+
+		for city in [0, 1, 2, 0, 3]:
+			row = instance.neighbours(city)
+		## The least recently used row (city 1) is evicted first
+		assert list(instance.distanceMatrix.rowCache) == [2, 0, 3]
+		assert instance.neighbours(0) is instance.distanceMatrix.rowCache[0]
+		assert not row.flags.writeable
+
+	@pytest.mark.parametrize("solverType", [AntSystem, MaxMinAntSystem, ParticleSwarm, GeneticParticleSwarm])
+	def test_SolversRunOnCoordinates(self, solverType):
+		numberOfCities = 20
+		instance = CoordinateTSPInstance(np.random.uniform(0, 100, size=(numberOfCities, 2)), rowCacheSize=5)
+		if solverType in (AntSystem, MaxMinAntSystem):
+			hyperparameters = {"maxIterations": 500, "numberOfAnts": 5}
+		else:
+			hyperparameters = {"maxIterations": 2}
+
+		solver = solverType()
+		tour, distance = solver.run(instance, numberOfCities, hyperparameters, timer=1.0)
+		assert sorted(tour) == list(range(numberOfCities))
+		assert distance == sum(instance.distance(tour[i-1], tour[i]) for i in range(numberOfCities))
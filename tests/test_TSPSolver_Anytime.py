@@ -0,0 +1,96 @@
+import sys
+import time
+import random
+import pytest
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import Improvement, ImprovementCallback
+from AntSystem import AntSystem
+from MinMaxAntSystem import MaxMinAntSystem
+from ParticleSwarm import ParticleSwarm
+from GeneticParticleSwarm import GeneticParticleSwarm
+
+
+def createDistanceMatrix(numberOfCities):
+	distanceMatrix = [[0 for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+	for i in range(numberOfCities):
+		for j in range(i+1, numberOfCities):
+			distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+	return distanceMatrix
+
+
+def tourDistance(distanceMatrix, tour):
+	return sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(len(tour)))
+
+
+def createHyperparameters(solverType, maxIterations):
+	## NOTE: The max-min ant system divides its iterations between its ants
+	if solverType in (AntSystem, MaxMinAntSystem):
+		return {"maxIterations": maxIterations, "numberOfAnts": 5}
+	return {"maxIterations": maxIterations, "numberOfParticles": 5}
+
+
+class Test_TSPSolver_Anytime:
+	@pytest.mark.parametrize("solverType", [AntSystem, MaxMinAntSystem, ParticleSwarm, GeneticParticleSwarm])
+	def test_ImprovementsAreYielded(self, solverType):
+		numberOfCities = 30
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		solver = solverType()
+
+		improvements = list(solver.improvements(distanceMatrix, numberOfCities, createHyperparameters(solverType, 100 if solverType in (AntSystem, MaxMinAntSystem) else 20), timer=-1))
+		assert improvements and not solver.isRunning()
+		for improvement in improvements:
+			assert sorted(improvement.tour.tolist()) == list(range(numberOfCities))
+			assert improvement.distance == tourDistance(distanceMatrix, improvement.tour)
+
+		## Each improvement is strictly better than the last, and the last one is the result of the run
+		assert all(earlier.distance > later.distance for earlier, later in zip(improvements, improvements[1:]))
+		assert all(earlier.elapsed <= later.elapsed and earlier.iteration <= later.iteration for earlier, later in zip(improvements, improvements[1:]))
+		assert improvements[-1].tour is solver.bestResult().tour
+
+	def test_ClosingTheIteratorStopsTheSolver(self):
+		numberOfCities = 30
+		solver = AntSystem()
+		improvements = solver.improvements(createDistanceMatrix(numberOfCities), numberOfCities, createHyperparameters(AntSystem, 10**8), timer=30.0)
+
+		improvement = next(improvements)
+		assert isinstance(improvement, Improvement) and improvement.iteration >= 1
+		improvements.close()
+		assert not solver.isRunning()
+		assert solver._improvementCallbacks == []
+
+	def test_CallbacksAreCalledForEveryRun(self):
+		numberOfCities = 20
+		solver = MaxMinAntSystem()
+		improvements = []
+		callback = solver.addImprovementCallback(improvements.append)
+
+		for _ in range(2):
+			improvements.clear()
+			solver.run(createDistanceMatrix(numberOfCities), numberOfCities, createHyperparameters(MaxMinAntSystem, 100), timer=-1)
+			## NOTE: The nearest neighbour tour is the first improvement (before the first iteration)
+			assert improvements[0].iteration == 0
+			assert improvements[-1].distance == solver.bestResult().distance
+
+		solver.removeImprovementCallback(callback)
+		numberOfImprovements = len(improvements)
+		solver.run(createDistanceMatrix(numberOfCities), numberOfCities, createHyperparameters(MaxMinAntSystem, 100), timer=-1)
+		assert len(improvements) == numberOfImprovements
+
+	def test_ThrottledCallbackGetsTheLastImprovement(self):
+		calls = []
+		callback = ImprovementCallback(calls.append, minInterval=1.0)
+		for elapsed, distance in [(0.0, 50), (0.2, 40), (0.5, 30), (1.1, 20), (1.3, 10)]:
+			callback.notify(Improvement(elapsed, 0, distance, None))
+		assert [improvement.distance for improvement in calls] == [50, 20]
+
+		## The improvement that was skipped last is passed on when the run finishes
+		callback.flush()
+		assert [improvement.distance for improvement in calls] == [50, 20, 10]
+		callback.flush()
+		assert len(calls) == 3
+
+	def test_InvalidMinInterval(self):
+		with pytest.raises(Exception):
+			AntSystem().addImprovementCallback(print, minInterval=-1)
@@ -0,0 +1,123 @@
+import sys
+import time
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from AntSystem import AntSystem
+from MinMaxAntSystem import MaxMinAntSystem
+from ParticleSwarm import ParticleSwarm
+from GeneticParticleSwarm import GeneticParticleSwarm
+from IslandAntSystem import IslandMaxMinAntSystem
+
+
+def createDistanceMatrix(numberOfCities):
+	distanceMatrix = [[0 for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+	for i in range(numberOfCities):
+		for j in range(i+1, numberOfCities):
+			distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+	return distanceMatrix
+
+
+def tourDistance(distanceMatrix, tour):
+	return sum(distanceMatrix[tour[i-1]][tour[i]] for i in range(len(tour)))
+
+
+class Test_TSPSolver_Cancellation:
+	@pytest.mark.parametrize("solverType", [AntSystem, MaxMinAntSystem, ParticleSwarm, GeneticParticleSwarm])
+	def test_TimedRunStopsTheSolver(self, solverType):
+		numberOfCities = 30
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		## NOTE: The iteration limits are far more than the solvers can run in the timer
+		if solverType in (AntSystem, MaxMinAntSystem):
+			hyperparameters = {"maxIterations": 10**8, "numberOfAnts": 5}
+		else:
+			hyperparameters = {"maxIterations": 10**8, "numberOfParticles": 5}
+
+		solver = solverType()
+		startTime = time.time()
+		tour, distance = solver.run(distanceMatrix, numberOfCities, hyperparameters, timer=0.5)
+		assert time.time() - startTime < 0.5 + solver.gracePeriod
+		assert not solver.isRunning()
+
+		assert sorted(tour) == list(range(numberOfCities))
+		assert distance == tourDistance(distanceMatrix, tour)
+		## The returned result is the published snapshot, which can't be modified
+		assert solver.bestResult().tour is tour and solver.bestResult().distance == distance
+		assert not tour.flags.writeable
+
+	@pytest.mark.parametrize("solverType", [AntSystem, MaxMinAntSystem, ParticleSwarm, GeneticParticleSwarm])
+	def test_SolverIsReusable(self, solverType):
+		solver = solverType()
+		for numberOfCities in (25, 8):
+			distanceMatrix = createDistanceMatrix(numberOfCities)
+			hyperparameters = {"maxIterations": 10**8, "numberOfAnts": 5} if solverType in (AntSystem, MaxMinAntSystem) else {"maxIterations": 10**8}
+			tour, distance = solver.run(distanceMatrix, numberOfCities, hyperparameters, timer=0.3)
+
+			## NOTE: The best tour of the previous run (of a larger instance) would otherwise still be returned
+			assert sorted(tour) == list(range(numberOfCities))
+			assert distance == tourDistance(distanceMatrix, tour)
+
+	def test_MaxMinIterationsAreKeptBetweenRuns(self):
+		## The max-min ant system divides its iterations between its ants (6 ants for 20 cities)
+		numberOfCities = 20
+		MMAS = MaxMinAntSystem()
+		MMAS.run(createDistanceMatrix(numberOfCities), numberOfCities, {"maxIterations": 60}, timer=-1)
+		assert MMAS.iterationCount == 10
+
+		## NOTE: The hyperparameters are kept between runs, so they aren't passed again
+		for _ in range(3):
+			distanceMatrix = createDistanceMatrix(numberOfCities)
+			tour, distance = MMAS.run(distanceMatrix, numberOfCities, timer=-1)
+			assert MMAS.hyperparameters["maxIterations"] == 60 and MMAS.iterationCount == 10
+			assert distance == tourDistance(distanceMatrix, tour)
+
+	@pytest.mark.parametrize("maxIterations", [1, 6, 12, 18])
+	def test_MaxMinRunsWithFewIterations(self, maxIterations):
+		numberOfCities = 20
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		MMAS = MaxMinAntSystem()
+		tour, distance = MMAS.run(distanceMatrix, numberOfCities, {"maxIterations": maxIterations}, timer=-1)
+		assert MMAS.iterationCount == max(1, maxIterations // 6)
+		assert sorted(tour) == list(range(numberOfCities))
+		assert distance == tourDistance(distanceMatrix, tour)
+
+	@pytest.mark.parametrize("solverType", [AntSystem, MaxMinAntSystem, ParticleSwarm, GeneticParticleSwarm])
+	@pytest.mark.parametrize("timer", [-1, 5.0])
+	def test_SolverExceptionIsRaised(self, solverType, timer):
+		numberOfCities = 15
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		solver = solverType()
+
+		## The exception of the solver thread is raised by run (rather than returning the results found before it)
+		startTime = time.time()
+		with pytest.raises(Exception) as excinfo:
+			solver.run(distanceMatrix, numberOfCities, {"rho": 2.0}, timer=timer)
+		assert "The parameter rho" in str(excinfo.value) and time.time() - startTime < 5.0
+		with pytest.raises(Exception):
+			list(solver.improvements(distanceMatrix, numberOfCities, {"bogus": 1}, timer=timer))
+
+		## The exception belongs to its run, so the next run of the solver isn't affected by it
+		hyperparameters = {"maxIterations": 100, "numberOfAnts": 5} if solverType in (AntSystem, MaxMinAntSystem) else {"maxIterations": 5}
+		tour, distance = solver.run(distanceMatrix, numberOfCities, hyperparameters, timer=timer)
+		assert distance == tourDistance(distanceMatrix, tour)
+
+	def test_StopBeforeAnyTour(self):
+		AS = AntSystem()
+		AS.stop()
+		assert AS._returnResults() == (None, float('inf'))
+
+	def test_IslandsAreStopped(self):
+		numberOfCities = 20
+		distanceMatrix = createDistanceMatrix(numberOfCities)
+		hyperparameters = {"numberOfIslands": 2, "colonyHyperparameters": {"maxIterations": 10**8}}
+
+		IMMAS = IslandMaxMinAntSystem()
+		startTime = time.time()
+		tour, distance = IMMAS.run(distanceMatrix, numberOfCities, hyperparameters, timer=3.0)
+		assert time.time() - startTime < 3.0 + IMMAS.gracePeriod
+		assert not IMMAS.isRunning()
+		assert sorted(tour) == list(range(numberOfCities))
+		assert distance == tourDistance(distanceMatrix, tour)
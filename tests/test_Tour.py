@@ -0,0 +1,57 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import Tour
+from AntSystem import AntSystem
+
+
+class Test_Tour_Lookups:
+	def test_PositionsAndNeighbours(self):
+		cities = random.sample(range(12), 12)
+		tour = Tour(cities)
+
+		assert list(tour) == cities and tour.tolist() == cities and len(tour) == 12
+		for position, city in enumerate(cities):
+			assert tour.position(city) == position
+			assert tour.successor(city) == cities[(position + 1) % 12]
+			assert tour.predecessor(city) == cities[position - 1]
+			assert city in tour
+
+	def test_PartialTour(self):
+		tour = Tour([4, 1], numberOfCities=6)
+		assert 4 in tour and 1 in tour
+		assert 0 not in tour and 5 not in tour and 6 not in tour
+		assert tour.positions.tolist() == [-1, 1, -1, -1, 0, -1]
+
+	def test_CitiesAreReadOnly(self):
+		cities = np.arange(5)
+		tour = Tour(cities)
+		with pytest.raises(ValueError):
+			tour.cities[0] = 3
+		## The tour has its own copy, so the original array can still be changed
+		cities[0] = 3
+		assert tour[0] == 0
+		assert tour == Tour([0, 1, 2, 3, 4]) and tour != Tour([4, 3, 2, 1, 0])
+
+	def test_ViewIsNotCopied(self):
+		cities = np.arange(5)
+		tour = Tour.view(cities)
+		with pytest.raises(ValueError):
+			tour.cities[0] = 3
+		## The view reads the array itself, which can still be changed (whilst the array stays writeable)
+		cities[[0, 4]] = cities[[4, 0]]
+		assert tour.tolist() == [4, 1, 2, 3, 0] and tour.position(4) == 0
+		assert cities.flags.writeable and Tour(tour).cities is not cities
+
+	def test_ResultsAreNotCopied(self):
+		numberOfCities = 10
+		distanceMatrix = [[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)]
+		AS = AntSystem()
+		tour, _ = AS.run(distanceMatrix, numberOfCities, {"maxIterations": 3, "numberOfAnts": 3}, timer=-1)
+
+		assert tour is AS._bestTour.cities
+		assert sorted(tour.tolist()) == list(range(numberOfCities))
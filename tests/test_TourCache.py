@@ -0,0 +1,94 @@
+import sys
+import random
+import pytest
+import numpy as np
+
+sys.path.insert(0, "./src")
+sys.path.insert(0, "../src")
+from supportingDS import TourCache, TSPInstance, canonicalTours
+from GeneticParticleSwarm import GeneticParticleSwarm
+
+
+class Test_TourCache_Fingerprints:
+	def test_RotationsAndReversalsMatch(self):
+		tour = np.random.permutation(10)
+		equivalentTours = [np.roll(tour, shift) for shift in range(10)] + [np.roll(tour[::-1], shift) for shift in range(10)]
+
+		assert len(set(TourCache.fingerprints(np.array(equivalentTours)))) == 1
+		assert (canonicalTours(np.array(equivalentTours)) == canonicalTours(tour)).all()
+		## Swapping two cities gives a different cycle
+		otherTour = tour.copy()
+		otherTour[[2, 5]] = otherTour[[5, 2]]
+		assert TourCache.fingerprints(otherTour) != TourCache.fingerprints(tour)
+
+
+class Test_TourCache_Lookups:
+	def test_DistancesAreCached(self):
+		numberOfCities = 8
+		instance = TSPInstance([[random.randint(1, 100) for _ in range(numberOfCities)] for _ in range(numberOfCities)], numberOfCities)
+		tourCache = TourCache(maxSize=10)
+		evaluatedTours = []
+		def evaluateTours(tours):
+			evaluatedTours.extend(tours.tolist())
+			return instance.tourDistances(tours)
+
+		tours = np.array([np.random.permutation(numberOfCities) for _ in range(4)])
+		assert np.array_equal(tourCache.tourDistances(tours, evaluateTours), instance.tourDistances(tours))
+		## The second lookup only evaluates the new tour
+		newTour = np.roll(tours[1], 3)[::-1]
+		newTour[[0, 1]] = newTour[[1, 0]]
+		tourDistances = tourCache.tourDistances(np.vstack((tours[::-1], newTour)), evaluateTours)
+		assert len(evaluatedTours) == 5 and evaluatedTours[-1] == newTour.tolist()
+		assert np.array_equal(tourDistances, instance.tourDistances(np.vstack((tours[::-1], newTour))))
+		assert (tourCache.hits, tourCache.misses) == (4, 5)
+
+	def test_LeastRecentlyUsedToursAreEvicted(self):
+		tourCache = TourCache(maxSize=2)
+		tours = [np.array([0, 1, 2, 3]), np.array([0, 2, 1, 3]), np.array([0, 1, 3, 2])]
+		evaluateTours = lambda tours: np.full(len(tours), 1)
+
+		for tour in [tours[0], tours[1], tours[0], tours[2]]:
+			tourCache.tourDistances(tour, evaluateTours)
+		assert len(tourCache) == 2
+		assert list(tourCache.entries) == TourCache.fingerprints(np.array([tours[0], tours[2]]))
+
+	def test_LocalSearchResultsAreCached(self):
+		tourCache = TourCache()
+		calls = []
+		def improveTour(tour):
+			calls.append(tour)
+			return np.sort(tour), 10
+
+		tour = np.array([0, 3, 1, 2, 4])
+		assert tourCache.improveTour(tour, improveTour)[1] == 10
+		improvedTour, improvedDistance = tourCache.improveTour(np.roll(tour, 2), improveTour)
+		assert len(calls) == 1 and improvedTour.tolist() == [0, 1, 2, 3, 4] and improvedDistance == 10
+		assert tourCache.hitRate == 0.5
+
+	def test_InvalidSize(self):
+		with pytest.raises(Exception):
+			TourCache(maxSize=0)
+
+
+class Test_TourCache_Solvers:
+	@pytest.mark.parametrize("localSearch", [False, True])
+	def test_GeneticParticleSwarmChildren(self, localSearch):
+		numberOfCities = 15
+		distanceMatrix = [[0] * numberOfCities for _ in range(numberOfCities)]
+		for i in range(numberOfCities):
+			for j in range(i + 1, numberOfCities):
+				distanceMatrix[i][j] = distanceMatrix[j][i] = random.randint(1, 100)
+		GPS = GeneticParticleSwarm()
+		GPS._setHyperparameters({"numberOfParticles": 10, "tourCacheSize": 100, "localSearch": localSearch})
+		GPS._initializeDataStructures(distanceMatrix, numberOfCities)
+		GPS._bestTour, GPS._bestDistance = GPS._bestCurrentParticleTour()
+
+		for _ in range(5):
+			GPS._runParticleMainBody()
+		assert len(GPS.tourCache) <= 100
+		## The best tours of the particles were all evaluated (as children or start tours), so they are all cached
+		hits = GPS.tourCache.hits
+		assert np.array_equal(GPS._evaluateTours(GPS.swarm.bestTours), GPS.swarm.bestDistances)
+		assert GPS.tourCache.hits == hits + 10
+		for particle in GPS.particles:
+			assert particle.bestDistance == sum(distanceMatrix[particle.bestTour[i-1]][particle.bestTour[i]] for i in range(numberOfCities))